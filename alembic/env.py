@@ -5,8 +5,9 @@ from sqlalchemy import create_engine, engine_from_config, pool
 from alembic import context
 from app.core.settings import settings
 from app.db.session import Base  # ✅ import your Base
-from app.models import (budget, category, expense, role,  # ✅ import all models
-                        user)
+from app.models import (budget, category, data_version,  # ✅ import all models
+                        expense, monthly_spend, outbox, recurring_schedule,
+                        role, tombstone, user)
 
 connectable = create_engine(
     settings.DATABASE_URL,
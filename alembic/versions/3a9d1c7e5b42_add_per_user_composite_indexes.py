@@ -0,0 +1,41 @@
+"""add per-user composite indexes
+
+Revision ID: 3a9d1c7e5b42
+Revises: cf96e7c18f8d
+Create Date: 2026-10-18 09:12:44.301562
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3a9d1c7e5b42"
+down_revision: Union[str, Sequence[str], None] = "cf96e7c18f8d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_expenses_user_id_date_id", "expenses", ["user_id", "date", "id"]
+    )
+    op.create_index(
+        "ix_budgets_user_id_time_period_category_id",
+        "budgets",
+        ["user_id", "time_period", "category_id"],
+    )
+    op.create_index(
+        "ix_categories_owner_id_parent_id", "categories", ["owner_id", "parent_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_categories_owner_id_parent_id", table_name="categories")
+    op.drop_index("ix_budgets_user_id_time_period_category_id", table_name="budgets")
+    op.drop_index("ix_expenses_user_id_date_id", table_name="expenses")
@@ -0,0 +1,76 @@
+"""add sync tracking
+
+Revision ID: 5d7c3a9e2f14
+Revises: 80019e1f91a9
+Create Date: 2026-10-18 18:21:09.613402
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d7c3a9e2f14"
+down_revision: Union[str, Sequence[str], None] = "80019e1f91a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("categories", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.add_column("budgets", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    # Existing rows count as changed now, so the first delta sync sends them.
+    # Naive UTC like every stored timestamp (see app.core.clock).
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for table in ("categories", "budgets", "expenses"):
+        op.execute(
+            sa.text(
+                f"UPDATE {table} SET updated_at = :now WHERE updated_at IS NULL"
+            ).bindparams(now=now)
+        )
+    op.create_index(
+        "ix_categories_owner_id_updated_at",
+        "categories",
+        ["owner_id", "updated_at"],
+    )
+    op.create_index(
+        "ix_budgets_user_id_updated_at",
+        "budgets",
+        ["user_id", "updated_at"],
+    )
+    op.create_index(
+        "ix_expenses_user_id_updated_at",
+        "expenses",
+        ["user_id", "updated_at"],
+    )
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("resource", sa.String(), nullable=False),
+        sa.Column("record_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tombstones_user_id_deleted_at",
+        "tombstones",
+        ["user_id", "deleted_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tombstones_user_id_deleted_at", table_name="tombstones")
+    op.drop_table("tombstones")
+    op.drop_index("ix_expenses_user_id_updated_at", table_name="expenses")
+    op.drop_index("ix_budgets_user_id_updated_at", table_name="budgets")
+    op.drop_index("ix_categories_owner_id_updated_at", table_name="categories")
+    op.drop_column("budgets", "updated_at")
+    op.drop_column("categories", "updated_at")
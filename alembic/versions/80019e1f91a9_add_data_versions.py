@@ -0,0 +1,37 @@
+"""add data versions
+
+Revision ID: 80019e1f91a9
+Revises: 8b2e4f6a1d93
+Create Date: 2026-10-18 16:52:41.208317
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "80019e1f91a9"
+down_revision: Union[str, Sequence[str], None] = "8b2e4f6a1d93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No backfill: a missing row reads as version 0 until the first write.
+    op.create_table(
+        "data_versions",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("resource", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "resource"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("data_versions")
@@ -0,0 +1,53 @@
+"""add monthly spend rollup
+
+Revision ID: 8b2e4f6a1d93
+Revises: 3a9d1c7e5b42
+Create Date: 2026-10-18 10:03:17.552190
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b2e4f6a1d93"
+down_revision: Union[str, Sequence[str], None] = "3a9d1c7e5b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "monthly_spend",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "category_id", "period"),
+    )
+    # Backfill from existing expenses; afterwards the CRUD keeps it current.
+    op.execute(
+        sa.text(
+            "INSERT INTO monthly_spend (user_id, category_id, period, total, count) "
+            "SELECT user_id, category_id, "
+            + (
+                "strftime('%Y-%m', date)"
+                if op.get_bind().dialect.name == "sqlite"
+                else "to_char(date, 'YYYY-MM')"
+            )
+            + ", SUM(amount), COUNT(*) FROM expenses WHERE date IS NOT NULL "
+            "GROUP BY 1, 2, 3"
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("monthly_spend")
@@ -0,0 +1,67 @@
+"""add budget alerts
+
+Revision ID: b9e4f1a7c2d3
+Revises: e7a2d5c9b318
+Create Date: 2026-10-18 22:05:51.218734
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b9e4f1a7c2d3"
+down_revision: Union[str, Sequence[str], None] = "e7a2d5c9b318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "budgets",
+        sa.Column("spent", sa.Float(), nullable=False, server_default="0"),
+    )
+    # Seed the running totals: each budget sums the monthly rollup over its
+    # category and every category below it (same query as
+    # app.crud.spend.refresh_budget_spent).
+    op.execute(
+        """
+        WITH RECURSIVE tree(root_id, id) AS (
+            SELECT id, id FROM categories
+            UNION
+            SELECT tree.root_id, categories.id
+            FROM categories JOIN tree ON categories.parent_id = tree.id
+        )
+        UPDATE budgets SET spent = COALESCE((
+            SELECT SUM(monthly_spend.total)
+            FROM monthly_spend JOIN tree ON tree.id = monthly_spend.category_id
+            WHERE tree.root_id = budgets.category_id
+              AND monthly_spend.user_id = budgets.user_id
+              AND monthly_spend.period = budgets.time_period
+        ), 0)
+        """
+    )
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("topic", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_outbox_delivered_at_id", "outbox", ["delivered_at", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_outbox_delivered_at_id", table_name="outbox")
+    op.drop_table("outbox")
+    op.drop_column("budgets", "spent")
@@ -0,0 +1,64 @@
+"""add expense search
+
+Revision ID: c41f8e2b7a65
+Revises: 5d7c3a9e2f14
+Create Date: 2026-10-18 19:02:44.870215
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f8e2b7a65"
+down_revision: Union[str, Sequence[str], None] = "5d7c3a9e2f14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        # CONCURRENTLY would need autocommit_block(); a big table may want it
+        op.execute(
+            "CREATE INDEX ix_expenses_search ON expenses USING gin "
+            "((to_tsvector('simple', coalesce(name, '') || ' ' || "
+            "coalesce(description, ''))))"
+        )
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE expenses_fts USING fts5("
+        "name, description, content='expenses', content_rowid='id', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER expenses_fts_insert AFTER INSERT ON expenses "
+        "BEGIN INSERT INTO expenses_fts (rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END"
+    )
+    op.execute(
+        "CREATE TRIGGER expenses_fts_delete AFTER DELETE ON expenses "
+        "BEGIN INSERT INTO expenses_fts (expenses_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); END"
+    )
+    op.execute(
+        "CREATE TRIGGER expenses_fts_update "
+        "AFTER UPDATE OF name, description ON expenses "
+        "BEGIN INSERT INTO expenses_fts (expenses_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        "INSERT INTO expenses_fts (rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END"
+    )
+    # Index the rows that already exist
+    op.execute("INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_expenses_search", table_name="expenses")
+        return
+    op.execute("DROP TRIGGER expenses_fts_update")
+    op.execute("DROP TRIGGER expenses_fts_delete")
+    op.execute("DROP TRIGGER expenses_fts_insert")
+    op.execute("DROP TABLE expenses_fts")
@@ -0,0 +1,29 @@
+"""add outbox claims
+
+Revision ID: d7e3a1c94f25
+Revises: b9e4f1a7c2d3
+Create Date: 2026-10-18 18:40:12.503187
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d7e3a1c94f25"
+down_revision: Union[str, Sequence[str], None] = "b9e4f1a7c2d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("outbox", sa.Column("claimed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("outbox", "claimed_at")
@@ -0,0 +1,96 @@
+# app/api/async_routes.py
+"""The data routes of ``app.api.routes`` on AsyncSession, for ``DB_ASYNC``.
+
+No handler is redefined here. Each one in ``ASYNC_ENDPOINTS`` is wrapped so
+the whole handler runs through ``AsyncSession.run_sync``: the ORM code
+executes in a greenlet on the asyncio connection, so no thread is held while
+waiting on the database. Paths, parameters and responses are the sync
+routes' own; ``app.main`` swaps these in and keeps the sync router for the
+rest (auth, bulk import/export, batch, debug).
+"""
+
+import functools
+import inspect
+
+from fastapi import APIRouter, Depends
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import routes
+from app.db.session import (get_async_db, get_async_read_db, get_db,
+                            get_read_db)
+
+# Session dependency of the sync handlers -> its AsyncSession counterpart
+SESSIONS = {get_db: get_async_db, get_read_db: get_async_read_db}
+
+
+def on_async_session(handler):
+    """``handler`` as an async endpoint taking an AsyncSession for its Session.
+
+    Its ``get_current_user`` dependency is swapped for the wrapped one too, so
+    a request resolves the caller and the data on the same AsyncSession.
+    """
+    signature = inspect.signature(handler)
+    session = None
+    parameters = []
+    for parameter in signature.parameters.values():
+        dependency = getattr(parameter.default, "dependency", None)
+        if dependency in SESSIONS:
+            session = parameter.name
+            parameter = parameter.replace(
+                annotation=AsyncSession, default=Depends(SESSIONS[dependency])
+            )
+        elif dependency is routes.get_current_user:
+            parameter = parameter.replace(default=Depends(get_current_user))
+        parameters.append(parameter)
+
+    async def endpoint(**kwargs):
+        db = kwargs.pop(session)
+        return await db.run_sync(
+            lambda sync_db: handler(**kwargs, **{session: sync_db})
+        )
+
+    functools.update_wrapper(endpoint, handler)
+    endpoint.__signature__ = signature.replace(parameters=parameters)
+    return endpoint
+
+
+get_current_user = on_async_session(routes.get_current_user)
+
+ASYNC_ENDPOINTS = {
+    routes.create_category_view,
+    routes.get_categories_view,
+    routes.update_category_view,
+    routes.delete_category_view,
+    routes.create_expense,
+    routes.list_expenses,
+    routes.search_expenses,
+    routes.get_expense,
+    routes.update_expense,
+    routes.delete_expense,
+    routes.set_expense_schedule,
+    routes.get_expense_schedule,
+    routes.delete_expense_schedule,
+    routes.create_budget,
+    routes.list_budgets,
+    routes.list_budget_status,
+    routes.get_budget,
+    routes.update_budget,
+    routes.delete_budget,
+    routes.spending_report,
+    routes.trends_report,
+    routes.sync_changes,
+}
+
+router = APIRouter()
+for route in routes.router.routes:
+    if isinstance(route, APIRoute) and route.endpoint in ASYNC_ENDPOINTS:
+        router.add_api_route(
+            route.path,
+            on_async_session(route.endpoint),
+            methods=route.methods,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            name=route.name,
+        )
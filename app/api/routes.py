@@ -1,12 +1,28 @@
 # app/api/routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import zlib
+from datetime import datetime
+from typing import Optional
+
+import anyio
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
+                     Response, status)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from app.core.jwt import create_access_token, decode_access_token
-from app.crud import budgets, categories, expenses, users
-from app.db.session import get_db
+from app.core.pagination import (decode_cursor, decode_search_cursor,
+                                 decode_sync_token, encode_cursor,
+                                 encode_search_cursor, encode_sync_token)
+from app.core.principal_cache import Principal, principal_cache
+from app.core.security import PasswordHasherBusy
+from app.core.settings import settings
+from app.crud import (batch, budgets, categories, expenses, recurring, reports,
+                      sync, users, versions)
+from app.db.session import (BatchSession, ReadSessionLocal, get_batch_db,
+                            get_db, get_read_db, pool_metrics)
 from app.models.category import Category
 from app.models.user import User
 from app.schemas.pydantic import *
@@ -21,38 +37,109 @@ oauth2_scheme = HTTPBearer()
 
 @router.post("/signup", response_model=UserOut, tags=["Auth"])
 def signup(user_in: UserCreate, db: Session = Depends(get_db)):
-    user = users.create_user(db, user_in, role_name=user_in.role or "user")
+    try:
+        user = users.create_user(db, user_in, role_name=user_in.role or "user")
+    except PasswordHasherBusy:
+        raise hasher_busy()
     user.role = user.role.name
     return user
 
 
 @router.post("/login", response_model=Token, tags=["Auth"])
 def login(data: UserCreate, db: Session = Depends(get_db)):
-    user = users.authenticate_user(db, data.email, data.password)
+    try:
+        user = users.authenticate_user(db, data.email, data.password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
     if not user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
-    token = create_access_token({"sub": user.email})
+    token = create_access_token(
+        {"sub": user.email, "uid": user.id, "role": user.role.name.value}
+    )
     return {"access_token": token, "token_type": "bearer"}
 
 
 # ========== UTILITY ==========
 
 
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent sign-ins, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def list_etag(
+    request: Request, response: Response, user_id: int, version: int
+) -> Optional[Response]:
+    """Tag a list response with the user's data version; 304 if the client has it.
+
+    Returns the 304 to send, or None after putting the ETag on ``response``.
+    Callers read the version before the rows, so a concurrent write can only
+    make the tag older than the data (a spare refetch), never newer.
+    """
+    # The query string is part of the tag so pages and filters never share one
+    query = zlib.crc32(request.url.query.encode())
+    etag = f'W/"{user_id}-{version}-{query:x}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in candidates or etag.removeprefix("W/") in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def rows_response(content, response: Response):
+    """Send DB rows already shaped like the route's response_model.
+
+    With ``FAST_SERIALIZATION`` they go straight to bytes through orjson,
+    skipping FastAPI's per-item re-validation of trusted data; otherwise they
+    take the usual response_model path. Headers set on ``response`` are kept.
+    """
+    if not settings.FAST_SERIALIZATION:
+        return content
+    return ORJSONResponse(content, headers=dict(response.headers))
+
+
+def sync_payload(changes: dict, state: tuple) -> dict:
+    """Body of GET /sync from ``sync.get_changes`` output."""
+    payload = {
+        resource: [row._asdict() for row in rows]
+        for resource, rows in changes.items()
+        if resource != "deleted"
+    }
+    payload["deleted"] = changes["deleted"]
+    payload["token"] = encode_sync_token(*state)
+    return payload
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
     token = credentials.credentials  # ✅ Extract actual token string
     try:
         payload = decode_access_token(token)
-        user = users.get_user_by_email(db, payload["sub"])
-        if not user:
+        principal = principal_cache.get(payload.get("uid"))
+        if principal:
+            return principal
+        principal = users.get_principal(db, payload)
+        if not principal:
             raise Exception()
-        return user
+        principal_cache.put(principal)
+        return principal
     except:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
 
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return current_user
+
+
 # ========== CATEGORIES ==========
 
 
@@ -60,15 +147,22 @@ def get_current_user(
 def create_category_view(
     data: CategoryIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     return categories.create_category(db, current_user.id, data)
 
 
 @router.get("/categories", response_model=list[CategoryOut], tags=["Categories"])
 def get_categories_view(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
+    version = versions.get_version(db, current_user.id, "categories")
+    not_modified = list_etag(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
     return categories.get_categories_by_user(db, current_user.id)
 
 
@@ -77,7 +171,7 @@ def update_category_view(
     cat_id: int,
     data: CategoryIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     return categories.update_category(db, cat_id, current_user.id, data)
 
@@ -86,7 +180,7 @@ def update_category_view(
 def delete_category_view(
     cat_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     return categories.delete_category(db, cat_id, current_user.id)
 
@@ -96,23 +190,142 @@ def delete_category_view(
 def create_expense(
     data: ExpenseIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     return expenses.create_expense(db, current_user.id, data)
 
 
-@router.get("/expenses", response_model=list[ExpenseOut], tags=["Expenses"])
+def expense_filters(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    is_recurring: Optional[bool] = None,
+) -> dict:
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "category_id": category_id,
+        "min_amount": min_amount,
+        "max_amount": max_amount,
+        "is_recurring": is_recurring,
+    }
+
+
+@router.get("/expenses", response_model=ExpensePage, tags=["Expenses"])
 def list_expenses(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    filters: dict = Depends(expense_filters),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    version = versions.get_version(db, current_user.id, "expenses")
+    not_modified = list_etag(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    items, next_key = expenses.get_expenses_page(
+        db, current_user.id, limit, after=after, **filters
+    )
+    page = {
+        "items": [row._asdict() for row in items],
+        "next_cursor": encode_cursor(*next_key) if next_key else None,
+    }
+    return rows_response(page, response)
+
+
+@router.get("/expenses/search", response_model=ExpensePage, tags=["Expenses"])
+def search_expenses(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    try:
+        after = decode_search_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    version = versions.get_version(db, current_user.id, "expenses")
+    not_modified = list_etag(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    items, next_key = expenses.search_expenses(
+        db, current_user.id, q, limit, after=after
+    )
+    page = {
+        "items": items,
+        "next_cursor": encode_search_cursor(*next_key) if next_key else None,
+    }
+    return rows_response(page, response)
+
+
+@router.get("/expenses/export", tags=["Expenses"])
+def export_expenses(
+    format: ExpenseFileFormat = "csv",
+    filters: dict = Depends(expense_filters),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return expenses.get_expenses_by_user(db, current_user.id)
+    def body():
+        # The request's get_db session is closed before the body streams,
+        # so the export holds its own for as long as the cursor is open.
+        db = ReadSessionLocal()
+        try:
+            yield from expenses.export_expenses(db, current_user.id, format, **filters)
+        finally:
+            db.close()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="expenses.{format}"'},
+    )
+
+
+@router.post("/expenses/import", response_model=ImportReport, tags=["Expenses"])
+async def import_expenses(
+    request: Request,
+    format: Optional[ExpenseFileFormat] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    stream = request.stream()
+
+    async def next_chunk():
+        return await stream.__anext__()
+
+    def body():
+        # Pull the upload chunk by chunk from the event loop while the
+        # parsing and inserts run on a worker thread.
+        while True:
+            try:
+                yield anyio.from_thread.run(next_chunk)
+            except StopAsyncIteration:
+                return
+
+    return await run_in_threadpool(
+        expenses.import_expenses, db, current_user.id, body(), format
+    )
 
 
 @router.get("/expenses/{expense_id}", response_model=ExpenseOut, tags=["Expenses"])
 def get_expense(
     expense_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     expense = expenses.get_expense_by_id(db, expense_id, current_user.id)
     if not expense:
@@ -125,7 +338,7 @@ def update_expense(
     expense_id: int,
     data: ExpenseIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     expense = expenses.update_expense(db, expense_id, current_user.id, data)
     if not expense:
@@ -137,7 +350,7 @@ def update_expense(
 def delete_expense(
     expense_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     success = expenses.delete_expense(db, expense_id, current_user.id)
     if not success:
@@ -145,6 +358,51 @@ def delete_expense(
     return {"message": "Expense deleted"}
 
 
+@router.put(
+    "/expenses/{expense_id}/schedule",
+    response_model=RecurrenceOut,
+    tags=["Expenses"],
+)
+def set_expense_schedule(
+    expense_id: int,
+    data: RecurrenceIn,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    schedule = recurring.set_schedule(db, expense_id, current_user.id, data)
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    return schedule
+
+
+@router.get(
+    "/expenses/{expense_id}/schedule",
+    response_model=RecurrenceOut,
+    tags=["Expenses"],
+)
+def get_expense_schedule(
+    expense_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    schedule = recurring.get_schedule(db, expense_id, current_user.id)
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return schedule
+
+
+@router.delete("/expenses/{expense_id}/schedule", tags=["Expenses"])
+def delete_expense_schedule(
+    expense_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    success = recurring.delete_schedule(db, expense_id, current_user.id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {"message": "Schedule deleted"}
+
+
 # ================Budgets=================================
 
 
@@ -152,23 +410,40 @@ def delete_expense(
 def create_budget(
     data: BudgetIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     return budgets.create_budget(db, current_user.id, data)
 
 
 @router.get("/budgets", response_model=list[BudgetOut], tags=["Budgets"])
 def list_budgets(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    version = versions.get_version(db, current_user.id, "budgets")
+    not_modified = list_etag(request, response, current_user.id, version)
+    if not_modified:
+        return not_modified
+    rows = budgets.get_budgets_by_user(db, current_user.id)
+    return rows_response([row._asdict() for row in rows], response)
+
+
+@router.get("/budgets/status", response_model=list[BudgetStatus], tags=["Budgets"])
+def list_budget_status(
+    time_period: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return budgets.get_budgets_by_user(db, current_user.id)
+    return budgets.get_budget_status(db, current_user.id, time_period)
 
 
 @router.get("/budgets/{budget_id}", response_model=BudgetOut, tags=["Budgets"])
 def get_budget(
     budget_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     budget = budgets.get_budget_by_id(db, budget_id, current_user.id)
     if not budget:
@@ -181,7 +456,7 @@ def update_budget(
     budget_id: int,
     data: BudgetIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     budget = budgets.update_budget(db, budget_id, current_user.id, data)
     if not budget:
@@ -193,7 +468,7 @@ def update_budget(
 def delete_budget(
     budget_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     success = budgets.delete_budget(db, budget_id, current_user.id)
     if not success:
@@ -201,11 +476,105 @@ def delete_budget(
     return {"message": "Budget deleted"}
 
 
+# ================Reports=================================
+
+
+@router.get("/reports/spending", response_model=list[SpendingRow], tags=["Reports"])
+def spending_report(
+    group_by: list[SpendingGroup] = Query(["category"]),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    rollup: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    return reports.get_spending(
+        db,
+        current_user.id,
+        group_by=group_by,
+        date_from=date_from,
+        date_to=date_to,
+        rollup=rollup,
+    )
+
+
+@router.get("/reports/trends", response_model=list[CategoryTrend], tags=["Reports"])
+def trends_report(
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    months: int = Query(12, ge=2, le=120),
+    window: int = Query(3, ge=2, le=24),
+    sigmas: float = Query(2.0, gt=0),
+    rollup: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if reports.np is None:
+        raise HTTPException(status_code=501, detail="Trend reports need numpy")
+    return reports.get_trends(
+        db,
+        current_user.id,
+        end=end,
+        months=months,
+        window=window,
+        sigmas=sigmas,
+        rollup=rollup,
+    )
+
+
+# ================Batch=================================
+
+
+@router.post("/batch", response_model=BatchOut, tags=["Batch"])
+def run_batch_view(
+    data: BatchIn,
+    response: Response,
+    db: BatchSession = Depends(get_batch_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    outcome = batch.run_batch(db, current_user.id, data.operations)
+    if not outcome["committed"]:
+        # Answer with the status of the operation that failed
+        failed = next(result for result in outcome["results"] if "error" in result)
+        response.status_code = failed["status"]
+    return outcome
+
+
+# ================Sync=================================
+
+
+@router.get("/sync", response_model=SyncOut, tags=["Sync"])
+def sync_changes(
+    response: Response,
+    since: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    try:
+        token = decode_sync_token(since) if since else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    changes, state = sync.get_changes(db, current_user.id, token)
+    return rows_response(sync_payload(changes, state), response)
+
+
+# ================Admin=================================
+
+
+@router.get("/admin/metrics/pool", tags=["Admin"])
+def pool_metrics_view(admin: Principal = Depends(require_admin)):
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+
 @router.get("/debug/users", tags=["Debug"])
 def get_all_users_debug(db: Session = Depends(get_db)):
     return db.query(User).all()
 
 
+@router.get("/debug/auth-cache", tags=["Debug"])
+def auth_cache_stats():
+    return principal_cache.stats()
+
+
 @router.get("/debug/categories", tags=["Debug"])
 def view_all_categories(db: Session = Depends(get_db)):
     return db.query(Category).all()
@@ -0,0 +1,130 @@
+# app/cli.py
+"""Operational commands, run as ``python -m app.cli <command>``."""
+
+import argparse
+from datetime import timedelta
+
+from app.core.settings import settings
+from app.crud.outbox import deliver_pending, prune_outbox
+from app.crud.recurring import materialize_due
+from app.crud.spend import rebuild_monthly_spend
+from app.crud.sync import prune_tombstones
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.models import (budget, category, data_version, expense,  # noqa: F401
+                        monthly_spend, outbox, recurring_schedule, role,
+                        tombstone, user)
+
+
+def init_database(args):
+    if init_db():
+        # Tables came from the models, so mark the migrations as applied
+        from alembic import command
+        from alembic.config import Config
+
+        config = Config(args.alembic_config)
+        config.set_main_option(
+            "sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%")
+        )
+        command.stamp(config, "head")
+        print("schema created and stamped at alembic head; roles seeded")
+    else:
+        print("schema present (run `alembic upgrade head` to migrate); roles seeded")
+
+
+def rebuild_rollups(args):
+    db = SessionLocal()
+    try:
+        rebuild_monthly_spend(db, user_id=args.user_id)
+    finally:
+        db.close()
+    print("monthly_spend rebuilt")
+
+
+def prune_deleted(args):
+    db = SessionLocal()
+    try:
+        removed = prune_tombstones(db, timedelta(days=args.days))
+    finally:
+        db.close()
+    print(f"{removed} tombstones older than {args.days} days removed")
+
+
+def materialize_recurring(args):
+    db = SessionLocal()
+    try:
+        stats = materialize_due(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    print(
+        f"{stats['occurrences']} occurrences generated "
+        f"from {stats['schedules']} due schedules"
+    )
+
+
+def deliver_outbox(args):
+    db = SessionLocal()
+    try:
+        stats = deliver_pending(db)
+    finally:
+        db.close()
+    print(f"{stats['delivered']} messages delivered, {stats['failed']} failed")
+
+
+def prune_delivered(args):
+    db = SessionLocal()
+    try:
+        removed = prune_outbox(db, timedelta(days=args.days))
+    finally:
+        db.close()
+    print(f"{removed} messages delivered over {args.days} days ago removed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init = commands.add_parser(
+        "init-db", help="create missing tables and seed roles (once per deployment)"
+    )
+    init.add_argument("--alembic-config", default="alembic.ini")
+    init.set_defaults(func=init_database)
+
+    rebuild = commands.add_parser(
+        "rebuild-rollups", help="recompute monthly_spend from the expenses table"
+    )
+    rebuild.add_argument("--user-id", type=int, default=None)
+    rebuild.set_defaults(func=rebuild_rollups)
+
+    prune = commands.add_parser(
+        "prune-tombstones", help="forget deletes older than the sync token lifetime"
+    )
+    prune.add_argument(
+        "--days", type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    )
+    prune.set_defaults(func=prune_deleted)
+
+    materialize = commands.add_parser(
+        "materialize-recurring",
+        help="generate the recurring expenses due by now (safe to rerun)",
+    )
+    materialize.add_argument("--chunk-size", type=int, default=1000)
+    materialize.set_defaults(func=materialize_recurring)
+
+    deliver = commands.add_parser(
+        "deliver-outbox", help="send the queued budget alerts (safe to rerun)"
+    )
+    deliver.set_defaults(func=deliver_outbox)
+
+    prune_sent = commands.add_parser(
+        "prune-outbox", help="forget budget alerts delivered long ago"
+    )
+    prune_sent.add_argument("--days", type=int, default=7)
+    prune_sent.set_defaults(func=prune_delivered)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# app/core/clock.py
+"""Timestamps the way the database holds them: naive, in UTC.
+
+The ``DateTime`` columns carry no timezone. psycopg2 sends an aware value
+as ``timestamptz``, which PostgreSQL turns into the server's local time
+before comparing or storing it, so an aware value is off by the server's
+UTC offset. Make every datetime naive UTC before it reaches a query.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def naive_utc(date: Optional[datetime]) -> Optional[datetime]:
+    """``date`` as naive UTC; naive values are taken to be UTC already."""
+    if date is None or date.tzinfo is None:
+        return date
+    return date.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,41 @@
+# app/core/notifications.py
+"""Delivery of outbox messages to the outside world.
+
+A message goes to ``ALERT_WEBHOOK_URL`` as a JSON POST, or to the log when
+no webhook is configured. ``send`` raises on any failure so the outbox
+keeps the message for the next attempt.
+"""
+
+import json
+import logging
+import urllib.request
+
+from app.core.settings import settings
+
+WEBHOOK_TIMEOUT_SECONDS = 5.0
+
+logger = logging.getLogger("app.notifications")
+
+
+def send(message: dict):
+    """Deliver one message (id, user_id, topic, payload, created_at).
+
+    Delivery is at least once, so receivers should drop repeated ids.
+    """
+    if not settings.ALERT_WEBHOOK_URL:
+        logger.info(
+            "%s for user %s: %s",
+            message["topic"],
+            message["user_id"],
+            message["payload"],
+        )
+        return
+    request = urllib.request.Request(
+        settings.ALERT_WEBHOOK_URL,
+        data=json.dumps(message, default=str).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    # Non-2xx responses raise HTTPError
+    with urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT_SECONDS) as response:
+        response.read()
@@ -0,0 +1,62 @@
+# app/core/pagination.py
+
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def encode_cursor(date: Optional[datetime], item_id: int) -> str:
+    raw = json.dumps(
+        {"d": date.isoformat() if date else None, "i": item_id},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        date = payload["d"] and datetime.fromisoformat(payload["d"])
+        return date or None, int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def encode_sync_token(changed_at: datetime, versions: dict[str, int]) -> str:
+    if changed_at.tzinfo is None:
+        # Stored times are naive UTC; the token says so explicitly
+        changed_at = changed_at.replace(tzinfo=timezone.utc)
+    raw = json.dumps(
+        {"t": changed_at.isoformat(), "v": versions}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> tuple[datetime, dict[str, int]]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        changed_at = datetime.fromisoformat(payload["t"])
+        versions = {str(k): int(v) for k, v in payload["v"].items()}
+        if changed_at.tzinfo is None:
+            raise ValueError("naive timestamp")
+        return changed_at, versions
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise ValueError("Invalid sync token")
+
+
+def encode_search_cursor(score: Optional[float], item_id: int) -> str:
+    raw = json.dumps({"s": score, "i": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[Optional[float], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        score = payload["s"]
+        return None if score is None else float(score), int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
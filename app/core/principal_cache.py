@@ -0,0 +1,106 @@
+# app/core/principal_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, inspect
+
+from app.core.settings import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, detached from any database session."""
+
+    id: int
+    email: str
+    role: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, role=user.role.name.value)
+
+
+class PrincipalCache:
+    """Thread-safe LRU of principals keyed by user id, with a per-entry TTL.
+
+    The TTL is the revocation bound: a role, password or email change, or a
+    deleted user, can keep authenticating for up to ``ttl_seconds``. The
+    listeners below evict sooner, but only for ORM flushes in this process;
+    Core bulk UPDATE/DELETE and other workers never reach them.
+
+    Entries are keyed by the token's ``uid`` claim. Tokens issued without one
+    miss every time and are resolved from the database on each request.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Optional[int]) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, principal: Principal):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            expires = time.monotonic() + self.ttl_seconds
+            self._entries[principal.id] = (expires, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+principal_cache = PrincipalCache(
+    settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_credential_change(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if (
+        attrs.role_id.history.has_changes()
+        or attrs.hashed_password.history.has_changes()
+        or attrs.email.history.has_changes()
+    ):
+        principal_cache.invalidate(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    principal_cache.invalidate(target.id)
@@ -1,13 +1,84 @@
 # app/core/security.py
 
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.settings import settings
 
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
-def hash_password(password: str) -> str:
+
+class PasswordHasherBusy(Exception):
+    """Raised when no hashing slot frees up within the queue timeout."""
+
+
+# bcrypt is CPU-bound and holds the GIL for its whole run, so the work is
+# shipped to a small process pool. The semaphore caps running + queued jobs;
+# callers that cannot get a slot within PASSWORD_HASH_QUEUE_TIMEOUT fail fast
+# instead of piling up in the request threadpool that ordinary reads need.
+_slots = threading.BoundedSemaphore(
+    max(1, settings.PASSWORD_HASH_WORKERS) + settings.PASSWORD_HASH_MAX_QUEUED
+)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _run(fn, *args):
+    if not _slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise PasswordHasherBusy()
+    try:
+        pool = _get_pool()
+        if pool is None:
+            return fn(*args)
+        return pool.submit(fn, *args).result()
+    finally:
+        _slots.release()
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _verify_and_update(plain_password: str, hashed_password: str):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    return _run(_hash, password)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update(plain_password, hashed_password)[0]
+
+
+def verify_and_update(plain_password: str, hashed_password: str):
+    """Return ``(ok, new_hash)``; ``new_hash`` is set when the stored hash
+    uses outdated parameters and should be replaced."""
+    return _run(_verify_and_update, plain_password, hashed_password)
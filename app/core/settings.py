@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -5,6 +7,68 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     JWT_SECRET: str
 
+    # Authenticated-principal cache (get_current_user); TTL 0 disables it.
+    # Also how long a revoked user or role change can still authenticate.
+    AUTH_CACHE_TTL_SECONDS: float = 10.0
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+
+    # bcrypt cost and the process pool it runs on; 0 workers hashes inline
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUED: int = 8
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 1.0
+
+    # Connection pool per worker (ignored for SQLite); recycle -1 never recycles
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+
+    # Read replicas for the GET routes (JSON list in the environment), taken
+    # in turn; one that fails is skipped for DB_REPLICA_RETRY_SECONDS
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+
+    # Create missing tables and seed roles in the lifespan hook instead of
+    # running ``python -m app.cli init-db`` once per deployment
+    DB_INIT_ON_STARTUP: bool = False
+
+    # Serve the data routes from AsyncSession handlers (asyncpg / aiosqlite)
+    DB_ASYNC: bool = False
+
+    # Encode list responses straight from DB rows with orjson, skipping the
+    # response_model re-validation; false falls back to the pydantic path
+    FAST_SERIALIZATION: bool = True
+
+    # How long deletes are remembered for GET /sync; older tokens get a 410
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90
+
+    # Run the recurring-expense job every N seconds in each worker (the
+    # workers split the due schedules); 0 leaves it to
+    # ``python -m app.cli materialize-recurring`` from cron
+    RECURRING_JOB_INTERVAL_SECONDS: float = 0
+
+    # Percent-of-limit marks that raise a budget alert when an expense write
+    # crosses them (JSON list in the environment); [] turns alerts off
+    BUDGET_ALERT_THRESHOLDS: list[float] = [80, 100]
+
+    # Queued alerts are POSTed as JSON to this URL, or only logged when unset
+    ALERT_WEBHOOK_URL: Optional[str] = None
+
+    # Deliver queued alerts every N seconds in this worker; set it on one
+    # worker (several split the queue, but need not all poll it), or leave
+    # 0 and run ``python -m app.cli deliver-outbox`` from cron.
+    # A message that failed this many times stays queued but is not retried
+    OUTBOX_JOB_INTERVAL_SECONDS: float = 0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    # A run's claim on its batch expires after this long, in case it died
+    # mid-send; keep it above a batch's worst case (100 x the 5 s timeout)
+    OUTBOX_CLAIM_SECONDS: float = 600
+
+    # Log requests slower than this (ms) with their SQL statements; 0 disables
+    SLOW_REQUEST_MS: float = 0
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,255 @@
+# app/core/telemetry.py
+"""Per-route request telemetry: latency, DB time, SQL statements and rows.
+
+``TelemetryMiddleware`` opens a ``RequestStats`` for every HTTP request in a
+context variable; the SQLAlchemy hooks installed by ``instrument_queries``
+add to it from whichever thread or greenlet runs the query. When the request
+finishes its numbers are folded into the route template's ``RouteMetrics``,
+rendered in Prometheus text format by ``render_prometheus``.
+"""
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.settings import settings
+
+logger = logging.getLogger("app.telemetry")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+# N+1 heuristic: enough samples, and at least this many extra statements per
+# extra ORM object loaded, with the statement count actually growing
+N_PLUS_ONE_MIN_SAMPLES = 20
+N_PLUS_ONE_MIN_SLOPE = 0.5
+N_PLUS_ONE_MIN_STATEMENTS = 10
+
+MAX_LOGGED_STATEMENTS = 200
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_time", "rows", "objects", "sql", "_started")
+
+    def __init__(self, capture_sql: bool):
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.objects = 0
+        self.sql: Optional[list] = [] if capture_sql else None
+        self._started: dict = {}
+
+
+current_request: contextvars.ContextVar[Optional[RequestStats]] = (
+    contextvars.ContextVar("current_request", default=None)
+)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.rows = 0
+        self.objects = 0
+        self.max_statements = 0
+        # Running sums for a least-squares fit of statements on objects loaded
+        self._n = self._sx = self._sy = self._sxy = self._sxx = 0.0
+
+    def observe(self, seconds: float, stats: RequestStats):
+        self.latency.observe(seconds)
+        self.db_time.observe(stats.db_time)
+        self.statements.observe(stats.statements)
+        self.rows += stats.rows
+        self.objects += stats.objects
+        self.max_statements = max(self.max_statements, stats.statements)
+        x, y = stats.objects, stats.statements
+        self._n += 1
+        self._sx += x
+        self._sy += y
+        self._sxy += x * y
+        self._sxx += x * x
+
+    @property
+    def statements_per_object(self) -> float:
+        denominator = self._n * self._sxx - self._sx * self._sx
+        if not denominator:
+            return 0.0
+        return (self._n * self._sxy - self._sx * self._sy) / denominator
+
+    @property
+    def n_plus_one(self) -> bool:
+        return (
+            self._n >= N_PLUS_ONE_MIN_SAMPLES
+            and self.max_statements >= N_PLUS_ONE_MIN_STATEMENTS
+            and self.statements_per_object >= N_PLUS_ONE_MIN_SLOPE
+        )
+
+
+_routes: dict = {}
+_routes_lock = threading.Lock()
+_flagged: set = set()
+
+
+def record(method: str, route: str, seconds: float, stats: RequestStats):
+    with _routes_lock:
+        metrics = _routes.setdefault((method, route), RouteMetrics())
+        metrics.observe(seconds, stats)
+        newly_flagged = metrics.n_plus_one and (method, route) not in _flagged
+        if newly_flagged:
+            _flagged.add((method, route))
+    if newly_flagged:
+        logger.warning(
+            "possible N+1 on %s %s: %.2f statements per ORM object loaded",
+            method,
+            route,
+            metrics.statements_per_object,
+        )
+    if stats.sql is not None and seconds * 1000 >= settings.SLOW_REQUEST_MS:
+        logger.warning(
+            "slow request %s %s: %.1f ms, %d statements, %.1f ms in DB\n%s",
+            method,
+            route,
+            seconds * 1000,
+            stats.statements,
+            stats.db_time * 1000,
+            "\n".join(stats.sql),
+        )
+
+
+def reset():
+    with _routes_lock:
+        _routes.clear()
+        _flagged.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram):
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+    cumulative += histogram.counts[-1]
+    yield f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+    yield f"{name}_sum{{{labels}}} {histogram.sum}"
+    yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+def render_prometheus() -> str:
+    families = {
+        "http_request_duration_seconds": ("histogram", "Request latency"),
+        "http_request_db_seconds": ("histogram", "Time spent in SQL"),
+        "http_request_sql_statements": ("histogram", "SQL statements per request"),
+        "http_request_db_rows_total": ("counter", "Rows reported by the driver"),
+        "http_request_orm_objects_total": ("counter", "ORM objects loaded"),
+        "http_route_n_plus_one": ("gauge", "1 when statements grow with results"),
+    }
+    lines = {name: [] for name in families}
+    with _routes_lock:
+        for (method, route), metrics in sorted(_routes.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            lines["http_request_duration_seconds"].extend(
+                _histogram_lines(
+                    "http_request_duration_seconds", labels, metrics.latency
+                )
+            )
+            lines["http_request_db_seconds"].extend(
+                _histogram_lines("http_request_db_seconds", labels, metrics.db_time)
+            )
+            lines["http_request_sql_statements"].extend(
+                _histogram_lines(
+                    "http_request_sql_statements", labels, metrics.statements
+                )
+            )
+            lines["http_request_db_rows_total"].append(
+                f"http_request_db_rows_total{{{labels}}} {metrics.rows}"
+            )
+            lines["http_request_orm_objects_total"].append(
+                f"http_request_orm_objects_total{{{labels}}} {metrics.objects}"
+            )
+            lines["http_route_n_plus_one"].append(
+                f"http_route_n_plus_one{{{labels}}} {int(metrics.n_plus_one)}"
+            )
+    out = []
+    for name, (kind, help_text) in families.items():
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(lines[name])
+    return "\n".join(out) + "\n"
+
+
+class TelemetryMiddleware:
+    """Pure ASGI middleware timing each request against its route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats(capture_sql=settings.SLOW_REQUEST_MS > 0)
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            record(scope["method"], template, time.perf_counter() - start, stats)
+
+
+def instrument_queries(engine, base=None):
+    """Count statements, DB time and rows on ``engine``; ORM loads on ``base``.
+
+    Rows are the DBAPI ``rowcount``: affected rows for DML, and for SELECT
+    only on drivers that buffer results (psycopg2); SQLite reports -1.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        stats = current_request.get()
+        if stats is not None:
+            stats._started[id(cursor)] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        stats = current_request.get()
+        if stats is None:
+            return
+        started = stats._started.pop(id(cursor), None)
+        elapsed = time.perf_counter() - started if started else 0.0
+        stats.statements += 1
+        stats.db_time += elapsed
+        if cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+        if stats.sql is not None and len(stats.sql) < MAX_LOGGED_STATEMENTS:
+            stats.sql.append(f"  [{elapsed * 1000:.2f} ms] {statement[:500]}")
+
+    if base is None:
+        return
+
+    @event.listens_for(base, "load", propagate=True)
+    def on_load(target, context):
+        stats = current_request.get()
+        if stats is not None:
+            stats.objects += 1
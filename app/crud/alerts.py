@@ -0,0 +1,85 @@
+# app/crud/alerts.py
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.crud.outbox import enqueue
+from app.crud.spend import category_and_ancestors
+from app.models.budget import Budget
+
+BUDGET_ALERT_TOPIC = "budget.threshold"
+
+
+def check_budget_alerts(
+    db: Session,
+    user_id: int,
+    changes: Iterable[tuple[int, Optional[datetime], float]],
+):
+    """Queue an alert for each budget a write just pushed over a threshold.
+
+    ``changes`` are the ``(category_id, date, amount)`` spend the write added
+    (negative amounts for spend it removed), already applied to the budgets'
+    running totals by ``app.crud.spend``. Each change reads only the budgets
+    of its category and the categories above it for its month, through the
+    ``(user_id, time_period, category_id)`` index, so the check costs the
+    same however many expenses the month holds. The spend before the write
+    is the running total minus the write's net change, and a budget gets one
+    alert for the highest ``BUDGET_ALERT_THRESHOLDS`` mark crossed upwards.
+    Runs in the caller's transaction; delivery happens later, off the outbox.
+    """
+    thresholds = sorted(settings.BUDGET_ALERT_THRESHOLDS)
+    if not thresholds:
+        return
+    # Net the changes per category and month first: an edit that keeps both
+    # costs one read, or none when the amount is unchanged
+    deltas: dict = {}
+    for category_id, date, amount in changes:
+        if date is not None:
+            key = (category_id, f"{date:%Y-%m}")
+            deltas[key] = deltas.get(key, 0.0) + amount
+    moved: dict = {}
+    for (category_id, period), amount in deltas.items():
+        if not amount:
+            continue
+        rows = db.execute(
+            select(
+                Budget.id,
+                Budget.category_id,
+                Budget.time_period,
+                Budget.amount_limit,
+                Budget.spent,
+            ).where(
+                Budget.user_id == user_id,
+                Budget.time_period == period,
+                Budget.category_id.in_(category_and_ancestors(category_id)),
+            )
+        )
+        for budget in rows:
+            # Moving spend between two categories under one budget nets out
+            net = moved[budget.id][1] if budget.id in moved else 0.0
+            moved[budget.id] = (budget, net + amount)
+    for budget, net in moved.values():
+        if net <= 0 or budget.amount_limit <= 0:
+            continue
+        before = (budget.spent - net) / budget.amount_limit * 100
+        after = budget.spent / budget.amount_limit * 100
+        crossed = [mark for mark in thresholds if before < mark <= after]
+        if not crossed:
+            continue
+        enqueue(
+            db,
+            user_id,
+            BUDGET_ALERT_TOPIC,
+            {
+                "budget_id": budget.id,
+                "category_id": budget.category_id,
+                "time_period": budget.time_period,
+                "threshold": crossed[-1],
+                "amount_limit": budget.amount_limit,
+                "spent": budget.spent,
+            },
+        )
@@ -0,0 +1,98 @@
+# app/crud/batch.py
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from app.crud import budgets, categories, expenses
+from app.db.session import BatchSession
+from app.schemas.pydantic import (BatchOperation, BudgetIn, BudgetOut,
+                                  CategoryIn, CategoryOut, ExpenseIn,
+                                  ExpenseOut)
+
+# entity -> (input schema, output schema, create, update, delete, 404 detail)
+ENTITIES = {
+    "expense": (
+        ExpenseIn,
+        ExpenseOut,
+        expenses.create_expense,
+        expenses.update_expense,
+        expenses.delete_expense,
+        "Expense not found",
+    ),
+    "category": (
+        CategoryIn,
+        CategoryOut,
+        categories.create_category,
+        categories.update_category,
+        categories.delete_category,
+        "Category not found",
+    ),
+    "budget": (
+        BudgetIn,
+        BudgetOut,
+        budgets.create_budget,
+        budgets.update_budget,
+        budgets.delete_budget,
+        "Budget not found",
+    ),
+}
+
+
+def apply_operation(db: BatchSession, user_id: int, operation: BatchOperation):
+    """Run one operation through the single-item CRUD; returns the JSON result."""
+    schema_in, schema_out, create, update, delete, missing = ENTITIES[operation.entity]
+    if operation.op != "create" and operation.id is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="id is required for update and delete",
+        )
+    if operation.op == "delete":
+        result = delete(db, operation.id, user_id)
+    else:
+        data = schema_in.model_validate(operation.data or {})
+        if operation.op == "create":
+            result = create(db, user_id, data)
+        else:
+            result = update(db, operation.id, user_id, data)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=missing)
+    if operation.op == "delete":
+        return None
+    return schema_out.model_validate(result).model_dump(mode="json")
+
+
+def run_batch(db: BatchSession, user_id: int, operations: list[BatchOperation]):
+    """Apply ``operations`` in order in one transaction, committed once.
+
+    The first failing operation rolls the whole batch back; it reports its
+    own status and error, and every later operation is reported as 424.
+    """
+    results = []
+    for index, operation in enumerate(operations):
+        try:
+            result = apply_operation(db, user_id, operation)
+        except ValidationError as exc:
+            code = status.HTTP_422_UNPROCESSABLE_ENTITY
+            error = exc.errors(include_url=False, include_context=False)
+        except HTTPException as exc:
+            code, error = exc.status_code, exc.detail
+        except IntegrityError:
+            code = status.HTTP_409_CONFLICT
+            error = "Operation violates a database constraint"
+        else:
+            results.append({"index": index, "status": 200, "result": result})
+            continue
+        db.rollback()
+        results.append({"index": index, "status": code, "error": error})
+        results.extend(
+            {
+                "index": later,
+                "status": status.HTTP_424_FAILED_DEPENDENCY,
+                "error": f"Not applied: operation {index} failed",
+            }
+            for later in range(index + 1, len(operations))
+        )
+        return {"committed": False, "results": results}
+    db.commit_batch()
+    return {"committed": True, "results": results}
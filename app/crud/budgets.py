@@ -1,11 +1,25 @@
 # app/crud/budgets.py
 
+from typing import Optional
+
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
 
+from app.crud.spend import refresh_budget_spent
+from app.crud.versions import bump_version, record_tombstone
 from app.models.budget import Budget
 from app.schemas.pydantic import BudgetIn
 
 
+# Columns a BudgetOut is built from, in its field order
+BUDGET_COLUMNS = (
+    Budget.id,
+    Budget.category_id,
+    Budget.amount_limit,
+    Budget.time_period,
+)
+
+
 def create_budget(db: Session, user_id: int, data: BudgetIn):
     budget = Budget(
         category_id=data.category_id,
@@ -14,13 +28,43 @@ def create_budget(db: Session, user_id: int, data: BudgetIn):
         user_id=user_id,
     )
     db.add(budget)
+    db.flush()
+    refresh_budget_spent(db, user_id, budget.id)
+    bump_version(db, user_id, "budgets")
     db.commit()
     db.refresh(budget)
     return budget
 
 
 def get_budgets_by_user(db: Session, user_id: int):
-    return db.query(Budget).filter(Budget.user_id == user_id).all()
+    # Column rows shaped like BudgetOut, not ORM instances
+    return db.execute(select(*BUDGET_COLUMNS).where(Budget.user_id == user_id)).all()
+
+
+def get_budget_status(db: Session, user_id: int, time_period: Optional[str] = None):
+    """Spend against each budget, from the running total kept on the budget row.
+
+    That total covers the budget's category and all of its subcategories.
+    """
+    query = select(*BUDGET_COLUMNS, Budget.spent).where(Budget.user_id == user_id)
+    if time_period is not None:
+        query = query.where(Budget.time_period == time_period)
+    return [
+        {
+            "id": budget.id,
+            "category_id": budget.category_id,
+            "time_period": budget.time_period,
+            "amount_limit": budget.amount_limit,
+            "spent": budget.spent,
+            "remaining": budget.amount_limit - budget.spent,
+            "percent_used": (
+                budget.spent / budget.amount_limit * 100
+                if budget.amount_limit
+                else None
+            ),
+        }
+        for budget in db.execute(query)
+    ]
 
 
 def get_budget_by_id(db: Session, budget_id: int, user_id: int):
@@ -32,20 +76,39 @@ def get_budget_by_id(db: Session, budget_id: int, user_id: int):
 
 
 def update_budget(db: Session, budget_id: int, user_id: int, data: BudgetIn):
-    budget = get_budget_by_id(db, budget_id, user_id)
-    if not budget:
+    """Ownership-scoped UPDATE (.. RETURNING); returns the row as a dict or None."""
+    stmt = (
+        update(Budget)
+        .where(Budget.id == budget_id, Budget.user_id == user_id)
+        .values(**data.model_dump())
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.full_returning:
+        row = db.execute(stmt.returning(*BUDGET_COLUMNS)).first()
+        budget = dict(row._mapping) if row else None
+    else:
+        # Every returned column is known up front; rowcount says if it matched
+        matched = db.execute(stmt).rowcount
+        budget = {"id": budget_id, **data.model_dump()} if matched else None
+    if budget is None:
         return None
-    for attr, value in data.dict().items():
-        setattr(budget, attr, value)
+    # The category or period may have changed
+    refresh_budget_spent(db, user_id, budget_id)
+    bump_version(db, user_id, "budgets")
     db.commit()
-    db.refresh(budget)
     return budget
 
 
 def delete_budget(db: Session, budget_id: int, user_id: int):
-    budget = get_budget_by_id(db, budget_id, user_id)
-    if not budget:
+    # rowcount is exact for a single-table DELETE on every backend
+    result = db.execute(
+        delete(Budget)
+        .where(Budget.id == budget_id, Budget.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
         return None
-    db.delete(budget)
+    record_tombstone(db, user_id, "budgets", budget_id)
+    bump_version(db, user_id, "budgets")
     db.commit()
     return True
@@ -1,24 +1,71 @@
 from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.crud.spend import category_and_ancestors, refresh_budget_spent
+from app.crud.versions import bump_version, record_tombstone
 from app.models.category import Category
 from app.schemas.pydantic import CategoryIn
 
 
+def _check_parent(db: Session, user_id: int, parent_id, category_id=None):
+    """400 unless ``parent_id`` is the user's and not ``category_id`` or below it.
+
+    A category under its own subtree would make the tree a cycle, so walk up
+    from the new parent: if the moved category is on that path, refuse.
+    """
+    if parent_id is None:
+        return
+    owned = db.execute(
+        select(Category.id).where(
+            Category.id == parent_id, Category.owner_id == user_id
+        )
+    ).first()
+    if owned is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parent category not found",
+        )
+    if category_id is None:
+        return
+    ancestors = db.execute(category_and_ancestors(parent_id)).scalars().all()
+    if category_id in ancestors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A category cannot be moved under itself or its subcategories",
+        )
+
+
 # Create a new category
 def create_category(db: Session, owner_id: int, category_in: CategoryIn):
+    _check_parent(db, owner_id, category_in.parent_id)
     category = Category(
         name=category_in.name, parent_id=category_in.parent_id, owner_id=owner_id
     )
     db.add(category)
+    bump_version(db, owner_id, "categories")
     db.commit()
     db.refresh(category)
+    # A new category has no children: say so rather than lazy-load them
+    set_committed_value(category, "children", [])
     return category
 
 
-# ✅ Get all categories for a user
+# ✅ Get a user's category tree: one SELECT, children wired up in memory
 def get_categories_by_user(db: Session, user_id: int):
-    return db.query(Category).filter(Category.owner_id == user_id).all()
+    nodes = db.query(Category).filter(Category.owner_id == user_id).all()
+    children = {node.id: [] for node in nodes}
+    roots = []
+    for node in nodes:
+        if node.parent_id in children:
+            children[node.parent_id].append(node)
+        else:
+            roots.append(node)
+    # Mark each children collection as loaded so serializing never lazy-loads
+    for node in nodes:
+        set_committed_value(node, "children", children[node.id])
+    return roots
 
 
 # ✅ Get a single category by ID
@@ -35,19 +82,88 @@ def get_category(db: Session, category_id: int, user_id: int):
     return category
 
 
-# ✅ Update a category (name or parent)
+# ✅ Update a category (name or parent): a rename is one UPDATE .. RETURNING
 def update_category(db: Session, category_id: int, user_id: int, data: CategoryIn):
-    category = get_category(db, category_id, user_id)
-    category.name = data.name
-    category.parent_id = data.parent_id
+    """Ownership-scoped UPDATE; returns the row as a dict (without children).
+
+    The old parent comes back from the same statement where RETURNING is
+    available (read first elsewhere). Only a move is checked and moves
+    spend between budgets; a failed check raises before anything commits.
+    """
+    values = {"name": data.name, "parent_id": data.parent_id}
+    if db.get_bind().dialect.full_returning:
+        old = (
+            select(Category.id, Category.parent_id)
+            .where(Category.id == category_id, Category.owner_id == user_id)
+            .with_for_update()
+            .subquery("old")
+        )
+        row = db.execute(
+            update(Category)
+            .where(Category.id == old.c.id)
+            .values(**values)
+            .returning(
+                old.c.parent_id.label("old_parent_id"),
+                Category.id,
+                Category.name,
+                Category.parent_id,
+            )
+            .execution_options(synchronize_session=False)
+        ).first()
+        category = dict(row._mapping) if row else None
+    else:
+        found = db.execute(
+            select(Category.parent_id).where(
+                Category.id == category_id, Category.owner_id == user_id
+            )
+        ).first()
+        category = None
+        if found is not None:
+            db.execute(
+                update(Category)
+                .where(Category.id == category_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            category = {"old_parent_id": found.parent_id, "id": category_id}
+            category.update(values)
+    if category is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
+        )
+    old_parent_id = category.pop("old_parent_id")
+    if data.parent_id != old_parent_id:
+        # Checked against the tree as moved: a cycle shows up as the
+        # category among its new parent's ancestors
+        _check_parent(db, user_id, data.parent_id, category_id)
+        # The subtree's spend leaves the budgets above the old parent and
+        # joins those above the new one; no other budget changes
+        refresh_budget_spent(db, user_id, ancestors_of=[old_parent_id, data.parent_id])
+    bump_version(db, user_id, "categories")
     db.commit()
-    db.refresh(category)
     return category
 
 
-# ✅ Delete a category
+# ✅ Delete a category; its subcategories become top-level (and so show up in
+# the next sync), as the ORM delete did
 def delete_category(db: Session, category_id: int, user_id: int):
-    category = get_category(db, category_id, user_id)
-    db.delete(category)
+    db.execute(
+        update(Category)
+        .where(Category.parent_id == category_id, Category.owner_id == user_id)
+        .values(parent_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(
+        delete(Category)
+        .where(Category.id == category_id, Category.owner_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
+        )
+    refresh_budget_spent(db, user_id)
+    record_tombstone(db, user_id, "categories", category_id)
+    bump_version(db, user_id, "categories")
     db.commit()
     return {"detail": "Category deleted"}
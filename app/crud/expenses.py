@@ -1,22 +1,46 @@
-from datetime import datetime, timezone
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
 
+from pydantic import ValidationError
+from sqlalchemy import (Float, cast, column, delete, func, insert, literal,
+                        literal_column, null, or_, select, table, tuple_,
+                        update)
 from sqlalchemy.orm import Session
 
+from app.core.clock import naive_utc, utc_now
+from app.crud.alerts import check_budget_alerts
+from app.crud.spend import record_spend, record_spend_change, record_spend_many
+from app.crud.versions import bump_version, record_tombstone
+from app.db.search import SEARCH_VECTOR, search_terms
+from app.models.category import Category
 from app.models.expense import Expense
 from app.schemas.pydantic import ExpenseIn
 
+IMPORT_BATCH_SIZE = 5000
+SEARCH_RANK_WINDOW = 2000
+MAX_REPORTED_IMPORT_ERRORS = 1000
+
 
 def create_expense(db: Session, user_id: int, data: ExpenseIn):
     expense = Expense(
         name=data.name,
         amount=data.amount,
         description=data.description,
-        date=data.date or datetime.now(timezone.utc),  # ✅ timezone-aware
+        date=naive_utc(data.date) or utc_now(),
         category_id=data.category_id,
         user_id=user_id,  # ✅ FIXED: 'user_id', not 'owner_id'
         is_recurring=data.is_recurring,
     )
     db.add(expense)
+    record_spend(db, user_id, expense.category_id, expense.date, expense.amount, 1)
+    check_budget_alerts(
+        db, user_id, [(expense.category_id, expense.date, expense.amount)]
+    )
+    bump_version(db, user_id, "expenses")
     db.commit()
     db.refresh(expense)
     return expense
@@ -26,6 +50,235 @@ def get_expenses_by_user(db: Session, user_id: int):
     return db.query(Expense).filter(Expense.user_id == user_id).all()  # ✅ 'user_id'
 
 
+def filter_expenses(
+    query,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    is_recurring: Optional[bool] = None,
+):
+    """Apply the optional list/export filters to a Query or select()."""
+    if date_from is not None:
+        query = query.filter(Expense.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Expense.date < date_to)
+    if category_id is not None:
+        query = query.filter(Expense.category_id == category_id)
+    if min_amount is not None:
+        query = query.filter(Expense.amount >= min_amount)
+    if max_amount is not None:
+        query = query.filter(Expense.amount <= max_amount)
+    if is_recurring is not None:
+        query = query.filter(Expense.is_recurring == is_recurring)
+    return query
+
+
+# Columns an ExpenseOut is built from, in its field order; list pages and the
+# write statements return these as rows rather than ORM instances
+OUT_COLUMNS = (
+    Expense.name,
+    Expense.id,
+    Expense.category_id,
+    Expense.amount,
+    Expense.description,
+    Expense.is_recurring,
+    Expense.date,
+    Expense.created_at,
+)
+
+
+def get_expenses_page(
+    db: Session,
+    user_id: int,
+    limit: int,
+    after: Optional[tuple[Optional[datetime], int]] = None,
+    **filters,
+):
+    """Return one page of a user's expenses, newest first.
+
+    Pagination is keyset-based on ``(date, id)``: ``after`` is the position of
+    the last row of the previous page, so every page is a bounded index range
+    scan instead of an OFFSET that grows with the page number. One extra row is
+    fetched to know whether another page exists; the second value returned is
+    the ``(date, id)`` key to continue from, or ``None`` on the last page.
+    Expenses without a date come after all dated ones, newest id first; their
+    key is ``(None, id)``. Items are column rows shaped like ``ExpenseOut``,
+    not ORM instances.
+    """
+    query = filter_expenses(
+        select(*OUT_COLUMNS).where(Expense.user_id == user_id), **filters
+    )
+    rows = []
+    # Two range scans rather than one ORDER BY over both: where NULLs sort
+    # differs between databases, and a COALESCE would not use the index
+    if after is None or after[0] is not None:
+        dated = query.where(Expense.date.isnot(None))
+        if after is not None:
+            dated = dated.where(tuple_(Expense.date, Expense.id) < tuple_(*after))
+        dated = dated.order_by(Expense.date.desc(), Expense.id.desc())
+        rows = db.execute(dated.limit(limit + 1)).all()
+    if len(rows) <= limit:
+        undated = query.where(Expense.date.is_(None))
+        if after is not None and after[0] is None:
+            undated = undated.where(Expense.id < after[1])
+        undated = undated.order_by(Expense.id.desc())
+        rows += db.execute(undated.limit(limit + 1 - len(rows))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1].date, rows[-1].id)
+    return rows, None
+
+
+def search_expenses(
+    db: Session,
+    user_id: int,
+    q: str,
+    limit: int,
+    after: Optional[tuple[Optional[float], int]] = None,
+):
+    """Rank a user's expenses against a search query, best match first.
+
+    Every word of ``q`` must prefix-match a word of the name or description.
+    Matching goes through the full-text index (``app.db.search``); ranking
+    is ``ts_rank`` on PostgreSQL and BM25 on SQLite, higher is better. Scoring
+    costs the same for every matching row, so only the newest
+    ``SEARCH_RANK_WINDOW`` matches are ranked: a common word on a large
+    account then costs a bounded index walk instead of scoring every row.
+    The older matches follow the ranked ones, newest first and unscored.
+    Pages are keyset-based on ``(score, id)`` like ``get_expenses_page``; a
+    ``None`` score marks a key in the older, unranked matches.
+    Returns ExpenseOut-shaped dicts and the key to continue from, or ``None``.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return [], None
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        vector = literal_column(SEARCH_VECTOR)
+        tsquery = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{t}:*" for t in terms)
+        )
+        # ts_rank is a float4: as a double it compares equal to the cursor's
+        score = cast(func.ts_rank(vector, tsquery), Float(53))
+        rowid = Expense.id
+
+        def matching(*columns):
+            return select(*columns).where(vector.op("@@")(tsquery))
+
+    elif dialect == "sqlite":
+        fts = table("expenses_fts", column("rowid"))
+        match = " ".join(f'"{t}"*' for t in terms)
+        score = -func.bm25(literal_column("expenses_fts"))
+        # Range and order on the FTS rowid are answered inside the FTS index
+        rowid = fts.c.rowid
+
+        def matching(*columns):
+            return (
+                select(*columns)
+                .join_from(Expense, fts, fts.c.rowid == Expense.id)
+                .where(literal_column("expenses_fts").op("MATCH")(match))
+            )
+
+    else:
+        # No text index: unranked substring match
+        score = literal(0.0)
+        rowid = Expense.id
+
+        def matching(*columns):
+            query = select(*columns)
+            for term in terms:
+                pattern = f"%{term}%"
+                query = query.where(
+                    or_(Expense.name.ilike(pattern), Expense.description.ilike(pattern))
+                )
+            return query
+
+    newest = (
+        matching(rowid.label("id"))
+        .where(Expense.user_id == user_id)
+        .order_by(rowid.desc())
+        .limit(SEARCH_RANK_WINDOW)
+        .subquery()
+    )
+    window_start = select(func.min(newest.c.id)).scalar_subquery()
+    rows = []
+    if after is None or after[0] is not None:
+        ranked = matching(*OUT_COLUMNS, score.label("score")).where(
+            Expense.user_id == user_id, rowid >= window_start
+        )
+        if after is not None:
+            ranked = ranked.where(tuple_(score, Expense.id) < tuple_(*after))
+        ranked = ranked.order_by(score.desc(), Expense.id.desc())
+        rows = db.execute(ranked.limit(limit + 1)).all()
+    if len(rows) <= limit:
+        older = matching(*OUT_COLUMNS, null().label("score")).where(
+            Expense.user_id == user_id, rowid < window_start
+        )
+        if after is not None and after[0] is None:
+            older = older.where(rowid < after[1])
+        older = older.order_by(rowid.desc())
+        rows += db.execute(older.limit(limit + 1 - len(rows))).all()
+    items = [{c.key: value for c, value in zip(OUT_COLUMNS, row)} for row in rows]
+    if len(rows) > limit:
+        return items[:limit], (rows[limit - 1].score, rows[limit - 1].id)
+    return items, None
+
+
+EXPORT_COLUMNS = (
+    Expense.id,
+    Expense.date,
+    Expense.name,
+    Expense.category_id,
+    Expense.amount,
+    Expense.description,
+    Expense.is_recurring,
+    Expense.created_at,
+)
+EXPORT_CHUNK_ROWS = 1000
+
+
+def export_expenses(db: Session, user_id: int, fmt: str, **filters) -> Iterator[str]:
+    """Yield a user's expenses as CSV or NDJSON text chunks, oldest first.
+
+    Rows come off a server-side cursor as plain tuples and are written straight
+    to text, so memory stays flat however many rows the user has.
+    """
+    stmt = filter_expenses(
+        select(*EXPORT_COLUMNS).where(Expense.user_id == user_id), **filters
+    ).order_by(Expense.date, Expense.id)
+    result = db.execute(
+        stmt.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_ROWS)
+    )
+    names = [column.key for column in EXPORT_COLUMNS]
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        write = writer.writerow
+    else:
+
+        def write(row):
+            buffer.write(json.dumps(dict(zip(names, row)), default=_isoformat))
+            buffer.write("\n")
+
+    for partition in result.partitions():
+        for row in partition:
+            write(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _isoformat(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
 def get_expense_by_id(db: Session, expense_id: int, user_id: int):
     return (
         db.query(Expense)
@@ -34,21 +287,217 @@ def get_expense_by_id(db: Session, expense_id: int, user_id: int):
     )
 
 
+ROLLUP_COLUMNS = (Expense.category_id, Expense.date, Expense.amount)
+
+
 def update_expense(db: Session, expense_id: int, user_id: int, data: ExpenseIn):
-    expense = get_expense_by_id(db, expense_id, user_id)
-    if not expense:
-        return None
-    for attr, value in data.dict(exclude_unset=True).items():
-        setattr(expense, attr, value)
+    """Ownership-scoped UPDATE; returns the new row as a dict, None if not found.
+
+    On backends with RETURNING this is one statement: it locks and reads the
+    old row in a FROM subquery (for the rollup) and returns old and new values.
+    Elsewhere the old row is read first and the new one assembled in Python.
+    """
+    values = data.model_dump(exclude_unset=True)
+    if db.get_bind().dialect.full_returning:
+        old = (
+            select(Expense.id, *ROLLUP_COLUMNS)
+            .where(Expense.id == expense_id, Expense.user_id == user_id)
+            .with_for_update()
+            .subquery("old")
+        )
+        row = db.execute(
+            update(Expense)
+            .where(Expense.id == old.c.id)
+            .values(**values)
+            .returning(
+                old.c.category_id.label("old_category_id"),
+                old.c.date.label("old_date"),
+                old.c.amount.label("old_amount"),
+                *OUT_COLUMNS,
+            )
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            return None
+        before, expense = row[:3], dict(row._mapping)
+    else:
+        row = db.execute(
+            select(*OUT_COLUMNS).where(
+                Expense.id == expense_id, Expense.user_id == user_id
+            )
+        ).first()
+        if row is None:
+            return None
+        expense = dict(row._mapping)
+        before = tuple(expense[c.key] for c in ROLLUP_COLUMNS)
+        db.execute(
+            update(Expense)
+            .where(Expense.id == expense_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        expense.update(values)
+    after = tuple(expense[c.key] for c in ROLLUP_COLUMNS)
+    record_spend_change(db, user_id, tuple(before), after)
+    old_category_id, old_date, old_amount = before
+    check_budget_alerts(db, user_id, [(old_category_id, old_date, -old_amount), after])
+    bump_version(db, user_id, "expenses")
     db.commit()
-    db.refresh(expense)
-    return expense
+    return {c.key: expense[c.key] for c in OUT_COLUMNS}
 
 
 def delete_expense(db: Session, expense_id: int, user_id: int):
-    expense = get_expense_by_id(db, expense_id, user_id)
-    if not expense:
+    stmt = delete(Expense).where(Expense.id == expense_id, Expense.user_id == user_id)
+    if db.get_bind().dialect.full_returning:
+        row = db.execute(
+            stmt.returning(*ROLLUP_COLUMNS).execution_options(synchronize_session=False)
+        ).first()
+    else:
+        row = db.execute(
+            select(*ROLLUP_COLUMNS).where(
+                Expense.id == expense_id, Expense.user_id == user_id
+            )
+        ).first()
+        if row is not None:
+            db.execute(stmt.execution_options(synchronize_session=False))
+    if row is None:
         return None
-    db.delete(expense)
+    category_id, date, amount = row
+    record_spend(db, user_id, category_id, date, -amount, -1)
+    record_tombstone(db, user_id, "expenses", expense_id)
+    bump_version(db, user_id, "expenses")
     db.commit()
     return True
+
+
+def _iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode a byte stream into lines (ends kept) without buffering it all."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        yield from lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _iter_records(lines: Iterator[str], fmt: str) -> Iterator[tuple[int, dict]]:
+    """Yield ``(row_number, record)``; a record may be an ``Exception``."""
+    if fmt == "csv":
+        for row, record in enumerate(csv.DictReader(lines), start=1):
+            # Empty cells mean "not given" so ExpenseIn defaults apply
+            yield row, {k: v for k, v in record.items() if v not in ("", None)}
+        return
+    for row, line in enumerate(lines, start=1):
+        if line.strip():
+            try:
+                yield row, json.loads(line)
+            except ValueError as exc:
+                yield row, exc
+
+
+def import_expenses(
+    db: Session,
+    user_id: int,
+    chunks: Iterable[bytes],
+    fmt: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+):
+    """Stream CSV/NDJSON expenses into the database in executemany batches.
+
+    Each row is validated against ``ExpenseIn``; category ownership is checked
+    once per distinct ``category_id``. Every batch is committed together with
+    its monthly rollup update, so a failure part-way keeps earlier batches.
+    """
+    owned: dict[int, bool] = {}
+    batch: list[dict] = []
+    errors: list[dict] = []
+    report = {"inserted": 0, "failed": 0, "errors": errors}
+
+    def fail(row, message):
+        report["failed"] += 1
+        if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+            errors.append({"row": row, "error": message})
+
+    def flush():
+        unknown = {r["category_id"] for _, r in batch} - owned.keys()
+        if unknown:
+            found = {
+                category_id
+                for (category_id,) in db.query(Category.id).filter(
+                    Category.id.in_(unknown), Category.owner_id == user_id
+                )
+            }
+            owned.update({category_id: category_id in found for category_id in unknown})
+
+        rows, spend = [], {}
+        for row, values in batch:
+            if not owned[values["category_id"]]:
+                fail(row, "category_id: Category not found")
+                continue
+            rows.append(values)
+            key = (values["category_id"], f"{values['date']:%Y-%m}")
+            total, count = spend.get(key, (0.0, 0))
+            spend[key] = (total + values["amount"], count + 1)
+        if rows:
+            db.execute(insert(Expense), rows)
+            record_spend_many(
+                db,
+                [
+                    {
+                        "user_id": user_id,
+                        "category_id": category_id,
+                        "period": period,
+                        "total": total,
+                        "count": count,
+                    }
+                    for (category_id, period), (total, count) in spend.items()
+                ],
+            )
+            bump_version(db, user_id, "expenses")
+            db.commit()
+            report["inserted"] += len(rows)
+        batch.clear()
+
+    now = utc_now()
+    for row, record in _iter_records(_iter_lines(chunks), fmt):
+        if isinstance(record, Exception):
+            fail(row, f"invalid JSON: {record}")
+            continue
+        if not isinstance(record, dict):
+            fail(row, "expected an object")
+            continue
+        record.setdefault("description", None)
+        record.setdefault("date", None)
+        try:
+            data = ExpenseIn.model_validate(record)
+        except ValidationError as exc:
+            fail(
+                row,
+                "; ".join(
+                    f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()
+                ),
+            )
+            continue
+        batch.append(
+            (
+                row,
+                {
+                    "name": data.name,
+                    "amount": data.amount,
+                    "description": data.description,
+                    "date": naive_utc(data.date) or now,
+                    "category_id": data.category_id,
+                    "user_id": user_id,
+                    "is_recurring": data.is_recurring,
+                },
+            )
+        )
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    errors.sort(key=lambda e: e["row"])
+    return report
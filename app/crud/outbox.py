@@ -0,0 +1,118 @@
+# app/crud/outbox.py
+
+import logging
+from datetime import timedelta
+from typing import Callable
+
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core import notifications
+from app.core.clock import utc_now
+from app.core.settings import settings
+from app.models.outbox import OutboxMessage
+
+OUTBOX_BATCH_SIZE = 100
+
+logger = logging.getLogger("app.outbox")
+
+
+def enqueue(db: Session, user_id: int, topic: str, payload: dict):
+    """Queue a message in the caller's transaction: sent only if that commits."""
+    db.execute(
+        insert(OutboxMessage).values(user_id=user_id, topic=topic, payload=payload)
+    )
+
+
+def deliver_pending(
+    db: Session,
+    send: Callable[[dict], None] = notifications.send,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+) -> dict:
+    """Send queued messages oldest first, ``batch_size`` at a time.
+
+    Each batch is claimed in a short transaction (``claimed_at`` set, the
+    attempt counted) and committed before any message is sent, so no lock
+    or pooled connection is held while webhooks answer. A second short
+    transaction stamps the delivered messages and releases the failed ones,
+    which later runs retry until ``OUTBOX_MAX_ATTEMPTS``. A worker that dies
+    in between leaves its claim to expire after ``OUTBOX_CLAIM_SECONDS``,
+    and the batch is sent again: delivery is at least once. On PostgreSQL
+    the claim reads ``FOR UPDATE SKIP LOCKED``, so several workers can drain
+    the queue together.
+    """
+    stats = {"delivered": 0, "failed": 0}
+    last_id = 0
+    while True:
+        now = utc_now()
+        batch = db.execute(
+            select(
+                OutboxMessage.id,
+                OutboxMessage.user_id,
+                OutboxMessage.topic,
+                OutboxMessage.payload,
+                OutboxMessage.created_at,
+            )
+            .where(
+                OutboxMessage.delivered_at.is_(None),
+                OutboxMessage.attempts < settings.OUTBOX_MAX_ATTEMPTS,
+                or_(
+                    OutboxMessage.claimed_at.is_(None),
+                    OutboxMessage.claimed_at
+                    < now - timedelta(seconds=settings.OUTBOX_CLAIM_SECONDS),
+                ),
+                # Failed messages wait for the next run rather than loop here
+                OutboxMessage.id > last_id,
+            )
+            .order_by(OutboxMessage.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not batch:
+            db.commit()
+            return stats
+        ids = [message.id for message in batch]
+        db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(ids))
+            .values(claimed_at=now, attempts=OutboxMessage.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        delivered = []
+        for message in batch:
+            try:
+                send(dict(message._mapping))
+            except Exception:
+                logger.exception("delivering outbox message %s failed", message.id)
+                stats["failed"] += 1
+            else:
+                delivered.append(message.id)
+
+        if delivered:
+            db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(delivered))
+                .values(delivered_at=utc_now())
+                .execution_options(synchronize_session=False)
+            )
+        db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(ids))
+            .values(claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        stats["delivered"] += len(delivered)
+        last_id = ids[-1]
+
+
+def prune_outbox(db: Session, older_than: timedelta) -> int:
+    """Drop messages delivered more than ``older_than`` ago."""
+    cutoff = utc_now() - older_than
+    result = db.execute(
+        delete(OutboxMessage).where(OutboxMessage.delivered_at < cutoff)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,278 @@
+# app/crud/recurring.py
+
+import calendar
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import (DateTime, Integer, bindparam, cast, column, insert,
+                        select, update, values)
+from sqlalchemy.orm import Session
+
+from app.core.clock import naive_utc, utc_now
+from app.crud.spend import record_spend_many
+from app.crud.versions import bump_version, bump_versions
+from app.models.expense import Expense
+from app.models.recurring_schedule import RecurringSchedule
+from app.schemas.pydantic import RecurrenceIn
+
+MATERIALIZE_CHUNK_SIZE = 1000
+# Occurrences one schedule gets per pass; a schedule further behind (a daily
+# one backdated years) is picked up again by the next pass of the same run
+OCCURRENCES_PER_PASS = 100
+
+
+def add_months(date: datetime, months: int) -> datetime:
+    """Same day ``months`` later, clamped to the month's length (Jan 31 -> Feb 28)."""
+    month = date.month - 1 + months
+    year, month = date.year + month // 12, month % 12 + 1
+    return date.replace(
+        year=year, month=month, day=min(date.day, calendar.monthrange(year, month)[1])
+    )
+
+
+STEPS = {
+    "daily": lambda start, n: start + timedelta(days=n),
+    "weekly": lambda start, n: start + timedelta(weeks=n),
+    "monthly": add_months,
+    "yearly": lambda start, n: add_months(start, 12 * n),
+}
+
+
+def occurrence(frequency: str, interval: int, starts_at: datetime, k: int):
+    """Date of occurrence ``k`` (0 is ``starts_at`` itself)."""
+    # Stepping from the anchor, not the previous date, keeps the 31st the 31st
+    return STEPS[frequency](starts_at, k * interval)
+
+
+def _next_due(frequency, interval, starts_at, k, until):
+    date = occurrence(frequency, interval, starts_at, k)
+    return date if until is None or date <= until else None
+
+
+def get_schedule(db: Session, expense_id: int, user_id: int):
+    return (
+        db.query(RecurringSchedule)
+        .filter(
+            RecurringSchedule.expense_id == expense_id,
+            RecurringSchedule.user_id == user_id,
+        )
+        .first()
+    )
+
+
+def set_schedule(db: Session, expense_id: int, user_id: int, data: RecurrenceIn):
+    """Make an expense a recurring template, or change how it recurs.
+
+    The expense is occurrence 0. Changing an existing schedule re-anchors it
+    at its last generated occurrence, so nothing already generated repeats;
+    resuming a stopped one carries on from now, without the missed periods.
+    Returns the schedule, or None if the expense is not the user's.
+    """
+    template = db.execute(
+        select(Expense.date).where(Expense.id == expense_id, Expense.user_id == user_id)
+    ).first()
+    if template is None:
+        return None
+    schedule = get_schedule(db, expense_id, user_id)
+    if schedule is None:
+        schedule = RecurringSchedule(expense_id=expense_id, user_id=user_id)
+        anchor = naive_utc(template.date) or utc_now()
+        db.add(schedule)
+    else:
+        anchor = occurrence(
+            schedule.frequency,
+            schedule.interval,
+            schedule.starts_at,
+            schedule.materialized,
+        )
+        if schedule.next_due is None:
+            # Resuming a stopped schedule: the periods it was stopped for are
+            # skipped, not backfilled. Re-anchor at the last occurrence before
+            # now, so the next one due is the first from now on.
+            now = utc_now()
+            k = 0
+            while occurrence(data.frequency, data.interval, anchor, k + 1) < now:
+                k += 1
+            anchor = occurrence(data.frequency, data.interval, anchor, k)
+    until = naive_utc(data.until)
+    schedule.frequency = data.frequency
+    schedule.interval = data.interval
+    schedule.until = until
+    schedule.starts_at = anchor
+    schedule.materialized = 0
+    schedule.next_due = _next_due(data.frequency, data.interval, anchor, 1, until)
+    db.execute(
+        update(Expense)
+        .where(Expense.id == expense_id)
+        .values(is_recurring=True)
+        .execution_options(synchronize_session=False)
+    )
+    bump_version(db, user_id, "expenses")
+    db.commit()
+    db.refresh(schedule)
+    return schedule
+
+
+def delete_schedule(db: Session, expense_id: int, user_id: int):
+    """Stop an expense recurring; occurrences already generated stay.
+
+    The schedule row is kept with no ``next_due``, so a later ``set_schedule``
+    resumes in the same rhythm with the first occurrence from then on,
+    neither repeating what was generated nor backfilling the stopped period.
+    """
+    result = db.execute(
+        update(RecurringSchedule)
+        .where(
+            RecurringSchedule.expense_id == expense_id,
+            RecurringSchedule.user_id == user_id,
+        )
+        .values(next_due=None)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        return None
+    db.execute(
+        update(Expense)
+        .where(Expense.id == expense_id)
+        .values(is_recurring=False)
+        .execution_options(synchronize_session=False)
+    )
+    bump_version(db, user_id, "expenses")
+    db.commit()
+    return True
+
+
+_advance = (
+    update(RecurringSchedule.__table__)
+    .where(RecurringSchedule.__table__.c.id == bindparam("schedule_id"))
+    .values(
+        materialized=bindparam("new_materialized"),
+        next_due=bindparam("new_next_due"),
+    )
+)
+
+
+def _advance_schedules(db: Session, advances: list[dict]):
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(_advance, advances)
+        return
+    # psycopg2 runs an executemany UPDATE one row per round trip; join the
+    # chunk in as a VALUES list instead and advance it in one statement. An
+    # all-NULL column of VALUES is typed text, hence the cast
+    rows = values(
+        column("schedule_id", Integer),
+        column("new_materialized", Integer),
+        column("new_next_due", DateTime),
+        name="advance",
+    ).data([tuple(row.values()) for row in advances])
+    db.execute(
+        update(RecurringSchedule.__table__)
+        .where(RecurringSchedule.__table__.c.id == rows.c.schedule_id)
+        .values(
+            materialized=rows.c.new_materialized,
+            next_due=cast(rows.c.new_next_due, DateTime),
+        )
+    )
+
+
+def materialize_due(
+    db: Session,
+    now: Optional[datetime] = None,
+    chunk_size: int = MATERIALIZE_CHUNK_SIZE,
+) -> dict:
+    """Generate every recurring occurrence due by ``now``, for all users.
+
+    Due schedules are read ``chunk_size`` at a time along the
+    ``(next_due, id)`` index together with their template's columns. Each
+    chunk becomes one executemany INSERT of occurrences, one UPDATE
+    advancing the schedules, and the matching rollup and
+    data-version upserts, committed together. A crash therefore loses at
+    most the chunk in flight, and a rerun carries on from ``next_due``.
+
+    On PostgreSQL the chunk is locked ``FOR UPDATE SKIP LOCKED``, so several
+    workers can run this at once and split the due schedules between them.
+    SQLite allows one writer: a concurrent run fails its chunk with
+    "database is locked" and leaves the work to the other. Either way the
+    unique ``(schedule_id, date)`` index rules out a duplicate occurrence.
+    """
+    cutoff = naive_utc(now) or utc_now()
+    stats = {"schedules": 0, "occurrences": 0}
+    due = (
+        select(
+            RecurringSchedule.id,
+            RecurringSchedule.user_id,
+            RecurringSchedule.frequency,
+            RecurringSchedule.interval,
+            RecurringSchedule.starts_at,
+            RecurringSchedule.until,
+            RecurringSchedule.materialized,
+            Expense.name,
+            Expense.category_id,
+            Expense.amount,
+            Expense.description,
+        )
+        .join(Expense, Expense.id == RecurringSchedule.expense_id)
+        .where(RecurringSchedule.next_due <= cutoff)
+        .order_by(RecurringSchedule.next_due, RecurringSchedule.id)
+        .limit(chunk_size)
+        .with_for_update(of=RecurringSchedule, skip_locked=True)
+    )
+    while True:
+        chunk = db.execute(due).all()
+        if not chunk:
+            return stats
+        occurrences, advances, spend = [], [], {}
+        for s in chunk:
+            k = s.materialized
+            date = occurrence(s.frequency, s.interval, s.starts_at, k + 1)
+            while (
+                date <= cutoff
+                and (s.until is None or date <= s.until)
+                and k - s.materialized < OCCURRENCES_PER_PASS
+            ):
+                k += 1
+                occurrences.append(
+                    {
+                        "user_id": s.user_id,
+                        "category_id": s.category_id,
+                        "name": s.name,
+                        "amount": s.amount,
+                        "description": s.description,
+                        "is_recurring": True,
+                        "date": date,
+                        "schedule_id": s.id,
+                    }
+                )
+                key = (s.user_id, s.category_id, f"{date:%Y-%m}")
+                total, count = spend.get(key, (0.0, 0))
+                spend[key] = (total + s.amount, count + 1)
+                date = occurrence(s.frequency, s.interval, s.starts_at, k + 1)
+            advances.append(
+                {
+                    "schedule_id": s.id,
+                    "new_materialized": k,
+                    "new_next_due": (
+                        date if s.until is None or date <= s.until else None
+                    ),
+                }
+            )
+        if occurrences:
+            db.execute(insert(Expense), occurrences)
+        _advance_schedules(db, advances)
+        record_spend_many(
+            db,
+            [
+                {
+                    "user_id": user_id,
+                    "category_id": category_id,
+                    "period": period,
+                    "total": total,
+                    "count": count,
+                }
+                for (user_id, category_id, period), (total, count) in spend.items()
+            ],
+        )
+        bump_versions(db, {row["user_id"] for row in occurrences}, "expenses")
+        db.commit()
+        stats["schedules"] += len(chunk)
+        stats["occurrences"] += len(occurrences)
@@ -0,0 +1,186 @@
+# app/crud/reports.py
+
+from datetime import datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.clock import utc_now
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.monthly_spend import MonthlySpend
+
+try:
+    import numpy as np
+except ImportError:  # only get_trends needs it
+    np = None
+
+
+def month_bucket(db: Session, column):
+    """SQL expression truncating a datetime column to a "YYYY-MM" string."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m", column)
+    if dialect == "mysql":
+        return func.date_format(column, "%Y-%m")
+    return func.to_char(column, "YYYY-MM")
+
+
+def category_roots(user_id: int):
+    """Recursive CTE mapping each of a user's categories to its top-level root."""
+    tree = (
+        select(Category.id.label("id"), Category.id.label("root_id"))
+        .where(Category.owner_id == user_id, Category.parent_id.is_(None))
+        .cte("category_tree", recursive=True)
+    )
+    child = aliased(Category)
+    # UNION ends the recursion should the parent links ever form a cycle
+    return tree.union(
+        select(child.id, tree.c.root_id).where(child.parent_id == tree.c.id)
+    )
+
+
+def get_spending(
+    db: Session,
+    user_id: int,
+    group_by: Sequence[str] = ("category",),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    rollup: bool = False,
+):
+    """Totals, counts and averages of a user's expenses, aggregated in SQL.
+
+    ``group_by`` may contain "category" and/or "month". With ``rollup`` the
+    category key is the top-level ancestor, so subcategory spend is folded
+    into its root in the same statement.
+    """
+    keys = []
+    tree = category_roots(user_id) if rollup and "category" in group_by else None
+    if "category" in group_by:
+        category_key = tree.c.root_id if tree is not None else Expense.category_id
+        keys.append(category_key.label("category_id"))
+    if "month" in group_by:
+        keys.append(month_bucket(db, Expense.date).label("month"))
+
+    query = db.query(
+        *keys,
+        func.sum(Expense.amount).label("total"),
+        func.count(Expense.id).label("count"),
+        func.avg(Expense.amount).label("average"),
+    ).select_from(Expense)
+    if tree is not None:
+        query = query.join(tree, tree.c.id == Expense.category_id)
+    query = query.filter(Expense.user_id == user_id)
+    if date_from is not None:
+        query = query.filter(Expense.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Expense.date < date_to)
+    if keys:
+        query = query.group_by(*keys).order_by(*keys)
+    return [row._asdict() for row in query.all()]
+
+
+def get_trends(
+    db: Session,
+    user_id: int,
+    end: Optional[str] = None,
+    months: int = 12,
+    window: int = 3,
+    sigmas: float = 2.0,
+    rollup: bool = False,
+):
+    """Monthly spend per category with trend figures and a next-month forecast.
+
+    The month totals come from the ``monthly_spend`` rollup in one query, a
+    row per category and month however many expenses there are, and go into
+    a categories x months NumPy grid that every figure is computed on at once:
+
+    - ``moving_average``: mean of the month and the ``window - 1`` before it
+      (fewer at the start of the range);
+    - ``growth``: change from the previous month as a fraction, None after
+      a month with no spend;
+    - ``anomaly``: more than ``sigmas`` standard deviations above the mean
+      of the ``window`` months before it (never in the first ``window``);
+    - ``forecast``: the least-squares line through the range, extended one
+      month and floored at 0.
+
+    ``end`` ("YYYY-MM") is the last month of the range, by default the
+    current one. With ``rollup`` subcategories fold into their top-level
+    category, the way budgets count them.
+    """
+    last = np.datetime64(end or f"{utc_now():%Y-%m}", "M")
+    first = last - (months - 1)
+    labels = np.arange(first, last + 1).astype(str).tolist()
+    tree = category_roots(user_id) if rollup else None
+    category_key = tree.c.root_id if tree is not None else MonthlySpend.category_id
+    query = select(MonthlySpend.period, category_key, MonthlySpend.total).where(
+        MonthlySpend.user_id == user_id,
+        MonthlySpend.period.between(labels[0], labels[-1]),
+    )
+    if tree is not None:
+        query = query.join(tree, tree.c.id == MonthlySpend.category_id)
+    rows = db.execute(query).all()
+    if not rows:
+        return []
+
+    periods, category_ids, totals = zip(*rows)
+    ids, category_index = np.unique(category_ids, return_inverse=True)
+    month_index = (np.array(periods, dtype="datetime64[M]") - first).astype(int)
+    # bincount also sums the subcategories a rollup folds into one row
+    spend = np.bincount(
+        category_index * months + month_index,
+        weights=totals,
+        minlength=len(ids) * months,
+    ).reshape(len(ids), months)
+
+    # Every trailing-window sum is a difference of two running sums
+    running = np.zeros((len(ids), months + 1))
+    np.cumsum(spend, axis=1, out=running[:, 1:])
+    squares = np.zeros_like(running)
+    np.cumsum(spend**2, axis=1, out=squares[:, 1:])
+    steps = np.arange(months)
+    start = np.maximum(steps + 1 - window, 0)
+    moving_average = (running[:, steps + 1] - running[:, start]) / (steps + 1 - start)
+
+    before = np.maximum(steps - window, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (running[:, steps] - running[:, before]) / (steps - before)
+        variance = (squares[:, steps] - squares[:, before]) / (steps - before)
+    deviation = np.sqrt(np.maximum(variance - mean**2, 0))
+    anomaly = (steps - before == window) & (spend > mean + sigmas * deviation)
+
+    growth = np.full_like(spend, np.nan)
+    previous = spend[:, :-1]
+    np.divide(spend[:, 1:] - previous, previous, out=growth[:, 1:], where=previous > 0)
+
+    centered = steps - steps.mean()
+    slope = (
+        (spend - spend.mean(axis=1, keepdims=True)) @ centered / (centered @ centered)
+    )
+    forecast = np.maximum(spend.mean(axis=1) + slope * (months - steps.mean()), 0)
+
+    return [
+        {
+            "category_id": category_id,
+            "months": [
+                {
+                    "month": month,
+                    "total": total,
+                    "moving_average": average,
+                    "growth": None if change != change else change,
+                    "anomaly": flagged,
+                }
+                for month, total, average, change, flagged in zip(labels, *series)
+            ],
+            "forecast": next_month,
+        }
+        for category_id, next_month, *series in zip(
+            ids.tolist(),
+            forecast.tolist(),
+            spend.tolist(),
+            moving_average.tolist(),
+            growth.tolist(),
+            anomaly.tolist(),
+        )
+    ]
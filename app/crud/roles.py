@@ -0,0 +1,42 @@
+# app/crud/roles.py
+
+from typing import Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.role import Role, RoleEnum
+
+# RoleEnum -> roles.id; roles are seeded once per deployment and never change
+# at runtime, so one query fills this for the life of the process.
+role_ids: dict = {}
+
+
+def load_role_ids(db: Session) -> dict:
+    role_ids.clear()
+    role_ids.update(db.execute(select(Role.name, Role.id)).all())
+    return role_ids
+
+
+def get_role_id(db: Session, name) -> Optional[int]:
+    try:
+        name = RoleEnum(name)
+    except ValueError:
+        return None
+    if name not in role_ids:
+        load_role_ids(db)
+    return role_ids.get(name)
+
+
+def seed_roles(db: Session):
+    """Insert any missing ``RoleEnum`` rows; safe to run from several workers."""
+    missing = [r for r in RoleEnum if r not in load_role_ids(db)]
+    if missing:
+        try:
+            db.execute(insert(Role), [{"name": r} for r in missing])
+            db.commit()
+        except IntegrityError:
+            # Another process seeded them first
+            db.rollback()
+    return load_role_ids(db)
@@ -0,0 +1,238 @@
+# app/crud/spend.py
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.crud.reports import month_bucket
+from app.models.budget import Budget
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.monthly_spend import MonthlySpend
+
+
+_upserts: dict = {}
+
+
+def _upsert_statement(dialect: str):
+    """``INSERT .. ON CONFLICT DO UPDATE`` adding to the row, built once per dialect."""
+    if dialect not in _upserts:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(MonthlySpend)
+        _upserts[dialect] = stmt.on_conflict_do_update(
+            index_elements=["user_id", "category_id", "period"],
+            set_={
+                "total": MonthlySpend.total + stmt.excluded.total,
+                "count": MonthlySpend.count + stmt.excluded.count,
+            },
+        )
+    return _upserts[dialect]
+
+
+def category_and_ancestors(*category_ids):
+    """Select of ``category_ids`` and every category above them (one recursive CTE)."""
+    chain = (
+        select(Category.id, Category.parent_id)
+        .where(Category.id.in_(category_ids))
+        .cte("chain", recursive=True)
+    )
+    # UNION, not UNION ALL: on a cycle in the parent links the walk comes
+    # back to rows it already has, and the recursion stops instead of looping
+    chain = chain.union(
+        select(Category.id, Category.parent_id).where(Category.id == chain.c.parent_id)
+    )
+    return select(chain.c.id)
+
+
+_budgets = Budget.__table__
+# A budget counts its category's subcategories too, so a delta lands on the
+# budgets of the category and of every ancestor. Parameter names must not
+# collide with column names, or they would join the SET clause.
+_budget_spend = (
+    update(_budgets).where(
+        _budgets.c.user_id == bindparam("b_user_id"),
+        _budgets.c.time_period == bindparam("b_period"),
+        _budgets.c.category_id.in_(category_and_ancestors(bindparam("b_category_id"))),
+    )
+    # Keep updated_at: spend moving is not an edit of the budget
+    .values(
+        spent=_budgets.c.spent + bindparam("b_total"), updated_at=_budgets.c.updated_at
+    )
+)
+
+
+def record_spend(
+    db: Session,
+    user_id: int,
+    category_id: int,
+    date: Optional[datetime],
+    amount: float,
+    count: int,
+):
+    """Add ``amount``/``count`` (negative to remove) to a monthly rollup row.
+
+    Runs inside the caller's transaction, so the rollup commits or rolls back
+    together with the expense write that triggered it.
+    """
+    if date is None:
+        return
+    record_spend_many(
+        db,
+        [
+            {
+                "user_id": user_id,
+                "category_id": category_id,
+                "period": f"{date:%Y-%m}",
+                "total": amount,
+                "count": count,
+            }
+        ],
+    )
+
+
+def record_spend_many(db: Session, deltas: list[dict]):
+    """Apply several rollup deltas (dicts of key columns plus total/count) at once.
+
+    The totals are added to the ``spent`` of every budget they fall under too.
+    """
+    if not deltas:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        db.execute(_upsert_statement(dialect), deltas)
+    else:
+        for delta in deltas:
+            key = {k: delta[k] for k in ("user_id", "category_id", "period")}
+            result = db.execute(
+                update(MonthlySpend)
+                .filter_by(**key)
+                .values(
+                    total=MonthlySpend.total + delta["total"],
+                    count=MonthlySpend.count + delta["count"],
+                )
+            )
+            if result.rowcount == 0:
+                db.execute(insert(MonthlySpend).values(**delta))
+    budget_deltas = [
+        {
+            "b_user_id": delta["user_id"],
+            "b_category_id": delta["category_id"],
+            "b_period": delta["period"],
+            "b_total": delta["total"],
+        }
+        for delta in deltas
+        if delta["total"]
+    ]
+    if budget_deltas:
+        db.execute(_budget_spend, budget_deltas)
+
+
+def record_spend_change(db: Session, user_id: int, before: tuple, after: tuple):
+    """Move an expense's contribution from ``before`` to ``after``.
+
+    Both are ``(category_id, date, amount)``. The two deltas are merged when
+    they hit the same rollup row (an upsert cannot touch a row twice), and
+    nothing is written when they cancel out.
+    """
+    deltas: dict = {}
+    for (category_id, date, amount), sign in ((before, -1), (after, 1)):
+        if date is None:
+            continue
+        key = (category_id, f"{date:%Y-%m}")
+        total, count = deltas.get(key, (0.0, 0))
+        deltas[key] = (total + sign * amount, count + sign)
+    record_spend_many(
+        db,
+        [
+            {
+                "user_id": user_id,
+                "category_id": category_id,
+                "period": period,
+                "total": total,
+                "count": count,
+            }
+            for (category_id, period), (total, count) in deltas.items()
+            if total or count
+        ],
+    )
+
+
+def refresh_budget_spent(
+    db: Session,
+    user_id: Optional[int] = None,
+    budget_id: Optional[int] = None,
+    ancestors_of: Optional[list] = None,
+):
+    """Recompute ``budgets.spent`` from the rollup, in the caller's transaction.
+
+    For budgets just created or moved to another category or period, and for
+    a user's budgets when their category tree changes shape; ``ancestors_of``
+    narrows that to the budgets on those categories and the ones above them
+    (``None`` entries, for top level, are skipped). One UPDATE: a recursive
+    CTE pairs every category with its subcategories and each budget sums the
+    rollup rows of its category's subtree.
+    """
+    tree = select(Category.id.label("root_id"), Category.id)
+    if user_id is not None:
+        tree = tree.where(Category.owner_id == user_id)
+    chain = None
+    if ancestors_of is not None:
+        starts = [category_id for category_id in ancestors_of if category_id]
+        if not starts:
+            return
+        chain = category_and_ancestors(*starts)
+        tree = tree.where(Category.id.in_(chain))
+    tree = tree.cte("tree", recursive=True)
+    # UNION stops at a cycle, as in category_and_ancestors
+    tree = tree.union(
+        select(tree.c.root_id, Category.id).where(Category.parent_id == tree.c.id)
+    )
+    spent = (
+        select(func.coalesce(func.sum(MonthlySpend.total), 0.0))
+        .join(tree, tree.c.id == MonthlySpend.category_id)
+        .where(
+            tree.c.root_id == _budgets.c.category_id,
+            MonthlySpend.user_id == _budgets.c.user_id,
+            MonthlySpend.period == _budgets.c.time_period,
+        )
+        .scalar_subquery()
+    )
+    stmt = update(_budgets).values(spent=spent, updated_at=_budgets.c.updated_at)
+    if user_id is not None:
+        stmt = stmt.where(_budgets.c.user_id == user_id)
+    if budget_id is not None:
+        stmt = stmt.where(_budgets.c.id == budget_id)
+    if chain is not None:
+        stmt = stmt.where(_budgets.c.category_id.in_(chain))
+    db.execute(stmt)
+
+
+def rebuild_monthly_spend(db: Session, user_id: Optional[int] = None):
+    """Recompute the rollup from the expenses table in two set-based statements.
+
+    Budget running totals are then recomputed from the new rollup.
+    """
+    keys = (Expense.user_id, Expense.category_id, month_bucket(db, Expense.date))
+    clear = delete(MonthlySpend)
+    source = (
+        select(*keys, func.sum(Expense.amount), func.count(Expense.id))
+        .where(Expense.date.isnot(None))
+        .group_by(*keys)
+    )
+    if user_id is not None:
+        clear = clear.where(MonthlySpend.user_id == user_id)
+        source = source.where(Expense.user_id == user_id)
+
+    db.execute(clear)
+    db.execute(
+        insert(MonthlySpend).from_select(
+            ["user_id", "category_id", "period", "total", "count"], source
+        )
+    )
+    refresh_budget_spent(db, user_id)
+    db.commit()
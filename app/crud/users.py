@@ -1,8 +1,9 @@
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.core.security import hash_password, verify_password
-from app.models.role import Role
+from app.core.principal_cache import Principal
+from app.core.security import hash_password, verify_and_update
+from app.crud.roles import get_role_id
 from app.models.user import User
 from app.schemas.pydantic import UserCreate
 
@@ -15,19 +16,28 @@ def get_user_by_id(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
 
+def get_principal(db: Session, claims: dict):
+    # Tokens issued before the "uid" claim existed only carry the email
+    if "uid" in claims:
+        user = get_user_by_id(db, claims["uid"])
+    else:
+        user = get_user_by_email(db, claims["sub"])
+    return Principal.from_user(user) if user else None
+
+
 def create_user(db: Session, user_in: UserCreate, role_name: str = "user"):
     if get_user_by_email(db, user_in.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    role = db.query(Role).filter(Role.name == role_name).first()
-    if not role:
+    role_id = get_role_id(db, role_name)
+    if role_id is None:
         raise HTTPException(status_code=400, detail=f"Role '{role_name}' not found")
 
     user = User(
         name=user_in.name,
         email=user_in.email,
         hashed_password=hash_password(user_in.password),
-        role_id=role.id,
+        role_id=role_id,
     )
     db.add(user)
     db.commit()
@@ -37,6 +47,13 @@ def create_user(db: Session, user_in: UserCreate, role_name: str = "user"):
 
 def authenticate_user(db: Session, email: str, password: str):
     user = get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
+        return None
+    ok, new_hash = verify_and_update(password, user.hashed_password)
+    if not ok:
         return None
+    if new_hash:
+        # Stored with outdated bcrypt parameters: upgrade it transparently
+        user.hashed_password = new_hash
+        db.commit()
     return user
@@ -0,0 +1,72 @@
+# app/crud/versions.py
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.data_version import DataVersion
+from app.models.tombstone import Tombstone
+
+_bumps: dict = {}
+
+
+def _bump_statement(dialect: str):
+    """``INSERT .. ON CONFLICT DO UPDATE`` incrementing the counter, built once per dialect."""
+    if dialect not in _bumps:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        _bumps[dialect] = upsert(DataVersion).on_conflict_do_update(
+            index_elements=["user_id", "resource"],
+            set_={"version": DataVersion.version + 1},
+        )
+    return _bumps[dialect]
+
+
+def bump_version(db: Session, user_id: int, resource: str):
+    """Mark ``resource`` as changed for ``user_id``, in the caller's transaction."""
+    key = {"user_id": user_id, "resource": resource}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        db.execute(_bump_statement(dialect), {**key, "version": 1})
+        return
+    result = db.execute(
+        update(DataVersion)
+        .filter_by(**key)
+        .values(version=DataVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(DataVersion).values(**key, version=1))
+
+
+def bump_versions(db: Session, user_ids, resource: str):
+    """``bump_version`` for many users in one executemany, for bulk jobs."""
+    keys = [{"user_id": user_id, "resource": resource} for user_id in user_ids]
+    if not keys:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        db.execute(_bump_statement(dialect), [{**key, "version": 1} for key in keys])
+        return
+    for key in keys:
+        bump_version(db, key["user_id"], resource)
+
+
+def get_version(db: Session, user_id: int, resource: str) -> int:
+    """Current counter: a single primary-key lookup, 0 if never written."""
+    version = db.execute(
+        select(DataVersion.version).where(
+            DataVersion.user_id == user_id, DataVersion.resource == resource
+        )
+    ).scalar()
+    return version or 0
+
+
+def record_tombstone(db: Session, user_id: int, resource: str, record_id: int):
+    """Remember a deleted row for ``GET /sync``, in the caller's transaction."""
+    db.execute(
+        insert(Tombstone).values(
+            user_id=user_id, resource=resource, record_id=record_id
+        )
+    )
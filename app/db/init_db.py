@@ -0,0 +1,27 @@
+# app/db/init_db.py
+"""One-off database setup: create missing tables and seed the roles.
+
+Run it once per deployment with ``python -m app.cli init-db``, or set
+``DB_INIT_ON_STARTUP`` to have the app do it in its lifespan hook (handy
+for local development and tests).
+"""
+
+from sqlalchemy import inspect
+
+from app.crud.roles import seed_roles
+from app.db.session import Base, SessionLocal, engine
+from app.models import (budget, category, data_version, expense,  # noqa: F401
+                        monthly_spend, outbox, recurring_schedule, role,
+                        tombstone, user)
+
+
+def init_db(bind=engine) -> bool:
+    """Returns True if the schema was created from scratch."""
+    fresh = not inspect(bind).has_table("users")
+    Base.metadata.create_all(bind=bind)
+    db = SessionLocal(bind=bind)
+    try:
+        seed_roles(db)
+    finally:
+        db.close()
+    return fresh
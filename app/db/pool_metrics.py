@@ -0,0 +1,123 @@
+# app/db/pool_metrics.py
+
+import bisect
+import threading
+import time
+
+from sqlalchemy import event, exc
+
+# Upper bounds (ms) of the checkout-wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 30000)
+
+
+class PoolMetrics:
+    """Counters and a checkout-wait histogram for one connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.in_use = 0
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum_ms += ms
+            self.wait_max_ms = max(self.wait_max_ms, ms)
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, ms)] += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "in_use": self.in_use,
+                "checkout_wait_ms": {
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum_ms, 3),
+                    "max": round(self.wait_max_ms, 3),
+                    "buckets": {
+                        **{
+                            f"le_{bound}": n
+                            for bound, n in zip(WAIT_BUCKETS_MS, self.wait_buckets)
+                        },
+                        "le_inf": self.wait_buckets[-1],
+                    },
+                },
+            }
+        pool = self.pool
+        if pool is not None and hasattr(pool, "checkedin"):
+            data.update(
+                size=pool.size(),
+                idle=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return data
+
+
+def instrumented_pool(base, metrics: PoolMetrics):
+    """Subclass ``base`` so the time spent waiting for a connection is recorded.
+
+    The metrics live on the class because ``Pool.recreate()`` (engine
+    dispose, invalidation) builds a fresh instance of ``self.__class__``.
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_timeout()
+                raise
+            metrics.record_wait(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def instrument_engine(engine, metrics: PoolMetrics):
+    """Track checkouts, connects and invalidations of a (sync) engine's pool."""
+    metrics.pool = engine.pool
+
+    @event.listens_for(engine, "engine_disposed")
+    def on_dispose(conn_engine):
+        metrics.pool = conn_engine.pool
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with metrics._lock:
+            metrics.checkouts += 1
+            metrics.in_use += 1
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.in_use -= 1
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connects += 1
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with metrics._lock:
+            metrics.invalidations += 1
@@ -0,0 +1,64 @@
+# app/db/search.py
+"""Full-text index over expense name and description.
+
+PostgreSQL gets a GIN index on a ``tsvector`` expression, which the server
+keeps current on every write. SQLite gets an FTS5 table over ``expenses``
+kept in step by triggers, so the bulk inserts, single-statement updates and
+deletes in ``app.crud.expenses`` need no extra code either way. The DDL runs
+when ``create_all`` creates ``expenses``; existing databases get it from the
+``add expense search`` migration.
+"""
+
+import re
+
+from sqlalchemy import DDL, event
+
+# Same expression as the index below, or the planner will not use it
+SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(expenses.name, '') || ' ' || "
+    "coalesce(expenses.description, ''))"
+)
+
+POSTGRES_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_expenses_search ON expenses "
+    "USING gin ((to_tsvector('simple', coalesce(name, '') || ' ' || "
+    "coalesce(description, ''))))",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5("
+    "name, description, content='expenses', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_insert AFTER INSERT ON expenses "
+    "BEGIN INSERT INTO expenses_fts (rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_delete AFTER DELETE ON expenses "
+    "BEGIN INSERT INTO expenses_fts (expenses_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_update "
+    "AFTER UPDATE OF name, description ON expenses "
+    "BEGIN INSERT INTO expenses_fts (expenses_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO expenses_fts (rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+]
+
+
+def search_terms(q: str) -> list[str]:
+    """Lower-cased words of a search box query; punctuation never reaches SQL."""
+    return re.findall(r"\w+", q.lower())
+
+
+def install(table):
+    """Create the search index along with ``table`` (the expenses table)."""
+    for statement in POSTGRES_DDL:
+        event.listen(
+            table, "after_create", DDL(statement).execute_if(dialect="postgresql")
+        )
+    for statement in SQLITE_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    # The FTS table is not in the metadata, so drop_all would leave it stale
+    event.listen(
+        table,
+        "before_drop",
+        DDL("DROP TABLE IF EXISTS expenses_fts").execute_if(dialect="sqlite"),
+    )
@@ -1,11 +1,44 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import itertools
+import time
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 
 from app.core.settings import settings
+from app.core.telemetry import instrument_queries
+from app.db.pool_metrics import PoolMetrics, instrument_engine, instrumented_pool
+
+pool_metrics = {"primary": PoolMetrics("primary")}
+
+
+def engine_options(url: str, metrics: PoolMetrics, queue_pool=QueuePool) -> dict:
+    if url.startswith("sqlite"):
+        if ":memory:" in url or url.rstrip("/").endswith("sqlite:"):
+            return {"connect_args": {"check_same_thread": False}}
+        # SQLite connections are handed between FastAPI's threadpool threads
+        return {
+            "connect_args": {"check_same_thread": False},
+            "poolclass": instrumented_pool(NullPool, metrics),
+        }
+    return {
+        "poolclass": instrumented_pool(queue_pool, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
 
-engine = create_engine(settings.DATABASE_URL)
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    **engine_options(settings.DATABASE_URL, pool_metrics["primary"]),
+)
+instrument_engine(engine, pool_metrics["primary"])
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
+instrument_queries(engine, Base)
 
 
 def get_db():
@@ -14,3 +47,207 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class ReplicaSet:
+    """Read replica engines, handed out in turn, skipping any that failed.
+
+    A replica that refuses a connection or drops one is left out for
+    ``retry_after`` seconds. With every replica out, reads use the primary.
+    """
+
+    def __init__(self, engines: list, retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._down_until = {}
+        self._turn = itertools.count()
+        for replica in engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        # No connection means the error came from connecting
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, replica):
+        self._down_until[replica] = time.monotonic() + self.retry_after
+
+    def candidates(self) -> list:
+        """Healthy replicas, starting with the one whose turn it is."""
+        now = time.monotonic()
+        start = next(self._turn)
+        count = len(self.engines)
+        ordered = (self.engines[(start + i) % count] for i in range(count))
+        return [r for r in ordered if self._down_until.get(r, 0) <= now]
+
+
+def _is_read(clause) -> bool:
+    return clause.is_select and getattr(clause, "_for_update_arg", None) is None
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica until it writes, then uses the primary.
+
+    The replica is picked at the first SELECT and kept for the session, so
+    a route's reads (say an ETag version, then the rows) all see the same
+    point of the replica's history. A flush, a DML or textual statement, or
+    a ``FOR UPDATE`` pins the session to the primary (its ``bind``) from
+    then on, so whatever a request writes it reads back.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._replica = None
+        self._pinned = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None and not _is_read(clause)):
+            self._pinned = True
+        # No clause: a caller after the dialect, or session.connection()
+        if self._pinned or clause is None:
+            return super().get_bind(mapper, clause, **kwargs)
+        if self._replica is None:
+            self._replica = self._connect_replica()
+        return self._replica
+
+    def _connect_replica(self):
+        for replica in self.replicas.candidates():
+            try:
+                # Check out now, so a dead replica fails over to the next one
+                # here instead of failing the route's first query
+                self.connection(bind_arguments={"bind": replica})
+                return replica
+            except exc.DBAPIError:
+                self.replicas.mark_down(replica)
+        return self.bind
+
+
+class BatchSession(Session):
+    """Session whose ``commit()`` only flushes; ``commit_batch()`` commits.
+
+    The CRUD functions commit after each write, so under this session a run
+    of them composes into a single transaction (used by POST /batch).
+    """
+
+    def commit(self):
+        self.flush()
+
+    def commit_batch(self):
+        super().commit()
+
+
+BatchSessionLocal = sessionmaker(
+    bind=engine, class_=BatchSession, autocommit=False, autoflush=False
+)
+
+
+def get_batch_db():
+    db = BatchSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def replica_engines(urls: list[str], create, prefix: str, queue_pool=QueuePool):
+    """One instrumented engine per replica URL, with its own pool metrics."""
+    engines = []
+    for index, url in enumerate(urls):
+        metrics = pool_metrics[f"{prefix}{index}"] = PoolMetrics(f"{prefix}{index}")
+        replica = create(url, **engine_options(url, metrics, queue_pool))
+        sync_replica = getattr(replica, "sync_engine", replica)
+        instrument_engine(sync_replica, metrics)
+        instrument_queries(sync_replica)
+        engines.append(replica)
+    return engines
+
+
+ReadSessionLocal = SessionLocal
+if settings.DB_REPLICA_URLS:
+    ReadSessionLocal = sessionmaker(
+        bind=engine,
+        class_=RoutingSession,
+        replicas=ReplicaSet(
+            replica_engines(settings.DB_REPLICA_URLS, create_engine, "replica"),
+            settings.DB_REPLICA_RETRY_SECONDS,
+        ),
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+def get_read_db():
+    """``get_db`` for read-only routes: a replica serves them when any is set."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync DBAPI in a URL for its asyncio counterpart."""
+    scheme, sep, rest = url.partition("://")
+    backend = scheme.split("+")[0]
+    if backend == "postgres":
+        backend = "postgresql"
+    return ASYNC_DRIVERS.get(backend, scheme) + sep + rest
+
+
+async_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    pool_metrics["async"] = PoolMetrics("async")
+    async_url = async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url,
+        **engine_options(async_url, pool_metrics["async"], AsyncAdaptedQueuePool),
+    )
+    instrument_engine(async_engine.sync_engine, pool_metrics["async"])
+    instrument_queries(async_engine.sync_engine)
+    # Objects must stay readable after commit: serializing them happens
+    # outside the greenlet, where an expired attribute cannot be reloaded.
+    AsyncSessionLocal = sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if settings.DB_REPLICA_URLS:
+        async_replicas = replica_engines(
+            [async_database_url(url) for url in settings.DB_REPLICA_URLS],
+            create_async_engine,
+            "async-replica",
+            AsyncAdaptedQueuePool,
+        )
+        # The routing happens in the sync Session underneath, on sync engines
+        AsyncReadSessionLocal = sessionmaker(
+            bind=async_engine,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            replicas=ReplicaSet(
+                [replica.sync_engine for replica in async_replicas],
+                settings.DB_REPLICA_RETRY_SECONDS,
+            ),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -1,24 +1,110 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+
+from app.api.routes import require_admin
 from app.api.routes import router as api_router
-from app.db.session import Base, SessionLocal, engine
-from app.models import budget, category, expense, role, user
-from app.models.role import Role, RoleEnum
+from app.core.principal_cache import Principal
+from app.core.security import shutdown_pool
+from app.core.settings import settings
+from app.core.telemetry import TelemetryMiddleware, render_prometheus
+from app.crud.outbox import deliver_pending
+from app.crud.recurring import materialize_due
+from app.db.init_db import init_db
+from app.db.session import SessionLocal, async_engine
+
+logger = logging.getLogger("app.jobs")
+
+
+def in_session(job):
+    db = SessionLocal()
+    try:
+        return job(db)
+    finally:
+        db.close()
+
 
-app = FastAPI()
+async def periodic_job(name: str, interval: float, job):
+    """Run ``job(db)`` every ``interval`` seconds off the event loop."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            stats = await run_in_threadpool(in_session, job)
+        except Exception:
+            # Another worker holding the SQLite write lock, a dropped
+            # connection...: the jobs are safe to rerun, so the next tick
+            # carries on where this one stopped
+            logger.exception("%s failed", name)
+            continue
+        if any(stats.values()):
+            logger.info("%s: %s", name, stats)
 
-Base.metadata.create_all(bind=engine)
 
-db = SessionLocal()
-for r in RoleEnum:
-    if not db.query(Role).filter_by(name=r).first():
-        db.add(Role(name=r))
-db.commit()
-db.close()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_INIT_ON_STARTUP:
+        await run_in_threadpool(init_db)
+    jobs = []
+    if settings.RECURRING_JOB_INTERVAL_SECONDS > 0:
+        jobs.append(
+            periodic_job(
+                "recurring expense job",
+                settings.RECURRING_JOB_INTERVAL_SECONDS,
+                materialize_due,
+            )
+        )
+    if settings.OUTBOX_JOB_INTERVAL_SECONDS > 0:
+        jobs.append(
+            periodic_job(
+                "outbox delivery",
+                settings.OUTBOX_JOB_INTERVAL_SECONDS,
+                deliver_pending,
+            )
+        )
+    tasks = [asyncio.create_task(job) for job in jobs]
+    yield
+    for task in tasks:
+        task.cancel()
+    shutdown_pool()
+    if async_engine is not None:
+        await async_engine.dispose()
 
-app.include_router(api_router)
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(TelemetryMiddleware)
+
+if settings.DB_ASYNC:
+    from app.api.async_routes import router as async_api_router
+
+    # Swap in the async handler for every route it defines, keeping the
+    # sync router's order so /expenses/export still wins over /{expense_id}.
+    async_routes = {
+        (route.path, frozenset(route.methods)): route
+        for route in async_api_router.routes
+    }
+    mixed_router = APIRouter()
+    mixed_router.routes = [
+        async_routes.get((route.path, frozenset(route.methods)), route)
+        for route in api_router.routes
+    ]
+    app.include_router(mixed_router)
+else:
+    app.include_router(api_router)
 
 
 @app.get("/")
 def read_root():
     return {"message": "Backend is running!"}
+
+
+# Route names, timings and captured SQL are for operators, as the pool
+# metrics are: scrape with an admin token
+@app.get("/metrics", include_in_schema=False)
+def metrics(admin: Principal = Depends(require_admin)):
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
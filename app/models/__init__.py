@@ -0,0 +1,11 @@
+# app/models/__init__.py
+"""Importing any model module registers every table on ``Base.metadata``.
+
+The tables reference each other by name (``expenses.schedule_id`` points at
+``recurring_schedules``...), so ``create_all`` or a mapper lookup after a
+partial import would fail on the missing table.
+"""
+
+from app.models import (budget, category, data_version, expense,  # noqa: F401
+                        monthly_spend, outbox, recurring_schedule, role,
+                        tombstone, user)
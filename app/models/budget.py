@@ -1,18 +1,37 @@
 # app/models/budget.py
-from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from sqlalchemy import (Column, DateTime, Float, ForeignKey, Index, Integer,
+                        String)
 from sqlalchemy.orm import relationship
 
+from app.core.clock import utc_now
 from app.db.session import Base
 
 
 class Budget(Base):
     __tablename__ = "budgets"
+    __table_args__ = (
+        Index(
+            "ix_budgets_user_id_time_period_category_id",
+            "user_id",
+            "time_period",
+            "category_id",
+        ),
+        Index("ix_budgets_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     amount_limit = Column(Float, nullable=False)
     time_period = Column(String, nullable=False)  # format: "2025-06"
+    # Running spend of the category and its subcategories in time_period,
+    # kept current by app.crud.spend alongside monthly_spend
+    spent = Column(Float, nullable=False, default=0.0, server_default="0")
+    updated_at = Column(
+        DateTime,
+        default=utc_now,
+        onupdate=utc_now,
+    )
 
     user = relationship("User", back_populates="budgets")
     category = relationship("Category")
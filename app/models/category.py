@@ -1,17 +1,27 @@
 # app/models/category.py
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
+from app.core.clock import utc_now
 from app.db.session import Base
 
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_owner_id_parent_id", "owner_id", "parent_id"),
+        Index("ix_categories_owner_id_updated_at", "owner_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    updated_at = Column(
+        DateTime,
+        default=utc_now,
+        onupdate=utc_now,
+    )
 
     owner = relationship("User", back_populates="categories")
     parent = relationship("Category", remote_side=[id], back_populates="children")
@@ -0,0 +1,14 @@
+# app/models/data_version.py
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String
+
+from app.db.session import Base
+
+
+class DataVersion(Base):
+    """Per-user change counter of a list resource, bumped by the CRUD writes."""
+
+    __tablename__ = "data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    resource = Column(String, primary_key=True)  # "expenses", "categories", ...
+    version = Column(BigInteger, nullable=False, default=0)
@@ -1,16 +1,22 @@
 # app/models/expense.py
 
-from datetime import datetime, timezone
-
-from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        String)
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Index,
+                        Integer, String)
 from sqlalchemy.orm import relationship
 
+from app.core.clock import utc_now
+from app.db.search import install as install_search
 from app.db.session import Base
 
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_id_date_id", "user_id", "date", "id"),
+        Index("ix_expenses_user_id_updated_at", "user_id", "updated_at"),
+        # One occurrence per schedule and date, however often the job reruns
+        Index("ix_expenses_schedule_id_date", "schedule_id", "date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -22,16 +28,25 @@ class Expense(Base):
     description = Column(String, nullable=True)
     receipt_url = Column(String, nullable=True)
     is_recurring = Column(Boolean, default=False)
+    # Set on occurrences generated from a recurring template
+    schedule_id = Column(
+        Integer,
+        ForeignKey("recurring_schedules.id", ondelete="SET NULL", use_alter=True),
+        nullable=True,
+    )
 
     # ✅ Add this field to store the actual date of the expense
-    date = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    date = Column(DateTime, default=utc_now)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utc_now)
     updated_at = Column(
         DateTime,
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        default=utc_now,
+        onupdate=utc_now,
     )
 
     user = relationship("User", back_populates="expenses")
     category = relationship("Category", back_populates="expenses")
+
+
+install_search(Expense.__table__)
@@ -0,0 +1,16 @@
+# app/models/monthly_spend.py
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
+
+from app.db.session import Base
+
+
+class MonthlySpend(Base):
+    """Running spend per user, category and month, maintained by the expense CRUD."""
+
+    __tablename__ = "monthly_spend"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    period = Column(String, primary_key=True)  # format: "2025-06"
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
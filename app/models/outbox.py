@@ -0,0 +1,23 @@
+# app/models/outbox.py
+from sqlalchemy import (JSON, Column, DateTime, ForeignKey, Index, Integer,
+                        String)
+
+from app.core.clock import utc_now
+from app.db.session import Base
+
+
+class OutboxMessage(Base):
+    """A notification written with the change that raised it, sent later."""
+
+    __tablename__ = "outbox"
+    __table_args__ = (Index("ix_outbox_delivered_at_id", "delivered_at", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    topic = Column(String, nullable=False)  # "budget.threshold", ...
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=utc_now)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Set while a delivery run is sending the message
+    claimed_at = Column(DateTime, nullable=True)
+    delivered_at = Column(DateTime, nullable=True)
@@ -0,0 +1,32 @@
+# app/models/recurring_schedule.py
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer, String,
+                        UniqueConstraint)
+
+from app.db.session import Base
+
+
+class RecurringSchedule(Base):
+    """How often a template expense repeats; ``app.crud.recurring`` materializes it.
+
+    Occurrence ``k`` falls ``k * interval`` frequency units after ``starts_at``
+    (the template's date); ``materialized`` occurrences exist so far and
+    ``next_due`` is the date of the next one, kept for the due-schedule scan.
+    """
+
+    __tablename__ = "recurring_schedules"
+    __table_args__ = (
+        UniqueConstraint("expense_id"),
+        Index("ix_recurring_schedules_next_due_id", "next_due", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    expense_id = Column(
+        Integer, ForeignKey("expenses.id", ondelete="CASCADE"), nullable=False
+    )
+    frequency = Column(String, nullable=False)  # "daily", "weekly", "monthly", ...
+    interval = Column(Integer, nullable=False, default=1)
+    starts_at = Column(DateTime, nullable=False)
+    until = Column(DateTime, nullable=True)
+    materialized = Column(Integer, nullable=False, default=0)
+    next_due = Column(DateTime, nullable=True)  # NULL once past ``until``
@@ -0,0 +1,20 @@
+# app/models/tombstone.py
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.core.clock import utc_now
+from app.db.session import Base
+
+
+class Tombstone(Base):
+    """A deleted row, kept so ``GET /sync`` can tell clients to drop it."""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    resource = Column(String, nullable=False)  # "expenses", "categories", ...
+    record_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=utc_now)
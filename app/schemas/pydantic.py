@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import ForwardRef, List, Optional
+from typing import Any, ForwardRef, List, Literal, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 # token for jwt
@@ -64,13 +64,52 @@ class ExpenseOut(BaseModel):
     amount: float
     description: Optional[str]
     is_recurring: bool
-    date: datetime  # ✅ add this if you want it in response
+    date: Optional[datetime]  # ✅ add this if you want it in response
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class ExpensePage(BaseModel):
+    items: List[ExpenseOut]
+    next_cursor: Optional[str] = None
+
+
+ExpenseFileFormat = Literal["csv", "ndjson"]
+
+# recurrence schema
+RecurrenceFrequency = Literal["daily", "weekly", "monthly", "yearly"]
+
+
+class RecurrenceIn(BaseModel):
+    frequency: RecurrenceFrequency
+    interval: int = Field(1, ge=1, le=366)  # every N days/weeks/months/years
+    until: Optional[datetime] = None  # last date an occurrence may fall on
+
+
+class RecurrenceOut(BaseModel):
+    expense_id: int
+    frequency: RecurrenceFrequency
+    interval: int
+    until: Optional[datetime]
+    next_due: Optional[datetime]  # None once past "until"
+
+    class Config:
+        from_attributes = True
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]  # capped; "failed" has the full count
+
+
 # budget schema
 class BudgetIn(BaseModel):
     category_id: int
@@ -88,5 +127,90 @@ class BudgetOut(BaseModel):
         from_attributes = True
 
 
+class BudgetStatus(BaseModel):
+    id: int
+    category_id: int
+    time_period: str
+    amount_limit: float
+    spent: float
+    remaining: float
+    percent_used: Optional[float]
+
+
+# report schema
+SpendingGroup = Literal["category", "month"]
+
+
+class SpendingRow(BaseModel):
+    category_id: Optional[int] = None
+    month: Optional[str] = None  # e.g. "2025-06"
+    total: float
+    count: int
+    average: float
+
+
+class TrendMonth(BaseModel):
+    month: str  # e.g. "2025-06"
+    total: float
+    moving_average: float
+    growth: Optional[float]  # vs the previous month; None after a month at 0
+    anomaly: bool
+
+
+class CategoryTrend(BaseModel):
+    category_id: int
+    months: List[TrendMonth]
+    forecast: float  # spend expected the month after the range
+
+
+# batch schema
+BatchOp = Literal["create", "update", "delete"]
+BatchEntity = Literal["expense", "category", "budget"]
+
+
+class BatchOperation(BaseModel):
+    op: BatchOp
+    entity: BatchEntity
+    id: Optional[int] = None  # required for update/delete
+    data: Optional[dict] = None  # body of the matching single-item endpoint
+
+
+class BatchIn(BaseModel):
+    operations: List[BatchOperation] = Field(min_length=1, max_length=1000)
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    status: int
+    result: Optional[Any] = None
+    error: Optional[Any] = None
+
+
+class BatchOut(BaseModel):
+    committed: bool
+    results: List[BatchOperationResult]
+
+
+# sync schema
+class SyncCategory(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int]
+
+
+class SyncDeleted(BaseModel):
+    expenses: List[int]
+    categories: List[int]
+    budgets: List[int]
+
+
+class SyncOut(BaseModel):
+    token: str  # pass back as ?since= on the next sync
+    expenses: List[ExpenseOut]
+    categories: List[SyncCategory]  # flat; rebuild the tree from parent_id
+    budgets: List[BudgetOut]
+    deleted: SyncDeleted
+
+
 # category out
 CategoryOut.model_rebuild()
@@ -0,0 +1,169 @@
+"""Throughput of the sync (threadpool) and async (AsyncSession) API modes.
+
+Seeds a throwaway SQLite database, boots ``app.main:app`` under uvicorn once
+with ``DB_ASYNC=false`` and once with ``DB_ASYNC=true``, and holds N keep-alive
+connections open against GET /expenses, reporting requests/sec and latency.
+
+    python -m benchmarks.async_vs_sync --connections 500 --seconds 15
+    python -m benchmarks.async_vs_sync --url postgresql://localhost/bench
+
+The target database is dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+SEED_SCRIPT = """
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.main import app
+from app.core.jwt import create_access_token
+from app.db.session import Base, SessionLocal, engine
+from app.models.category import Category
+from app.models.expense import Expense
+from app.models.role import Role, RoleEnum
+from app.models.user import User
+
+Base.metadata.drop_all(engine)
+Base.metadata.create_all(engine)
+db = SessionLocal()
+account = User(name="bench", email="bench@example.com", hashed_password="x")
+account.role = Role(name=RoleEnum.user)
+db.add(account)
+db.flush()
+food = Category(name="food", owner_id=account.id)
+db.add(food)
+db.flush()
+start = datetime(2024, 1, 1)
+db.execute(insert(Expense), [
+    {"user_id": account.id, "category_id": food.id, "name": f"e{i}",
+     "amount": 1.0 + i % 50, "is_recurring": False,
+     "date": start + timedelta(hours=i)}
+    for i in range(5000)
+])
+db.commit()
+print(create_access_token({"sub": account.email, "uid": account.id, "role": "user"}))
+"""
+
+
+async def client(host, port, path, token, deadline, latencies, errors):
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Authorization: Bearer {token}\r\n\r\n"
+    ).encode()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        errors.append("connect")
+        return
+    try:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            writer.write(request)
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            if b" 200 " not in status:
+                errors.append(status.decode().strip())
+            latencies.append((time.perf_counter() - t0) * 1000)
+    except (OSError, asyncio.IncompleteReadError) as exc:
+        errors.append(type(exc).__name__)
+    finally:
+        writer.close()
+
+
+async def drive(port, token, connections, seconds):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(
+        *(
+            client(
+                "127.0.0.1",
+                port,
+                "/expenses?limit=20",
+                token,
+                deadline,
+                latencies,
+                errors,
+            )
+            for _ in range(connections)
+        )
+    )
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:////tmp/expense_async_bench.db")
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.url,
+        "JWT_SECRET": os.environ.get("JWT_SECRET", "benchmark"),
+    }
+    token = subprocess.run(
+        [sys.executable, "-c", SEED_SCRIPT],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+    for mode in ("false", "true"):
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--port",
+                str(args.port),
+                "--backlog",
+                str(args.connections * 2),
+            ],
+            env={**env, "DB_ASYNC": mode},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{args.port}/", timeout=1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            latencies, errors = asyncio.run(
+                drive(args.port, token, args.connections, args.seconds)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        latencies.sort()
+        label = "async" if mode == "true" else "sync"
+        print(
+            f"{label:>5}: {len(latencies) / args.seconds:,.0f} req/s, "
+            f"p50 {statistics.median(latencies):.1f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms, "
+            f"{len(errors)} errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
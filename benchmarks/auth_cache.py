@@ -0,0 +1,88 @@
+"""Per-request cost of get_current_user with and without the principal cache.
+
+Seeds one user in a throwaway SQLite database, issues a token the way /login
+does, then resolves it through the get_current_user dependency repeatedly,
+counting SQL statements and timing each call.
+
+    python -m benchmarks.auth_cache --requests 5000
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_auth_bench.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.api.routes import get_current_user  # noqa: E402
+from app.core.jwt import create_access_token  # noqa: E402
+from app.core.principal_cache import principal_cache  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models import budget, category, expense, role, user  # noqa: E402,F401
+from app.models.role import Role, RoleEnum  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def seed():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    member = Role(name=RoleEnum.user)
+    account = User(name="bench", email="bench@example.com", hashed_password="x")
+    account.role = member
+    db.add(account)
+    db.commit()
+    token = create_access_token(
+        {"sub": account.email, "uid": account.id, "role": member.name.value}
+    )
+    db.close()
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def run(credentials, requests, cached):
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    principal_cache.clear()
+    timings = []
+    try:
+        for _ in range(requests):
+            if not cached:
+                principal_cache.clear()
+            db = SessionLocal()
+            t0 = time.perf_counter()
+            get_current_user(credentials, db)
+            timings.append((time.perf_counter() - t0) * 1_000_000)
+            db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return statements / requests, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    credentials = seed()
+    for label, cached in (("uncached", False), ("cached", True)):
+        queries, timings = run(credentials, args.requests, cached)
+        timings.sort()
+        print(
+            f"{label:>9}: {queries:.2f} queries/request, "
+            f"p50 {statistics.median(timings):.1f} us, "
+            f"p99 {timings[int(len(timings) * 0.99)]:.1f} us"
+        )
+    print("cache stats:", principal_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
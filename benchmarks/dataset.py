@@ -0,0 +1,512 @@
+"""Synthetic multi-million-row dataset for scale testing.
+
+Fills a fresh database with users, nested category trees, budgets, recurring
+schedules and expenses shaped like real usage:
+
+- Expense counts per user follow a Zipf law (``--skew``), so a few heavy
+  users own a large share of the rows.
+- Dates follow a seasonal curve (a December peak, a smaller summer one,
+  busier weekends) over ``--months`` months.
+- Every user has a few monthly subscriptions (rent, streaming, gym...)
+  generated as a recurring template, its schedule and the occurrences
+  already materialized.
+
+Everything derives from ``--seed``: the same arguments give the same rows,
+ids included. Rows are generated per user and written in ``--chunk-size``
+batches, so memory stays flat at any size. PostgreSQL is loaded with COPY,
+other backends with executemany. The expenses indexes, the search index and
+the FTS triggers are dropped for the load and rebuilt once at the end.
+The monthly rollup and budget totals are then recomputed from the data.
+
+    python -m benchmarks.dataset --users 10000 --expenses 1000000
+    DATABASE_URL=postgresql://localhost/scale python -m benchmarks.dataset \\
+        --users 100000 --expenses 10000000
+
+Every user can log in with the password ``password``; user 1 is an admin.
+The target database is dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import bisect
+import csv
+import io
+import math
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_dataset.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.security import hash_password  # noqa: E402
+from app.crud.recurring import occurrence  # noqa: E402
+from app.crud.roles import load_role_ids  # noqa: E402
+from app.crud.spend import rebuild_monthly_spend  # noqa: E402
+from app.db import search  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.budget import Budget  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.recurring_schedule import RecurringSchedule  # noqa: E402
+from app.models.role import RoleEnum  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+# Leaf category path -> (relative frequency, lognormal mu and sigma of the
+# amount, merchants). Every prefix of a path becomes a category too.
+LEAVES = {
+    ("Food", "Groceries"): (30, 3.2, 0.6, ["Tesco", "Aldi", "Lidl", "Sainsbury's"]),
+    ("Food", "Restaurants", "Dine-in"): (8, 3.6, 0.5, ["Nando's", "Wagamama"]),
+    ("Food", "Restaurants", "Takeaway"): (10, 3.0, 0.4, ["Deliveroo", "Just Eat"]),
+    ("Food", "Coffee"): (18, 1.2, 0.3, ["Starbucks", "Costa", "Pret"]),
+    ("Transport", "Fuel"): (8, 3.9, 0.3, ["Shell", "BP", "Esso"]),
+    ("Transport", "Public transport"): (12, 1.5, 0.5, ["TfL", "Trainline"]),
+    ("Transport", "Taxi"): (4, 2.7, 0.5, ["Uber", "Bolt"]),
+    ("Shopping", "Clothes"): (4, 3.7, 0.7, ["Zara", "Uniqlo", "H&M"]),
+    ("Shopping", "Electronics"): (1, 5.0, 0.9, ["Amazon", "Currys", "Apple"]),
+    ("Shopping", "Gifts"): (3, 3.3, 0.7, ["Amazon", "Etsy"]),
+    ("Entertainment", "Cinema"): (2, 2.5, 0.3, ["Odeon", "Vue"]),
+    ("Entertainment", "Concerts"): (1, 4.0, 0.5, ["Ticketmaster"]),
+    ("Health", "Pharmacy"): (3, 2.3, 0.6, ["Boots", "Superdrug"]),
+    ("Housing", "Repairs"): (1, 4.5, 0.8, ["B&Q", "Screwfix"]),
+}
+# Monthly subscriptions: leaf path -> (name, typical amount)
+SUBSCRIPTIONS = {
+    ("Housing", "Rent"): ("Rent", 1100.0),
+    ("Housing", "Utilities"): ("Energy bill", 95.0),
+    ("Entertainment", "Streaming"): ("Netflix", 10.99),
+    ("Health", "Gym"): ("PureGym", 24.99),
+    ("Transport", "Public transport"): ("Season ticket", 160.0),
+}
+NOTES = ["", "", "", "with friends", "work trip", "birthday", "split the bill"]
+PASSWORD = "password"
+
+
+def stamp(day: datetime, seconds: int) -> str:
+    """The ``YYYY-MM-DD HH:MM:SS.ffffff`` text SQLAlchemy stores on SQLite."""
+    hours, rest = divmod(seconds, 3600)
+    return f"{day:%Y-%m-%d} {hours:02d}:{rest // 60:02d}:{rest % 60:02d}.000000"
+
+
+def day_weights(start: datetime, days: int) -> list[float]:
+    """Relative spend per day: yearly seasons, busier weekends, slow growth."""
+    weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        season = (
+            1
+            + 0.45 * math.exp(-(((day.timetuple().tm_yday - 352) / 14) ** 2))
+            + 0.15 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 200) / 365)
+        )
+        weekend = 1.3 if day.weekday() >= 4 else 1.0
+        weights.append(season * weekend * (1 + 0.3 * offset / days))
+    return weights
+
+
+def allocate(total: int, users: int, skew: float, rng: random.Random) -> list[int]:
+    """Split ``total`` expenses over users by a Zipf law, in shuffled order."""
+    weights = [1 / (rank + 1) ** skew for rank in range(users)]
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    for rank in range(total - sum(counts)):
+        counts[rank % users] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def plans(args, counts, months: list[datetime]):
+    """Per-user plan with every id assigned, replayed identically on each pass.
+
+    Yields dicts with the user's categories ``(id, name, parent_id, path)``,
+    the leaves used for everyday spending, the subscriptions (each with its
+    template expense id, schedule id and occurrence count), the budgets and
+    the first expense id of the user's block of expenses.
+    """
+    category_id = schedule_id = budget_id = 0
+    expense_id = 1
+    subscription_paths = list(SUBSCRIPTIONS)
+    leaf_paths = list(LEAVES)
+    periods = [f"{month:%Y-%m}" for month in months[-12:]]
+    for index, count in enumerate(counts):
+        user_id = index + 1
+        rng = random.Random(f"{args.seed}:{user_id}:plan")
+        leaves = sorted(rng.sample(leaf_paths, rng.randint(5, len(leaf_paths))))
+        subscribed = sorted(
+            rng.sample(subscription_paths, rng.randint(0, len(subscription_paths)))
+        )
+        # A light user's subscriptions may not outnumber their other spending
+        subscriptions, budget_rows = [], []
+        used = 0
+        for path in subscribed:
+            first = rng.randrange(len(months))
+            occurrences = len(months) - first
+            if used + occurrences > count // 2:
+                continue
+            used += occurrences
+            schedule_id += 1
+            name, amount = SUBSCRIPTIONS[path]
+            subscriptions.append(
+                {
+                    "path": path,
+                    "name": name,
+                    "amount": round(amount * rng.uniform(0.8, 1.25), 2),
+                    "starts_at": months[first].replace(day=rng.randint(1, 28)),
+                    "occurrences": occurrences,
+                    "schedule_id": schedule_id,
+                    "template_id": expense_id + used - occurrences,
+                }
+            )
+        categories, ids = [], {}
+        for path in leaves + [s["path"] for s in subscriptions]:
+            for depth in range(1, len(path) + 1):
+                prefix = path[:depth]
+                if prefix not in ids:
+                    category_id += 1
+                    ids[prefix] = category_id
+                    parent = ids[prefix[:-1]] if depth > 1 else None
+                    categories.append((category_id, prefix[-1], parent, prefix))
+        # Active users budget every top-level category for the last year,
+        # near their usual spend there so some of the budgets run over
+        monthly = (count - used) / len(months)
+        total_weight = sum(LEAVES[path][0] for path in leaves)
+        for root in sorted({path[0] for path in leaves} if monthly >= 1 else ()):
+            expected = sum(
+                monthly
+                * LEAVES[path][0]
+                / total_weight
+                * math.exp(LEAVES[path][1] + LEAVES[path][2] ** 2 / 2)
+                for path in leaves
+                if path[0] == root
+            )
+            for period in periods:
+                budget_id += 1
+                limit = max(10.0, round(expected * rng.uniform(0.7, 1.4), -1))
+                budget_rows.append((budget_id, user_id, ids[(root,)], limit, period))
+        yield {
+            "user_id": user_id,
+            "count": count,
+            "categories": categories,
+            "ids": ids,
+            "leaves": leaves,
+            "subscriptions": subscriptions,
+            "budgets": budget_rows,
+            "first_expense_id": expense_id,
+        }
+        expense_id += max(count, used)
+
+
+def user_rows(args, counts, months, role_ids, hashed):
+    for plan in plans(args, counts, months):
+        user_id = plan["user_id"]
+        role = RoleEnum.admin if user_id == 1 else RoleEnum.user
+        joined = stamp(months[0], 9 * 3600)
+        yield (
+            user_id,
+            f"User {user_id}",
+            f"user{user_id}@example.com",
+            hashed,
+            role_ids[role],
+            joined,
+            joined,
+        )
+
+
+def category_rows(args, counts, months):
+    updated = stamp(months[0], 9 * 3600)
+    for plan in plans(args, counts, months):
+        for category_id, name, parent_id, _ in plan["categories"]:
+            yield (category_id, name, plan["user_id"], parent_id, updated)
+
+
+def budget_rows(args, counts, months):
+    updated = stamp(months[0], 9 * 3600)
+    for plan in plans(args, counts, months):
+        for row in plan["budgets"]:
+            yield (*row, updated)
+
+
+def schedule_rows(args, counts, months):
+    for plan in plans(args, counts, months):
+        for s in plan["subscriptions"]:
+            n = s["occurrences"]
+            starts_at = s["starts_at"]
+            yield (
+                s["schedule_id"],
+                plan["user_id"],
+                s["template_id"],
+                "monthly",
+                1,
+                stamp(starts_at, 0),
+                None,
+                n - 1,
+                stamp(occurrence("monthly", 1, starts_at, n), 0),
+            )
+
+
+def expense_rows(args, counts, months, start, cumulative):
+    """All expenses, user by user: subscriptions first, then everyday spending."""
+    days = len(cumulative)
+    day_list = [start + timedelta(days=offset) for offset in range(days)]
+    day_text = [f"{day:%Y-%m-%d}" for day in day_list]
+    leaf_specs = LEAVES
+    for plan in plans(args, counts, months):
+        user_id = plan["user_id"]
+        ids = plan["ids"]
+        expense_id = plan["first_expense_id"]
+        for s in plan["subscriptions"]:
+            category_id = ids[s["path"]]
+            for k in range(s["occurrences"]):
+                when = stamp(occurrence("monthly", 1, s["starts_at"], k), 8 * 3600)
+                yield (
+                    expense_id,
+                    user_id,
+                    category_id,
+                    s["name"],
+                    s["amount"],
+                    None,
+                    1,
+                    s["schedule_id"] if k else None,
+                    when,
+                    when,
+                    when,
+                )
+                expense_id += 1
+        rng = random.Random(f"{args.seed}:{user_id}:expenses")
+        leaves = plan["leaves"]
+        leaf_cumulative = list(accumulate(leaf_specs[path][0] for path in leaves))
+        remaining = plan["count"] - sum(s["occurrences"] for s in plan["subscriptions"])
+        # Draw in slices so a heavy user never holds more than a chunk
+        while remaining > 0:
+            n = min(remaining, args.chunk_size)
+            remaining -= n
+            picks = rng.choices(leaves, cum_weights=leaf_cumulative, k=n)
+            offsets = [
+                bisect.bisect(cumulative, rng.random() * cumulative[-1])
+                for _ in range(n)
+            ]
+            for path, offset in zip(picks, offsets):
+                _, mu, sigma, merchants = leaf_specs[path]
+                seconds = rng.randrange(7 * 3600, 23 * 3600)
+                hours, rest = divmod(seconds, 3600)
+                when = (
+                    f"{day_text[min(offset, days - 1)]} "
+                    f"{hours:02d}:{rest // 60:02d}:{rest % 60:02d}.000000"
+                )
+                note = rng.choice(NOTES)
+                yield (
+                    expense_id,
+                    user_id,
+                    ids[path],
+                    f"{rng.choice(merchants)} {path[-1].lower()}",
+                    round(rng.lognormvariate(mu, sigma), 2),
+                    note or None,
+                    0,
+                    None,
+                    when,
+                    when,
+                    when,
+                )
+                expense_id += 1
+
+
+COLUMNS = {
+    User: (
+        "id",
+        "name",
+        "email",
+        "hashed_password",
+        "role_id",
+        "created_at",
+        "updated_at",
+    ),
+    Category: ("id", "name", "owner_id", "parent_id", "updated_at"),
+    Budget: (
+        "id",
+        "user_id",
+        "category_id",
+        "amount_limit",
+        "time_period",
+        "updated_at",
+    ),
+    Expense: (
+        "id",
+        "user_id",
+        "category_id",
+        "name",
+        "amount",
+        "description",
+        "is_recurring",
+        "schedule_id",
+        "date",
+        "created_at",
+        "updated_at",
+    ),
+    RecurringSchedule: (
+        "id",
+        "user_id",
+        "expense_id",
+        "frequency",
+        "interval",
+        "starts_at",
+        "until",
+        "materialized",
+        "next_due",
+    ),
+}
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def load(conn, model, rows, chunk_size) -> int:
+    """Write ``rows`` (tuples in ``COLUMNS[model]`` order) chunk by chunk."""
+    table = model.__tablename__
+    quote = conn.dialect.identifier_preparer.quote
+    columns = [quote(name) for name in COLUMNS[model]]
+    written = 0
+    if conn.dialect.name == "postgresql":
+        cursor = conn.connection.cursor()
+        copy = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        for batch in batches(rows, chunk_size):
+            buffer = io.StringIO()
+            # None becomes an unquoted empty field, which COPY reads as NULL
+            csv.writer(buffer).writerows(batch)
+            buffer.seek(0)
+            cursor.copy_expert(copy, buffer)
+            written += len(batch)
+        return written
+    marker = "?" if conn.dialect.paramstyle == "qmark" else "%s"
+    insert = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join([marker] * len(columns))})"
+    )
+    for batch in batches(rows, chunk_size):
+        conn.exec_driver_sql(insert, batch)
+        written += len(batch)
+    return written
+
+
+SQLITE_TRIGGERS = re.findall(
+    r"CREATE TRIGGER IF NOT EXISTS (\w+)", " ".join(search.SQLITE_DDL)
+)
+# The expenses <-> recurring_schedules foreign keys form a cycle; on
+# PostgreSQL this one is dropped for the load and validated once after it
+SCHEDULE_FK = (
+    "ALTER TABLE expenses ADD CONSTRAINT expenses_schedule_id_fkey "
+    "FOREIGN KEY (schedule_id) REFERENCES recurring_schedules (id) "
+    "ON DELETE SET NULL"
+)
+
+
+def drop_expense_indexes(conn):
+    for index in Expense.__table__.indexes:
+        index.drop(conn)
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_expenses_search")
+        conn.exec_driver_sql(
+            "ALTER TABLE expenses DROP CONSTRAINT IF EXISTS expenses_schedule_id_fkey"
+        )
+    elif conn.dialect.name == "sqlite":
+        for trigger in SQLITE_TRIGGERS:
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def create_expense_indexes(conn):
+    for index in Expense.__table__.indexes:
+        index.create(conn)
+    if conn.dialect.name == "postgresql":
+        for statement in search.POSTGRES_DDL:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(SCHEDULE_FK)
+    elif conn.dialect.name == "sqlite":
+        for statement in search.SQLITE_DDL:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(
+            "INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild')"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--expenses", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--start", default="2023-01-01")
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    start = datetime.fromisoformat(args.start).replace(day=1)
+    months = [occurrence("monthly", 1, start, k) for k in range(args.months)]
+    days = (occurrence("monthly", 1, start, args.months) - start).days
+    cumulative = list(accumulate(day_weights(start, days)))
+    counts = allocate(args.expenses, args.users, args.skew, random.Random(args.seed))
+    print(
+        f"{engine.dialect.name}: {args.users:,} users, {args.expenses:,} expenses "
+        f"from {start:%Y-%m} over {args.months} months; heaviest user has "
+        f"{max(counts):,}, median {sorted(counts)[len(counts) // 2]:,}"
+    )
+
+    Base.metadata.drop_all(engine)
+    init_db()
+    db = SessionLocal()
+    role_ids = load_role_ids(db)
+    db.close()
+    hashed = hash_password(PASSWORD)
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            conn.exec_driver_sql("PRAGMA journal_mode = MEMORY")
+        with conn.begin():
+            drop_expense_indexes(conn)
+        steps = [
+            (User, user_rows(args, counts, months, role_ids, hashed)),
+            (Category, category_rows(args, counts, months)),
+            (Budget, budget_rows(args, counts, months)),
+            (Expense, expense_rows(args, counts, months, start, cumulative)),
+            (RecurringSchedule, schedule_rows(args, counts, months)),
+        ]
+        for model, rows in steps:
+            t0 = time.perf_counter()
+            with conn.begin():
+                written = load(conn, model, rows, args.chunk_size)
+            seconds = time.perf_counter() - t0
+            print(
+                f"  {model.__tablename__:>20}: {written:>11,} rows in {seconds:7.1f} s "
+                f"({written / max(seconds, 1e-9):,.0f}/s)"
+            )
+        t0 = time.perf_counter()
+        with conn.begin():
+            create_expense_indexes(conn)
+            if conn.dialect.name == "postgresql":
+                # Explicit ids leave the sequences behind
+                for model in COLUMNS:
+                    table = model.__tablename__
+                    conn.exec_driver_sql(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                    )
+        print(f"  {'indexes':>20}: rebuilt in {time.perf_counter() - t0:7.1f} s")
+        conn.exec_driver_sql("ANALYZE")
+
+    t0 = time.perf_counter()
+    db = SessionLocal()
+    rebuild_monthly_spend(db)
+    db.close()
+    print(f"  {'rollups':>20}: rebuilt in {time.perf_counter() - t0:7.1f} s")
+    print(f"done in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Peak memory of the streaming expense export as history grows.
+
+Seeds one user with N expenses, drains ``export_expenses`` for each size and
+reports the tracemalloc peak and process max RSS. The peak should stay flat
+from 10k to millions of rows.
+
+    python -m benchmarks.export_memory --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import resource
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_export_bench.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.crud.expenses import export_expenses  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models import budget, category, expense, role, user  # noqa: E402,F401
+from app.models.category import Category  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.role import Role, RoleEnum  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def seed(rows):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    account = User(name="bench", email="bench@example.com", hashed_password="x")
+    account.role = Role(name=RoleEnum.user)
+    db.add(account)
+    db.flush()
+    food = Category(name="food", owner_id=account.id)
+    db.add(food)
+    db.flush()
+    rng = random.Random(3)
+    start = datetime(2015, 1, 1)
+    for offset in range(0, rows, 50_000):
+        db.execute(
+            insert(Expense),
+            [
+                {
+                    "user_id": account.id,
+                    "category_id": food.id,
+                    "name": f"expense {i}",
+                    "amount": round(rng.uniform(1, 300), 2),
+                    "description": "seeded",
+                    "is_recurring": False,
+                    "date": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(rows, offset + 50_000))
+            ],
+        )
+    user_id = account.id
+    db.commit()
+    db.close()
+    return user_id
+
+
+def drain(user_id, fmt):
+    db = SessionLocal()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    size = sum(len(chunk) for chunk in export_expenses(db, user_id, fmt))
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.close()
+    return size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        user_id = seed(rows)
+        size, elapsed, peak = drain(user_id, args.format)
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(
+            f"{rows:>9} rows: {size / 1e6:.1f} MB out in {elapsed:.2f}s, "
+            f"peak traced {peak / 1e6:.2f} MB, max RSS {max_rss:.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
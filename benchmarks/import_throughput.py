@@ -0,0 +1,97 @@
+"""Throughput of the streaming bulk expense import.
+
+Generates a CSV or NDJSON upload in memory-bounded chunks and feeds it to
+``app.crud.expenses.import_expenses`` against a throwaway database, reporting
+rows/sec (the HTTP layer only forwards chunks, so it is left out).
+
+    python -m benchmarks.import_throughput --rows 200000 --format csv
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_import_bench.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from app.crud.expenses import import_expenses  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models import (budget, category, expense,  # noqa: E402,F401
+                        monthly_spend, role, user)
+from app.models.category import Category  # noqa: E402
+from app.models.role import Role, RoleEnum  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+CATEGORIES = 20
+
+
+def seed():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    account = User(name="bench", email="bench@example.com", hashed_password="x")
+    account.role = Role(name=RoleEnum.user)
+    db.add(account)
+    db.flush()
+    categories = [
+        Category(name=f"c{i}", owner_id=account.id) for i in range(CATEGORIES)
+    ]
+    db.add_all(categories)
+    db.commit()
+    return account.id, [c.id for c in categories]
+
+
+def upload(rows, fmt, category_ids, chunk_rows=1000):
+    rng = random.Random(7)
+    if fmt == "csv":
+        yield b"name,category_id,amount,description,date,is_recurring\n"
+    lines = []
+    for i in range(rows):
+        record = {
+            "name": f"expense {i}",
+            "category_id": rng.choice(category_ids),
+            "amount": round(rng.uniform(1, 300), 2),
+            "description": "imported",
+            "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "is_recurring": rng.random() < 0.1,
+        }
+        if fmt == "csv":
+            lines.append(",".join(str(v) for v in record.values()))
+        else:
+            lines.append(json.dumps(record))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    user_id, category_ids = seed()
+    db = SessionLocal()
+    t0 = time.perf_counter()
+    report = import_expenses(
+        db,
+        user_id,
+        upload(args.rows, args.format, category_ids),
+        args.format,
+        batch_size=args.batch_size,
+    )
+    elapsed = time.perf_counter() - t0
+    db.close()
+    print(
+        f"{report['inserted']} rows inserted, {report['failed']} failed "
+        f"in {elapsed:.2f}s -> {report['inserted'] / elapsed:,.0f} rows/sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Query-plan benchmark for the per-user composite indexes.
+
+Seeds a throwaway database, then runs the hot per-user CRUD queries twice:
+once without the composite indexes from revision 3a9d1c7e5b42 and once with
+them, printing the EXPLAIN output and median latency of each query.
+
+    python -m benchmarks.index_plans --url sqlite:////tmp/bench.db
+    python -m benchmarks.index_plans --url postgresql://localhost/bench --expenses 2000000
+
+The target database is dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app.db.session import Base  # noqa: E402
+from app.models import budget, category, expense, role, user  # noqa: E402,F401
+
+INDEXED_TABLES = ("expenses", "budgets", "categories")
+
+QUERIES = {
+    "expenses page": (
+        "SELECT * FROM expenses WHERE user_id = :uid "
+        "ORDER BY date DESC, id DESC LIMIT 51"
+    ),
+    "expenses in month": (
+        "SELECT * FROM expenses WHERE user_id = :uid "
+        "AND date >= :start AND date < :end"
+    ),
+    "budgets by user": "SELECT * FROM budgets WHERE user_id = :uid",
+    "budgets in period": (
+        "SELECT * FROM budgets WHERE user_id = :uid AND time_period = :period"
+    ),
+    "categories by owner": "SELECT * FROM categories WHERE owner_id = :uid",
+    "root categories": (
+        "SELECT * FROM categories WHERE owner_id = :uid AND parent_id IS NULL"
+    ),
+}
+
+
+def composite_indexes():
+    return [
+        index
+        for name in INDEXED_TABLES
+        for index in Base.metadata.tables[name].indexes
+        if len(index.columns) > 1
+    ]
+
+
+def insert_chunked(conn, table, rows, chunk=10_000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk:
+            conn.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+
+
+def seed(engine, users, categories_per_user, expenses, seed_value):
+    rng = random.Random(seed_value)
+    tables = Base.metadata.tables
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    for index in composite_indexes():
+        index.drop(engine)
+
+    start = datetime(2023, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(tables["roles"].insert(), [{"id": 1, "name": "user"}])
+        insert_chunked(
+            conn,
+            tables["users"],
+            (
+                {
+                    "id": u,
+                    "name": f"user{u}",
+                    "email": f"user{u}@example.com",
+                    "hashed_password": "x",
+                    "role_id": 1,
+                }
+                for u in range(1, users + 1)
+            ),
+        )
+        insert_chunked(
+            conn,
+            tables["categories"],
+            (
+                {
+                    "id": (u - 1) * categories_per_user + c,
+                    "name": f"cat{c}",
+                    "owner_id": u,
+                    "parent_id": (
+                        None if c <= 3 else (u - 1) * categories_per_user + c % 3 + 1
+                    ),
+                }
+                for u in range(1, users + 1)
+                for c in range(1, categories_per_user + 1)
+            ),
+        )
+        insert_chunked(
+            conn,
+            tables["budgets"],
+            (
+                {
+                    "user_id": u,
+                    "category_id": (u - 1) * categories_per_user + c,
+                    "amount_limit": 500.0,
+                    "time_period": f"{2023 + m // 12}-{m % 12 + 1:02d}",
+                }
+                for u in range(1, users + 1)
+                for m in range(24)
+                for c in range(1, 4)
+            ),
+        )
+
+        def expense_rows():
+            for i in range(expenses):
+                u = rng.randint(1, users)
+                yield {
+                    "user_id": u,
+                    "category_id": (u - 1) * categories_per_user
+                    + rng.randint(1, categories_per_user),
+                    "name": f"expense{i}",
+                    "amount": round(rng.uniform(1, 300), 2),
+                    "is_recurring": False,
+                    "date": start + timedelta(minutes=rng.randint(0, 2 * 525_600)),
+                }
+
+        insert_chunked(conn, tables["expenses"], expense_rows())
+
+
+def explain(conn, sql, params):
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+        return "\n".join(row[-1] for row in rows)
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text("EXPLAIN ANALYZE " + sql), params).fetchall()
+    else:
+        rows = conn.execute(text("EXPLAIN " + sql), params).fetchall()
+    return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+
+def measure(engine, users, repeat, seed_value):
+    rng = random.Random(seed_value)
+    params = {
+        "uid": rng.randint(1, users),
+        "start": datetime(2024, 3, 1),
+        "end": datetime(2024, 4, 1),
+        "period": "2024-03",
+    }
+    results = {}
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE"))
+        for name, sql in QUERIES.items():
+            plan = explain(conn, sql, params)
+            timings = []
+            for _ in range(repeat):
+                params["uid"] = rng.randint(1, users)
+                t0 = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - t0) * 1000)
+            results[name] = (plan, statistics.median(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:////tmp/expense_index_bench.db")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--expenses", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    t0 = time.perf_counter()
+    seed(engine, args.users, args.categories, args.expenses, args.seed)
+    print(f"seeded {args.expenses} expenses in {time.perf_counter() - t0:.1f}s")
+
+    before = measure(engine, args.users, args.repeat, args.seed)
+    for index in composite_indexes():
+        index.create(engine)
+    after = measure(engine, args.users, args.repeat, args.seed)
+
+    for name in QUERIES:
+        (plan_before, ms_before), (plan_after, ms_after) = before[name], after[name]
+        print(f"\n=== {name}: {ms_before:.3f} ms -> {ms_after:.3f} ms")
+        print("--- before\n" + plan_before)
+        print("--- after\n" + plan_after)
+
+
+if __name__ == "__main__":
+    main()
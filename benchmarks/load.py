@@ -0,0 +1,571 @@
+"""Load test of every route in app/api/routes.py, with a regression check.
+
+Seeds a throwaway database for each ``--url``, boots ``app.main:app`` under
+uvicorn on it, and drives one route at a time from ``--concurrency``
+keep-alive connections for ``--seconds``. For each route it records
+throughput, p50/p95/p99 latency and SQL statements per request (read from
+the app's own ``/metrics``), and writes everything to a JSON results file.
+Routes the server has but this suite does not drive are listed, so a new
+endpoint cannot go unmeasured by accident.
+
+    python -m benchmarks.load --results results.json
+    python -m benchmarks.load --url sqlite:////tmp/load.db \\
+        --url postgresql://localhost/bench --concurrency 32 --seconds 10
+    python -m benchmarks.load --baseline baseline.json --max-regression 0.2
+    python -m benchmarks.load --current results.json --baseline baseline.json
+
+With ``--baseline`` the run (or the ``--current`` file, without running) is
+compared route by route and the command exits with status 1 when any route
+got slower or lower-throughput by more than ``--max-regression``, or now runs
+more SQL statements per request. Routes that delete first create what they
+delete, untimed; their throughput is over wall time, so it includes that.
+
+The target databases are dropped and recreated, so never point them at real
+data.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from itertools import count
+
+SEED_SCRIPT = """
+import json, random, sys
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.core.jwt import create_access_token
+from app.crud.users import create_user
+from app.db.init_db import init_db
+from app.db.session import Base, SessionLocal, engine
+from app.models.budget import Budget
+from app.models.category import Category
+from app.models.expense import Expense
+from app.schemas.pydantic import UserCreate
+
+expenses = int(sys.argv[1])
+Base.metadata.drop_all(engine)
+init_db()
+db = SessionLocal()
+account = create_user(db, UserCreate(name="bench", email="bench@example.com",
+                                     password="benchmark"))
+admin = create_user(db, UserCreate(name="admin", email="admin@example.com",
+                                   password="benchmark"), role_name="admin")
+home = Category(name="home", owner_id=account.id)
+db.add(home)
+db.flush()
+leaves = [Category(name=name, owner_id=account.id, parent_id=home.id)
+          for name in ("food", "fuel", "bills", "fun")]
+db.add_all(leaves)
+db.flush()
+rng = random.Random(0)
+words = ["coffee", "lunch", "fuel", "groceries", "gift", "travel", "office"]
+start = datetime(2024, 1, 1)
+db.execute(insert(Expense), [
+    {"user_id": account.id, "category_id": rng.choice(leaves).id,
+     "name": f"{rng.choice(words)} {i}", "amount": round(rng.uniform(1, 80), 2),
+     "description": rng.choice(words), "is_recurring": False,
+     "date": start + timedelta(minutes=53 * i)}
+    for i in range(expenses)
+])
+db.add_all([Budget(user_id=account.id, category_id=category.id,
+                   amount_limit=500.0, time_period=f"2024-{month:02d}")
+            for category in [home, *leaves] for month in range(1, 13)])
+db.commit()
+from app.crud.spend import rebuild_monthly_spend
+rebuild_monthly_spend(db)
+first = db.query(Expense.id).filter(Expense.user_id == account.id).first()[0]
+from app.crud.recurring import set_schedule
+from app.schemas.pydantic import RecurrenceIn
+set_schedule(db, first, account.id, RecurrenceIn(frequency="monthly"))
+budget = db.query(Budget.id).filter(Budget.user_id == account.id).first()[0]
+print(json.dumps({
+    "token": create_access_token({"sub": account.email, "uid": account.id,
+                                  "role": "user"}),
+    "admin_token": create_access_token({"sub": admin.email, "uid": admin.id,
+                                        "role": "admin"}),
+    "category_id": leaves[0].id,
+    "parent_id": home.id,
+    "expense_id": first,
+    "budget_id": budget,
+}))
+"""
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection speaking just enough of the protocol."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    async def call(self, method, path, body=None, token=None):
+        if isinstance(body, str):
+            payload, content_type = body.encode(), "text/csv"
+        elif body is not None:
+            payload, content_type = json.dumps(body).encode(), "application/json"
+        else:
+            payload, content_type = b"", None
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}"]
+        if token:
+            head.append(f"Authorization: Bearer {token}")
+        if content_type:
+            head.append(f"Content-Type: {content_type}")
+        head.append(f"Content-Length: {len(payload)}")
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+        status = int((await self.reader.readline()).split()[1])
+        length, chunked = 0, False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"transfer-encoding" and b"chunked" in value.lower():
+                chunked = True
+        if not chunked:
+            return status, await self.reader.readexactly(length)
+        # Streaming responses (GET /expenses/export) arrive chunked
+        parts = []
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0], 16)
+            if not size:
+                await self.reader.readline()
+                return status, b"".join(parts)
+            parts.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+
+# --- one request per route ---------------------------------------------------
+# Each scenario gets a connection, the seed ids and a counter unique to the
+# run, does any untimed setup on the connection and returns the timed
+# request as (path, body); the method comes from the route key.
+
+
+def expense_body(seed, n):
+    return {
+        "name": f"load {n}",
+        "amount": 12.5,
+        "description": "coffee",
+        "date": "2024-06-15T12:00:00",
+        "category_id": seed["category_id"],
+        "is_recurring": False,
+    }
+
+
+async def created_id(conn, seed, path, body):
+    status, payload = await conn.call("POST", path, body, seed["token"])
+    if status != 200:
+        raise RuntimeError(f"setup POST {path} returned {status}")
+    return json.loads(payload)["id"]
+
+
+async def signup(conn, seed, n):
+    email = f"load{os.getpid()}-{n}@example.com"
+    return "/signup", {"name": "load", "email": email, "password": "benchmark"}
+
+
+async def login(conn, seed, n):
+    body = {"name": "bench", "email": "bench@example.com", "password": "benchmark"}
+    return "/login", body
+
+
+async def delete_category(conn, seed, n):
+    body = {"name": f"doomed {n}", "parent_id": seed["parent_id"]}
+    return f"/categories/{await created_id(conn, seed, '/categories', body)}", None
+
+
+async def delete_expense(conn, seed, n):
+    expense_id = await created_id(conn, seed, "/expenses", expense_body(seed, n))
+    return f"/expenses/{expense_id}", None
+
+
+async def delete_schedule(conn, seed, n):
+    expense_id = await created_id(conn, seed, "/expenses", expense_body(seed, n))
+    path = f"/expenses/{expense_id}/schedule"
+    await conn.call("PUT", path, {"frequency": "monthly"}, seed["token"])
+    return path, None
+
+
+async def delete_budget(conn, seed, n):
+    body = {
+        "category_id": seed["category_id"],
+        "amount_limit": 100.0,
+        "time_period": "2030-01",
+    }
+    return f"/budgets/{await created_id(conn, seed, '/budgets', body)}", None
+
+
+IMPORT_CSV = "name,amount,category_id,date\n" + "".join(
+    f"imported {i},{i % 40 + 1}.5,{{category_id}},2024-07-{i % 28 + 1:02d}\n"
+    for i in range(100)
+)
+
+
+def batch_body(seed, n):
+    return {
+        "operations": [
+            {"op": "create", "entity": "expense", "data": expense_body(seed, n)},
+            {
+                "op": "update",
+                "entity": "budget",
+                "id": seed["budget_id"],
+                "data": {
+                    "category_id": seed["category_id"],
+                    "amount_limit": 400.0 + n % 10,
+                    "time_period": "2024-01",
+                },
+            },
+        ]
+    }
+
+
+def simple(path, body=None):
+    """Scenario for a route whose request does not depend on earlier ones."""
+
+    async def scenario(conn, seed, n):
+        return (
+            path(seed, n) if callable(path) else path,
+            body(seed, n) if callable(body) else body,
+        )
+
+    return scenario
+
+
+SCENARIOS = {
+    "GET /": simple("/"),
+    "POST /signup": signup,
+    "POST /login": login,
+    "POST /categories": simple(
+        "/categories", lambda s, n: {"name": f"c{n}", "parent_id": s["parent_id"]}
+    ),
+    "GET /categories": simple("/categories"),
+    "PUT /categories/{cat_id}": simple(
+        lambda s, n: f"/categories/{s['category_id']}",
+        lambda s, n: {"name": f"food {n % 3}", "parent_id": s["parent_id"]},
+    ),
+    "DELETE /categories/{cat_id}": delete_category,
+    "POST /expenses": simple("/expenses", expense_body),
+    "GET /expenses": simple("/expenses?limit=20"),
+    "GET /expenses/search": simple("/expenses/search?q=coffee&limit=20"),
+    "GET /expenses/export": simple("/expenses/export?format=csv"),
+    "POST /expenses/import": simple(
+        "/expenses/import?format=csv",
+        lambda s, n: IMPORT_CSV.replace("{category_id}", str(s["category_id"])),
+    ),
+    "GET /expenses/{expense_id}": simple(lambda s, n: f"/expenses/{s['expense_id']}"),
+    "PUT /expenses/{expense_id}": simple(
+        lambda s, n: f"/expenses/{s['expense_id']}", expense_body
+    ),
+    "DELETE /expenses/{expense_id}": delete_expense,
+    "PUT /expenses/{expense_id}/schedule": simple(
+        lambda s, n: f"/expenses/{s['expense_id']}/schedule",
+        {"frequency": "monthly"},
+    ),
+    "GET /expenses/{expense_id}/schedule": simple(
+        lambda s, n: f"/expenses/{s['expense_id']}/schedule"
+    ),
+    "DELETE /expenses/{expense_id}/schedule": delete_schedule,
+    "POST /budgets": simple(
+        "/budgets",
+        lambda s, n: {
+            "category_id": s["category_id"],
+            "amount_limit": 250.0,
+            "time_period": f"{2100 + n // 12}-{n % 12 + 1:02d}",
+        },
+    ),
+    "GET /budgets": simple("/budgets"),
+    "GET /budgets/status": simple("/budgets/status?time_period=2024-06"),
+    "GET /budgets/{budget_id}": simple(lambda s, n: f"/budgets/{s['budget_id']}"),
+    "PUT /budgets/{budget_id}": simple(
+        lambda s, n: f"/budgets/{s['budget_id']}",
+        lambda s, n: {
+            "category_id": s["category_id"],
+            "amount_limit": 400.0 + n % 10,
+            "time_period": "2024-01",
+        },
+    ),
+    "DELETE /budgets/{budget_id}": delete_budget,
+    "GET /reports/spending": simple(
+        "/reports/spending?group_by=category&group_by=month"
+    ),
+    "GET /reports/trends": simple("/reports/trends?end=2024-12&months=12"),
+    "POST /batch": simple("/batch", batch_body),
+    "GET /sync": simple("/sync"),
+    "GET /admin/metrics/pool": simple("/admin/metrics/pool"),
+    "GET /debug/users": simple("/debug/users"),
+    "GET /debug/auth-cache": simple("/debug/auth-cache"),
+    "GET /debug/categories": simple("/debug/categories"),
+}
+# Routes called with the admin's token instead of the seeded user's
+ADMIN_ROUTES = {"GET /admin/metrics/pool"}
+# Routes that must not carry a token at all
+PUBLIC_ROUTES = {"POST /signup", "POST /login"}
+
+
+async def drive(port, seed, route, concurrency, seconds, counter):
+    method = route.split()[0]
+    scenario = SCENARIOS[route]
+    token = seed["admin_token"] if route in ADMIN_ROUTES else seed["token"]
+    if route in PUBLIC_ROUTES:
+        token = None
+    latencies, errors = [], []
+
+    async def client():
+        conn = Connection("127.0.0.1", port)
+        try:
+            await conn.open()
+            while time.perf_counter() < deadline:
+                path, body = await scenario(conn, seed, next(counter))
+                t0 = time.perf_counter()
+                status, _ = await conn.call(method, path, body, token)
+                elapsed = (time.perf_counter() - t0) * 1000
+                if status >= 400:
+                    errors.append(status)
+                else:
+                    latencies.append(elapsed)
+        except (OSError, RuntimeError, asyncio.IncompleteReadError) as exc:
+            errors.append(type(exc).__name__)
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    deadline = started + seconds
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+STATEMENTS = re.compile(
+    r'^http_request_sql_statements_(sum|count)\{method="([A-Z]+)",route="([^"]*)"\} '
+    r"(\S+)$",
+    re.M,
+)
+
+
+def statement_totals(base, token):
+    """``{route: [statements, requests]}`` from the app's Prometheus endpoint."""
+    request = urllib.request.Request(
+        f"{base}/metrics", headers={"Authorization": f"Bearer {token}"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        text = response.read().decode()
+    totals: dict = {}
+    for kind, method, route, value in STATEMENTS.findall(text):
+        pair = totals.setdefault(f"{method} {route}", [0.0, 0.0])
+        pair[0 if kind == "sum" else 1] = float(value)
+    return totals
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    # Nearest rank: the smallest value with at least ``fraction`` of samples
+    return round(ordered[max(math.ceil(len(ordered) * fraction) - 1, 0)], 3)
+
+
+def run_url(url, args):
+    env = {
+        **os.environ,
+        "DATABASE_URL": url,
+        "JWT_SECRET": os.environ.get("JWT_SECRET", "benchmark"),
+        # Background jobs would add their own load to whatever route is running
+        "RECURRING_JOB_INTERVAL_SECONDS": "0",
+        "OUTBOX_JOB_INTERVAL_SECONDS": "0",
+    }
+    seed = json.loads(
+        subprocess.run(
+            [sys.executable, "-c", SEED_SCRIPT, str(args.expenses)],
+            env={**env, "PASSWORD_HASH_WORKERS": "0"},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(args.port),
+            "--backlog",
+            str(args.concurrency * 4),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{args.port}"
+    results, counter = {}, count()
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"{base}/", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.1)
+        with urllib.request.urlopen(f"{base}/openapi.json", timeout=10) as response:
+            served = {
+                f"{method.upper()} {path}"
+                for path, operations in json.load(response)["paths"].items()
+                for method in operations
+            }
+        for route in sorted(served - SCENARIOS.keys()):
+            print(f"  no scenario for {route}; it is not measured")
+        for route in SCENARIOS:
+            if args.routes and not any(part in route for part in args.routes):
+                continue
+            before = statement_totals(base, seed["admin_token"])
+            latencies, errors, wall = asyncio.run(
+                drive(args.port, seed, route, args.concurrency, args.seconds, counter)
+            )
+            after = statement_totals(base, seed["admin_token"])
+            statements, requests = (
+                a - b
+                for a, b in zip(after.get(route, (0, 0)), before.get(route, (0, 0)))
+            )
+            latencies.sort()
+            results[route] = {
+                "requests": len(latencies),
+                "errors": len(errors),
+                "throughput": round(len(latencies) / wall, 2),
+                "p50_ms": percentile(latencies, 0.50),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "statements": round(statements / requests, 2) if requests else None,
+            }
+            print(format_row(route, results[route]))
+            if errors:
+                print(f"      errors: {sorted(set(map(str, errors)))}")
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def format_row(route, row):
+    def ms(value):
+        return "      -" if value is None else f"{value:7.1f}"
+
+    statements = "-" if row["statements"] is None else f"{row['statements']:.1f}"
+    return (
+        f"  {route:<40} {row['throughput']:9,.1f} req/s  p50 {ms(row['p50_ms'])}  "
+        f"p95 {ms(row['p95_ms'])}  p99 {ms(row['p99_ms'])} ms  "
+        f"{statements:>5} SQL/req  {row['errors']} errors"
+    )
+
+
+def compare(baseline, current, max_regression):
+    """Regressions of ``current`` against ``baseline``, as printable lines."""
+    problems = []
+    for dialect, routes in current["runs"].items():
+        for route, now in routes.items():
+            then = baseline["runs"].get(dialect, {}).get(route)
+            if then is None:
+                continue
+            where = f"{dialect} {route}"
+            if then["p95_ms"] and now["p95_ms"]:
+                ratio = now["p95_ms"] / then["p95_ms"]
+                if ratio > 1 + max_regression:
+                    problems.append(
+                        f"{where}: p95 {then['p95_ms']:.1f} -> {now['p95_ms']:.1f} ms "
+                        f"({ratio - 1:+.0%})"
+                    )
+            if then["throughput"] and now["throughput"] is not None:
+                ratio = now["throughput"] / then["throughput"]
+                if ratio < 1 / (1 + max_regression):
+                    problems.append(
+                        f"{where}: throughput {then['throughput']:,.1f} -> "
+                        f"{now['throughput']:,.1f} req/s ({ratio - 1:+.0%})"
+                    )
+            # Statement counts do not depend on the machine: any growth is real
+            if (
+                then["statements"] is not None
+                and now["statements"] is not None
+                and now["statements"] > then["statements"] + 0.5
+            ):
+                problems.append(
+                    f"{where}: SQL statements per request "
+                    f"{then['statements']} -> {now['statements']}"
+                )
+            if now["errors"] and not then["errors"]:
+                problems.append(f"{where}: {now['errors']} errors, none before")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url",
+        action="append",
+        help="database to run against, repeatable (default: a SQLite file)",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--expenses", type=int, default=10_000)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument(
+        "--routes", nargs="*", help="only routes containing one of these strings"
+    )
+    parser.add_argument("--results", default="/tmp/expense_load_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument(
+        "--current", help="compare this results file instead of running the suite"
+    )
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "concurrency": args.concurrency,
+            "seconds": args.seconds,
+            "expenses": args.expenses,
+            "runs": {},
+        }
+        for url in args.url or ["sqlite:////tmp/expense_load_bench.db"]:
+            dialect = url.split(":", 1)[0].split("+", 1)[0]
+            print(
+                f"{dialect}: {args.concurrency} connections, {args.seconds:g} s per route"
+            )
+            current["runs"][dialect] = run_url(url, args)
+        with open(args.results, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"results written to {args.results}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = compare(baseline, current, args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"no route regressed by more than {args.max_regression:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Read latency during a login storm.
+
+Boots ``app.main:app`` under uvicorn against a throwaway SQLite database,
+then measures GET /expenses latency twice: on an idle server and while a
+burst of concurrent /login calls runs. With bcrypt on the bounded process
+pool the read p99 should stay roughly flat, and excess logins get 503.
+
+    python -m benchmarks.login_burst --readers 8 --logins 64 --seconds 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+DB_PATH = "/tmp/expense_login_bench.db"
+
+
+def request(url, payload=None, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def seed(env, logins):
+    script = (
+        "from app.db.init_db import init_db\n"
+        "from app.db.session import SessionLocal\n"
+        "from app.crud.users import create_user\n"
+        "from app.schemas.pydantic import UserCreate\n"
+        "init_db()\n"
+        "db = SessionLocal()\n"
+        f"for i in range({logins} + 1):\n"
+        "    create_user(db, UserCreate(name=f'u{i}', email=f'u{i}@example.com',"
+        " password='secret'))\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", script],
+        env={**env, "PASSWORD_HASH_WORKERS": "0"},
+        check=True,
+    )
+
+
+def read_loop(base, token, stop, latencies):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        request(f"{base}/expenses?limit=20", token=token)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+
+def login_loop(base, i, stop, statuses):
+    body = {"name": "u", "email": f"u{i}@example.com", "password": "secret"}
+    while not stop.is_set():
+        statuses[request(f"{base}/login", body)[0]] += 1
+
+
+def phase(base, token, readers, logins, seconds):
+    stop = threading.Event()
+    latencies, statuses = [], Counter()
+    threads = [
+        threading.Thread(target=read_loop, args=(base, token, stop, latencies))
+        for _ in range(readers)
+    ] + [
+        threading.Thread(target=login_loop, args=(base, i + 1, stop, statuses))
+        for i in range(logins)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{DB_PATH}",
+        "JWT_SECRET": os.environ.get("JWT_SECRET", "benchmark"),
+    }
+    seed(env, args.logins)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(base + "/", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.1)
+        body = {"name": "u", "email": "u0@example.com", "password": "secret"}
+        token = json.loads(request(f"{base}/login", body)[1])["access_token"]
+
+        for label, logins in (("idle", 0), ("login burst", args.logins)):
+            latencies, statuses = phase(base, token, args.readers, logins, args.seconds)
+            print(
+                f"{label:>12}: {len(latencies)} reads, "
+                f"p50 {statistics.median(latencies):.1f} ms, "
+                f"p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms"
+                + (f", login statuses {dict(statuses)}" if logins else "")
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
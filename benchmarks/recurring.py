@@ -0,0 +1,113 @@
+"""Throughput of the recurring-expense job backfilling a year of occurrences.
+
+Seeds N monthly (or weekly) templates dated a year ago across a set of
+users, each with its schedule, then times ``materialize_due`` generating
+every occurrence since, and a rerun that must find nothing to do.
+
+    python -m benchmarks.recurring --templates 100000 --frequency monthly
+    DATABASE_URL=postgresql://localhost/bench python -m benchmarks.recurring
+
+The target database is dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_recurring_bench.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import insert, literal, select  # noqa: E402
+
+from app.crud.recurring import materialize_due, occurrence  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.recurring_schedule import RecurringSchedule  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+NOW = datetime(2025, 1, 1)
+START = datetime(2024, 1, 1)
+
+
+def seed(templates, users, frequency):
+    Base.metadata.drop_all(engine)
+    init_db()
+    db = SessionLocal()
+    accounts = [
+        User(name=f"u{i}", email=f"u{i}@example.com", hashed_password="x")
+        for i in range(users)
+    ]
+    for account in accounts:
+        account.role_id = 1
+    db.add_all(accounts)
+    db.flush()
+    categories = [Category(name="bills", owner_id=a.id) for a in accounts]
+    db.add_all(categories)
+    db.flush()
+    db.execute(
+        insert(Expense),
+        [
+            {
+                "user_id": categories[i % users].owner_id,
+                "category_id": categories[i % users].id,
+                "name": f"subscription {i}",
+                "amount": 5.0 + i % 20,
+                "is_recurring": True,
+                "date": START,
+            }
+            for i in range(templates)
+        ],
+    )
+    db.execute(
+        insert(RecurringSchedule).from_select(
+            [
+                "user_id",
+                "expense_id",
+                "frequency",
+                "interval",
+                "starts_at",
+                "materialized",
+                "next_due",
+            ],
+            select(
+                Expense.user_id,
+                Expense.id,
+                literal(frequency),
+                literal(1),
+                Expense.date,
+                literal(0),
+                literal(occurrence(frequency, 1, START, 1)),
+            ),
+        )
+    )
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templates", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--frequency", default="monthly")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    seed(args.templates, args.users, args.frequency)
+    print(f"{engine.dialect.name}: {args.templates:,} {args.frequency} templates")
+    for label in ("backfill", "rerun"):
+        db = SessionLocal()
+        t0 = time.perf_counter()
+        stats = materialize_due(db, now=NOW, chunk_size=args.chunk_size)
+        seconds = time.perf_counter() - t0
+        db.close()
+        print(
+            f"{label:>8}: {stats['occurrences']:>9,} occurrences in {seconds:6.2f} s "
+            f"({stats['occurrences'] / seconds:,.0f}/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
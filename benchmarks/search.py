@@ -0,0 +1,102 @@
+"""Latency of GET /expenses/search's query on one user with many expenses.
+
+Seeds N expenses whose names and notes are drawn from a small merchant and
+word list (so common terms match a large share of rows, rare ones few), then
+times the first page of ``search_expenses`` for a mix of queries.
+
+    python -m benchmarks.search --rows 1000000 --repeat 20
+    DATABASE_URL=postgresql://localhost/bench python -m benchmarks.search
+
+The target database is dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_search_bench.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.crud.expenses import search_expenses  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+MERCHANTS = ["Starbucks", "Amazon", "Uber", "Shell", "Tesco", "Netflix", "IKEA"]
+WORDS = ["coffee", "lunch", "fuel", "groceries", "gift", "travel", "office"]
+RARE = [f"ref{i:05d}" for i in range(10_000)]
+
+QUERIES = ["starbucks", "coffee", "star cof", "ikea office", "ref00042", "zzz"]
+
+
+def seed(rows, chunk=50_000):
+    Base.metadata.drop_all(engine)
+    init_db()
+    db = SessionLocal()
+    account = User(name="bench", email="bench@example.com", hashed_password="x")
+    account.role_id = 1
+    db.add(account)
+    db.flush()
+    food = Category(name="food", owner_id=account.id)
+    db.add(food)
+    db.flush()
+    rng = random.Random(0)
+    start = datetime(2020, 1, 1)
+    for offset in range(0, rows, chunk):
+        db.execute(
+            insert(Expense),
+            [
+                {
+                    "user_id": account.id,
+                    "category_id": food.id,
+                    "name": f"{rng.choice(MERCHANTS)} {rng.choice(WORDS)}",
+                    "amount": 1.0 + i % 50,
+                    "description": f"{rng.choice(WORDS)} {rng.choice(RARE)}",
+                    "is_recurring": False,
+                    "date": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + chunk, rows))
+            ],
+        )
+        db.commit()
+    user_id = account.id
+    db.close()
+    return user_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    user_id = seed(args.rows)
+    print(
+        f"{engine.dialect.name}: seeded {args.rows:,} rows in {time.perf_counter() - t0:.1f} s"
+    )
+    for q in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            db = SessionLocal()
+            t0 = time.perf_counter()
+            items, _ = search_expenses(db, user_id, q, args.limit)
+            timings.append((time.perf_counter() - t0) * 1000)
+            db.close()
+        timings.sort()
+        print(
+            f"{q!r:>14}: {len(items):>3} hits, p50 {statistics.median(timings):7.2f} ms, "
+            f"p99 {timings[int(len(timings) * 0.99)]:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
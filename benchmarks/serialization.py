@@ -0,0 +1,144 @@
+"""Rows/sec and peak memory of list-response serialization, ORM vs fast path.
+
+Seeds N expenses in a throwaway SQLite database and builds the GET /expenses
+body three ways, timing query + serialization together:
+
+- orm: ORM instances validated into ``ExpensePage`` via ``from_attributes``
+  and encoded with the stdlib ``json`` (the previous route behaviour);
+- rows: column rows through the same pydantic + ``json`` path
+  (``FAST_SERIALIZATION=false``);
+- fast: column rows encoded straight to bytes by orjson (the default).
+
+    python -m benchmarks.serialization --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_serialize_bench.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from fastapi.responses import ORJSONResponse  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.crud.expenses import get_expenses_page  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.pydantic import ExpensePage  # noqa: E402
+
+
+def seed(rows):
+    Base.metadata.drop_all(engine)
+    init_db()
+    db = SessionLocal()
+    account = User(name="bench", email="bench@example.com", hashed_password="x")
+    account.role_id = 1
+    db.add(account)
+    db.flush()
+    food = Category(name="food", owner_id=account.id)
+    db.add(food)
+    db.flush()
+    start = datetime(2024, 1, 1)
+    db.execute(
+        insert(Expense),
+        [
+            {
+                "user_id": account.id,
+                "category_id": food.id,
+                "name": f"expense {i}",
+                "amount": 1.0 + i % 50,
+                "description": None if i % 3 else f"note {i}",
+                "is_recurring": i % 7 == 0,
+                "date": start + timedelta(minutes=i),
+                "created_at": start,
+            }
+            for i in range(rows)
+        ],
+    )
+    db.commit()
+    user_id = account.id
+    db.close()
+    return user_id
+
+
+def stdlib_json(content) -> bytes:
+    # What fastapi.responses.JSONResponse.render does
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def orm_path(db, user_id, limit):
+    items = (
+        db.query(Expense)
+        .filter(Expense.user_id == user_id)
+        .order_by(Expense.date.desc(), Expense.id.desc())
+        .limit(limit)
+        .all()
+    )
+    page = ExpensePage.model_validate({"items": items, "next_cursor": None})
+    return stdlib_json(page.model_dump(mode="json"))
+
+
+def rows_path(db, user_id, limit):
+    items, _ = get_expenses_page(db, user_id, limit)
+    page = {"items": [row._asdict() for row in items], "next_cursor": None}
+    return stdlib_json(ExpensePage.model_validate(page).model_dump(mode="json"))
+
+
+def fast_path(db, user_id, limit):
+    items, _ = get_expenses_page(db, user_id, limit)
+    page = {"items": [row._asdict() for row in items], "next_cursor": None}
+    return ORJSONResponse(page).body
+
+
+def measure(build, user_id, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        t0 = time.perf_counter()
+        body = build(db, user_id, rows)
+        timings.append(time.perf_counter() - t0)
+        db.close()
+    # tracemalloc slows every allocation, so memory gets its own run
+    db = SessionLocal()
+    tracemalloc.start()
+    build(db, user_id, rows)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.close()
+    return statistics.median(timings), peak, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    user_id = seed(args.rows)
+    bodies = {
+        build.__name__: json.loads(build(SessionLocal(), user_id, args.rows))
+        for build in (orm_path, rows_path, fast_path)
+    }
+    assert bodies["orm_path"] == bodies["rows_path"] == bodies["fast_path"]
+
+    for label, build in (("orm", orm_path), ("rows", rows_path), ("fast", fast_path)):
+        seconds, peak, size = measure(build, user_id, args.rows, args.repeat)
+        print(
+            f"{label:>5}: {args.rows / seconds:>9,.0f} rows/s, "
+            f"{seconds * 1000:7.1f} ms, peak {peak / 2**20:6.1f} MiB, "
+            f"body {size / 1024:,.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
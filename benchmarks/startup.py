@@ -0,0 +1,115 @@
+"""Cold-import time and time-to-first-request of the app.
+
+Imports ``app.main`` in fresh interpreters, then boots uvicorn with N
+workers and polls GET / until it answers, once with the default startup
+(no database work) and once with ``DB_INIT_ON_STARTUP=true``, where every
+worker creates the schema and seeds the roles in its lifespan hook.
+
+    python -m benchmarks.startup --workers 1 4 8 --repeat 5
+    python -m benchmarks.startup --url postgresql://localhost/bench
+
+The target database is dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+"""
+
+RESET_SCRIPT = """
+from app.db.init_db import init_db
+from app.db.session import Base, engine
+Base.metadata.drop_all(engine)
+init_db()
+"""
+
+
+def cold_import(env, repeat):
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        timings.append(float(out) * 1000)
+    return timings
+
+
+def first_request(env, port, workers):
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < 60:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+                return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not answer within 60s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:////tmp/expense_startup_bench.db")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.url,
+        "JWT_SECRET": os.environ.get("JWT_SECRET", "benchmark"),
+    }
+    subprocess.run([sys.executable, "-c", RESET_SCRIPT], env=env, check=True)
+
+    timings = cold_import(env, args.repeat)
+    print(
+        f"cold import: median {statistics.median(timings):.0f} ms, "
+        f"min {min(timings):.0f} ms over {args.repeat} runs"
+    )
+    for init in ("false", "true"):
+        for workers in args.workers:
+            timings = [
+                first_request({**env, "DB_INIT_ON_STARTUP": init}, args.port, workers)
+                for _ in range(args.repeat)
+            ]
+            print(
+                f"first request, {workers:>2} workers, init on startup {init:>5}: "
+                f"median {statistics.median(timings):.0f} ms, "
+                f"max {max(timings):.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Latency of GET /reports/trends for one user with many expenses.
+
+Seeds N expenses over three years in a two-level category tree, builds the
+monthly rollup, then times ``get_trends`` with and without ``rollup``.
+For comparison it also times pulling the raw ``(date, category_id,
+amount)`` columns into NumPy arrays, the cost the rollup saves. The target
+is under 50 ms for a 1M-row user.
+
+    python -m benchmarks.trends --rows 1000000 --repeat 20
+    DATABASE_URL=postgresql://localhost/bench python -m benchmarks.trends
+
+The target database is dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_trends_bench.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+import numpy as np  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.crud.reports import get_trends  # noqa: E402
+from app.crud.spend import rebuild_monthly_spend  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+ROOTS = ["housing", "food", "transport", "shopping", "health", "leisure"]
+START = datetime(2023, 1, 1)
+DAYS = 3 * 365
+
+
+def seed(rows, chunk=50_000):
+    Base.metadata.drop_all(engine)
+    init_db()
+    db = SessionLocal()
+    account = User(name="bench", email="bench@example.com", hashed_password="x")
+    account.role_id = 1
+    db.add(account)
+    db.flush()
+    leaves = []
+    for name in ROOTS:
+        root = Category(name=name, owner_id=account.id)
+        db.add(root)
+        db.flush()
+        children = [
+            Category(name=f"{name} {i}", owner_id=account.id, parent_id=root.id)
+            for i in range(4)
+        ]
+        db.add_all(children)
+        db.flush()
+        leaves += [root.id] + [child.id for child in children]
+    rng = random.Random(0)
+    for offset in range(0, rows, chunk):
+        db.execute(
+            insert(Expense),
+            [
+                {
+                    "user_id": account.id,
+                    "category_id": rng.choice(leaves),
+                    "name": "bench",
+                    "amount": round(rng.lognormvariate(3, 0.8), 2),
+                    "is_recurring": False,
+                    "date": START + timedelta(days=rng.randrange(DAYS)),
+                }
+                for _ in range(offset, min(offset + chunk, rows))
+            ],
+        )
+        db.commit()
+    rebuild_monthly_spend(db, account.id)
+    db.commit()
+    user_id = account.id
+    db.close()
+    return user_id
+
+
+def raw_arrays(db, user_id):
+    rows = db.execute(
+        select(Expense.date, Expense.category_id, Expense.amount).where(
+            Expense.user_id == user_id
+        )
+    ).all()
+    dates, category_ids, amounts = zip(*rows)
+    return (
+        np.array(dates, dtype="datetime64[D]"),
+        np.array(category_ids),
+        np.array(amounts),
+    )
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    # Nearest rank: the smallest sample at or above 95% of them
+    return statistics.median(samples), samples[math.ceil(0.95 * len(samples)) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--months", type=int, default=36)
+    args = parser.parse_args()
+
+    user_id = seed(args.rows)
+    end = f"{START + timedelta(days=DAYS - 1):%Y-%m}"
+    print(f"{engine.dialect.name}: {args.rows:,} expenses, {args.months} months")
+    db = SessionLocal()
+    cases = [
+        (
+            "trends",
+            lambda: get_trends(db, user_id, end=end, months=args.months),
+            args.repeat,
+        ),
+        (
+            "trends rollup",
+            lambda: get_trends(db, user_id, end=end, months=args.months, rollup=True),
+            args.repeat,
+        ),
+        # Seconds per run at 1M rows, so a few runs are plenty
+        ("raw rows -> numpy", lambda: raw_arrays(db, user_id), 3),
+    ]
+    for label, fn, repeat in cases:
+        p50, p95 = timed(fn, repeat)
+        print(f"{label:>18}: p50 {p50:8.2f} ms  p95 {p95:8.2f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
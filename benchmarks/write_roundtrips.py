@@ -0,0 +1,278 @@
+"""Round trips and latency of update/delete writes, ORM path vs single statement.
+
+Seeds a throwaway database, then runs each write both the way the CRUD used
+to (load the object, flush the change, commit, refresh, serialize) and
+through the current ``app.crud`` functions, counting round trips (statements
+plus COMMIT). Both paths make the same side writes (rollup, budget alerts,
+tombstones, data versions), so only the row's own read and write differ.
+``--rtt-ms`` sleeps before every round trip to stand in for a networked
+Postgres; point ``DATABASE_URL`` at a real one to exercise RETURNING.
+
+    python -m benchmarks.write_roundtrips --ops 500 --rtt-ms 1
+    DATABASE_URL=postgresql://localhost/bench python -m benchmarks.write_roundtrips
+
+The target database is dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/expense_write_bench.db")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.crud import budgets, categories, expenses  # noqa: E402
+from app.crud.alerts import check_budget_alerts  # noqa: E402
+from app.crud.expenses import ROLLUP_COLUMNS  # noqa: E402
+from app.crud.spend import (record_spend, record_spend_change,  # noqa: E402
+                            refresh_budget_spent)
+from app.crud.versions import bump_version, record_tombstone  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.budget import Budget  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.pydantic import (BudgetIn, BudgetOut, CategoryIn,  # noqa: E402
+                                  CategoryOut, ExpenseIn, ExpenseOut)
+
+
+def seed(ops):
+    Base.metadata.drop_all(engine)
+    init_db()
+    db = SessionLocal()
+    account = User(name="bench", email="bench@example.com", hashed_password="x")
+    account.role_id = 1
+    db.add(account)
+    db.flush()
+    parents = [Category(name=f"c{i}", owner_id=account.id) for i in range(ops)]
+    db.add_all(parents)
+    db.flush()
+    db.add_all(
+        Category(name=f"s{p.id}", owner_id=account.id, parent_id=p.id) for p in parents
+    )
+    rows = [
+        {
+            "user_id": account.id,
+            "category_id": parents[0].id,
+            "name": f"e{i}",
+            "amount": 10.0,
+            "is_recurring": False,
+            "date": datetime(2024, 1, 1),
+        }
+        for i in range(ops * 4)
+    ]
+    db.execute(insert(Expense), rows)
+    db.execute(
+        insert(Budget),
+        [
+            {
+                "user_id": account.id,
+                "category_id": parents[0].id,
+                "amount_limit": 100.0,
+                "time_period": f"{2000 + i // 12}-{i % 12 + 1:02d}",
+            }
+            for i in range(ops * 2)
+        ],
+    )
+    db.commit()
+    ids = (account.id, [p.id for p in parents])
+    db.close()
+    return ids
+
+
+# --- the pre-RETURNING implementations, kept here for comparison -------------
+
+
+def orm_update_expense(db, expense_id, user_id, data):
+    expense = db.query(Expense).filter_by(id=expense_id, user_id=user_id).first()
+    before = tuple(getattr(expense, c.key) for c in ROLLUP_COLUMNS)
+    for attr, value in data.dict(exclude_unset=True).items():
+        setattr(expense, attr, value)
+    after = tuple(getattr(expense, c.key) for c in ROLLUP_COLUMNS)
+    record_spend_change(db, user_id, before, after)
+    old_category_id, old_date, old_amount = before
+    check_budget_alerts(db, user_id, [(old_category_id, old_date, -old_amount), after])
+    bump_version(db, user_id, "expenses")
+    db.commit()
+    db.refresh(expense)
+    return expense
+
+
+def orm_delete_expense(db, expense_id, user_id):
+    expense = db.query(Expense).filter_by(id=expense_id, user_id=user_id).first()
+    record_spend(db, user_id, expense.category_id, expense.date, -expense.amount, -1)
+    db.delete(expense)
+    record_tombstone(db, user_id, "expenses", expense_id)
+    bump_version(db, user_id, "expenses")
+    db.commit()
+    return True
+
+
+def orm_update_budget(db, budget_id, user_id, data):
+    budget = db.query(Budget).filter_by(id=budget_id, user_id=user_id).first()
+    for attr, value in data.dict().items():
+        setattr(budget, attr, value)
+    db.flush()
+    refresh_budget_spent(db, user_id, budget_id)
+    bump_version(db, user_id, "budgets")
+    db.commit()
+    db.refresh(budget)
+    return budget
+
+
+def orm_delete_budget(db, budget_id, user_id):
+    budget = db.query(Budget).filter_by(id=budget_id, user_id=user_id).first()
+    db.delete(budget)
+    record_tombstone(db, user_id, "budgets", budget_id)
+    bump_version(db, user_id, "budgets")
+    db.commit()
+    return True
+
+
+def orm_update_category(db, category_id, user_id, data):
+    category = db.query(Category).filter_by(id=category_id, owner_id=user_id).first()
+    old_parent_id = category.parent_id
+    category.name = data.name
+    category.parent_id = data.parent_id
+    db.flush()
+    if data.parent_id != old_parent_id:
+        refresh_budget_spent(db, user_id, ancestors_of=[old_parent_id, data.parent_id])
+    bump_version(db, user_id, "categories")
+    db.commit()
+    db.refresh(category)
+    return category
+
+
+def run(label, write, serialize, args_list, rtt):
+    round_trips = 0
+
+    def on_round_trip(*_):
+        nonlocal round_trips
+        round_trips += 1
+        if rtt:
+            time.sleep(rtt)
+
+    event.listen(engine, "before_cursor_execute", on_round_trip)
+    event.listen(engine, "commit", on_round_trip)
+    timings = []
+    try:
+        for args in args_list:
+            db = SessionLocal()
+            t0 = time.perf_counter()
+            result = write(db, *args)
+            if serialize is not None:
+                serialize.model_validate(result)
+            timings.append((time.perf_counter() - t0) * 1000)
+            db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_round_trip)
+        event.remove(engine, "commit", on_round_trip)
+    timings.sort()
+    print(
+        f"{label:>28}: {round_trips / len(args_list):.1f} round trips/op, "
+        f"p50 {statistics.median(timings):.2f} ms, "
+        f"p99 {timings[int(len(timings) * 0.99)]:.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    user_id, category_ids = seed(args.ops)
+    rtt = args.rtt_ms / 1000
+    n = args.ops
+    print(f"{engine.dialect.name}, RETURNING: {engine.dialect.full_returning}")
+
+    def expense_in(i):
+        return ExpenseIn(
+            name=f"u{i}",
+            category_id=category_ids[0],
+            amount=5.0,
+            description=None,
+            date=datetime(2024, 2, 1),
+        )
+
+    budget_in = BudgetIn(
+        category_id=category_ids[0], amount_limit=50.0, time_period="2030-01"
+    )
+    for label, write, serialize, args_list in (
+        (
+            "update expense (ORM)",
+            orm_update_expense,
+            ExpenseOut,
+            [(i + 1, user_id, expense_in(i)) for i in range(n)],
+        ),
+        (
+            "update expense",
+            expenses.update_expense,
+            ExpenseOut,
+            [(n + i + 1, user_id, expense_in(i)) for i in range(n)],
+        ),
+        (
+            "delete expense (ORM)",
+            orm_delete_expense,
+            None,
+            [(2 * n + i + 1, user_id) for i in range(n)],
+        ),
+        (
+            "delete expense",
+            expenses.delete_expense,
+            None,
+            [(3 * n + i + 1, user_id) for i in range(n)],
+        ),
+        (
+            "update budget (ORM)",
+            orm_update_budget,
+            BudgetOut,
+            [(i + 1, user_id, budget_in) for i in range(n)],
+        ),
+        (
+            "update budget",
+            budgets.update_budget,
+            BudgetOut,
+            [(n + i + 1, user_id, budget_in) for i in range(n)],
+        ),
+        (
+            "delete budget (ORM)",
+            orm_delete_budget,
+            None,
+            [(i + 1, user_id) for i in range(n)],
+        ),
+        (
+            "delete budget",
+            budgets.delete_budget,
+            None,
+            [(n + i + 1, user_id) for i in range(n)],
+        ),
+        (
+            "update category (ORM)",
+            orm_update_category,
+            CategoryOut,
+            [
+                (cid, user_id, CategoryIn(name="x", parent_id=None))
+                for cid in category_ids
+            ],
+        ),
+        (
+            "update category",
+            categories.update_category,
+            CategoryOut,
+            [
+                (cid, user_id, CategoryIn(name="y", parent_id=None))
+                for cid in category_ids
+            ],
+        ),
+    ):
+        run(label, write, serialize, args_list, rtt)
+
+
+if __name__ == "__main__":
+    main()
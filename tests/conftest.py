@@ -0,0 +1,51 @@
+"""Shared fixtures: the app against a throwaway SQLite file, reset per test."""
+
+import os
+import tempfile
+
+# Settings are read at import time, so point the app away from any real
+# database before anything under ``app`` is imported
+os.environ["DATABASE_URL"] = (
+    f"sqlite:///{tempfile.mkdtemp(prefix='expense-tests-')}/primary.db"
+)
+os.environ["JWT_SECRET"] = "test"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.jwt import create_access_token  # noqa: E402
+from app.core.principal_cache import principal_cache  # noqa: E402
+from app.crud.roles import role_ids  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.role import RoleEnum  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    Base.metadata.drop_all(engine)
+    init_db()
+    # Ids restart with the schema, so cached principals would be stale
+    principal_cache.clear()
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(client):
+    """Create a user straight in the database; returns their auth headers."""
+
+    def make(email="alice@example.com", role=RoleEnum.user):
+        db = SessionLocal()
+        user = User(name="test", email=email, hashed_password="x")
+        user.role_id = role_ids[role]
+        db.add(user)
+        db.commit()
+        token = create_access_token({"sub": email, "uid": user.id, "role": role.value})
+        db.close()
+        return {"Authorization": f"Bearer {token}"}
+
+    return make
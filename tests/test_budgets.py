@@ -0,0 +1,93 @@
+from sqlalchemy import update
+
+from app.db.session import SessionLocal
+from app.models.category import Category
+
+
+def test_cycle_in_category_tree_does_not_hang_writes(client, make_user):
+    headers = make_user()
+    root = client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=headers
+    ).json()
+    child = client.post(
+        "/categories", json={"name": "coffee", "parent_id": root["id"]}, headers=headers
+    ).json()
+    budget = client.post(
+        "/budgets",
+        json={"category_id": root["id"], "amount_limit": 100, "time_period": "2025-06"},
+        headers=headers,
+    ).json()
+    # A cycle the API refuses to create, as old data or a race could leave it
+    db = SessionLocal()
+    db.execute(
+        update(Category).where(Category.id == root["id"]).values(parent_id=child["id"])
+    )
+    db.commit()
+    db.close()
+
+    expense = {
+        "name": "latte",
+        "category_id": child["id"],
+        "amount": 4.5,
+        "description": None,
+        "date": "2025-06-03T08:00:00",
+    }
+    assert client.post("/expenses", json=expense, headers=headers).status_code == 200
+    # Making the root top-level again repairs the tree
+    response = client.put(
+        f"/categories/{root['id']}",
+        json={"name": "food", "parent_id": None},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    response = client.get("/budgets/status", headers=headers)
+    assert [row["spent"] for row in response.json() if row["id"] == budget["id"]] == [
+        4.5
+    ]
+
+
+def test_moving_a_category_moves_its_spend_between_budgets(client, make_user):
+    headers = make_user()
+
+    def category(name, parent_id=None):
+        body = {"name": name, "parent_id": parent_id}
+        return client.post("/categories", json=body, headers=headers).json()["id"]
+
+    food, drinks = category("food"), category("drinks")
+    coffee = category("coffee", food)
+    budgets = {}
+    for category_id in (food, drinks, coffee):
+        body = {
+            "category_id": category_id,
+            "amount_limit": 100,
+            "time_period": "2025-06",
+        }
+        budget = client.post("/budgets", json=body, headers=headers).json()
+        budgets[budget["id"]] = category_id
+    expense = {
+        "name": "latte",
+        "category_id": coffee,
+        "amount": 4.5,
+        "description": None,
+        "date": "2025-06-03T08:00:00",
+    }
+    assert client.post("/expenses", json=expense, headers=headers).status_code == 200
+
+    def spent():
+        rows = client.get("/budgets/status", headers=headers).json()
+        return {budgets[row["id"]]: row["spent"] for row in rows}
+
+    assert spent() == {food: 4.5, drinks: 0.0, coffee: 4.5}
+    for name, parent_id in (("espresso", food), ("espresso", drinks)):
+        response = client.put(
+            f"/categories/{coffee}",
+            json={"name": name, "parent_id": parent_id},
+            headers=headers,
+        )
+        assert response.json() == {
+            "id": coffee,
+            "name": name,
+            "parent_id": parent_id,
+            "children": [],
+        }
+    assert spent() == {food: 0.0, drinks: 4.5, coffee: 4.5}
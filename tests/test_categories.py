@@ -0,0 +1,98 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud.categories import get_categories_by_user
+from app.db.init_db import init_db
+from app.models.category import Category
+from app.schemas.pydantic import CategoryOut
+
+
+def _tree_statements(size):
+    """Statements run to load and serialize a ``size``-node tree, fresh session."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    init_db(engine)
+    db = sessionmaker(bind=engine)()
+    # A few roots, each the top of a deep chain with a leaf hanging off every
+    # level, so lazy loading would cost a query per node at every depth
+    parents = [None] * 3
+    for i in range(size):
+        node = Category(name=f"c{i}", owner_id=1, parent_id=parents[i % 3])
+        db.add(node)
+        db.flush()
+        if i % 2 == 0:
+            parents[i % 3] = node.id
+    db.commit()
+    db.close()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    db = sessionmaker(bind=engine)()
+    roots = get_categories_by_user(db, 1)
+    tree = [CategoryOut.model_validate(root).model_dump() for root in roots]
+    db.close()
+    engine.dispose()
+
+    def count(nodes):
+        return sum(1 + count(node["children"]) for node in nodes)
+
+    assert count(tree) == size
+    return len(statements)
+
+
+def test_category_tree_query_count_is_constant():
+    assert _tree_statements(10) == _tree_statements(300) == 1
+
+
+def test_move_under_own_subtree_is_rejected(client, make_user):
+    headers = make_user()
+    root = client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=headers
+    ).json()
+    child = client.post(
+        "/categories", json={"name": "coffee", "parent_id": root["id"]}, headers=headers
+    ).json()
+
+    for parent_id in (root["id"], child["id"]):
+        response = client.put(
+            f"/categories/{root['id']}",
+            json={"name": "food", "parent_id": parent_id},
+            headers=headers,
+        )
+        assert response.status_code == 400
+
+    # The tree is unchanged and writes under it still work
+    response = client.put(
+        f"/categories/{child['id']}",
+        json={"name": "cafes", "parent_id": root["id"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+
+def test_parent_must_be_own_category(client, make_user):
+    alice = make_user()
+    bob = make_user("bob@example.com")
+    theirs = client.post(
+        "/categories", json={"name": "bills", "parent_id": None}, headers=bob
+    ).json()
+    mine = client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=alice
+    ).json()
+
+    response = client.post(
+        "/categories", json={"name": "x", "parent_id": theirs["id"]}, headers=alice
+    )
+    assert response.status_code == 400
+    response = client.put(
+        f"/categories/{mine['id']}",
+        json={"name": "food", "parent_id": theirs["id"]},
+        headers=alice,
+    )
+    assert response.status_code == 400
@@ -0,0 +1,142 @@
+from datetime import datetime
+
+from app.crud import expenses
+from app.db.session import SessionLocal
+from app.models.expense import Expense
+from app.models.monthly_spend import MonthlySpend
+
+# Repeated names tie on score; the others give BM25 scores that are not round
+SEARCH_NAMES = [
+    "coffee",
+    "coffee beans",
+    "coffee",
+    "iced coffee with oat milk",
+    "coffee coffee",
+    "tea",
+    "coffee",
+    "coffee beans",
+]
+
+
+def _pages(client, headers, path, limit, **query):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": limit, **query} | ({"cursor": cursor} if cursor else {})
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def _add_expenses(client, headers, names):
+    category = client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=headers
+    ).json()
+    for name in names:
+        body = {
+            "name": name,
+            "category_id": category["id"],
+            "amount": 3.5,
+            "description": None,
+            "date": "2024-05-01T00:00:00",
+        }
+        assert client.post("/expenses", json=body, headers=headers).status_code == 200
+
+
+def test_pages_include_expenses_without_a_date(client, make_user):
+    headers = make_user()
+    category = client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=headers
+    ).json()
+    dates = ["2024-05-01", "2024-03-01", "2024-04-01", "2024-01-01", "2024-02-01"]
+    for day in dates:
+        body = {
+            "name": "lunch",
+            "category_id": category["id"],
+            "amount": 9.5,
+            "description": None,
+            "date": f"{day}T00:00:00",
+        }
+        expense = client.post("/expenses", json=body, headers=headers).json()
+        # An update can clear the date, so undated rows do exist
+        if day not in ("2024-03-01", "2024-01-01"):
+            body["date"] = None
+            response = client.put(
+                f"/expenses/{expense['id']}", json=body, headers=headers
+            )
+            assert response.status_code == 200
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = client.get("/expenses", params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        seen += [(item["date"], item["id"]) for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Newest date first, then the undated ones by id, each exactly once
+    assert seen == [
+        ("2024-03-01T00:00:00", 2),
+        ("2024-01-01T00:00:00", 4),
+        (None, 5),
+        (None, 3),
+        (None, 1),
+    ]
+
+
+def test_search_pages_split_ties_and_fractional_scores(client, make_user):
+    headers = make_user()
+    _add_expenses(client, headers, SEARCH_NAMES)
+
+    everything = _pages(client, headers, "/expenses/search", 100, q="coffee")
+    assert sorted(everything) == [1, 2, 3, 4, 5, 7, 8]
+    # Every page size cuts the ranking somewhere else, ties included
+    for limit in (1, 2, 3):
+        assert _pages(client, headers, "/expenses/search", limit, q="coffee") == (
+            everything
+        )
+
+
+def test_search_returns_matches_older_than_the_rank_window(
+    client, make_user, monkeypatch
+):
+    headers = make_user()
+    _add_expenses(client, headers, SEARCH_NAMES)
+    monkeypatch.setattr(expenses, "SEARCH_RANK_WINDOW", 3)
+
+    for limit in (1, 2, 100):
+        seen = _pages(client, headers, "/expenses/search", limit, q="coffee")
+        # The newest three are ranked, the rest follow newest first
+        assert sorted(seen[:3]) == [5, 7, 8]
+        assert seen[3:] == [4, 3, 2, 1]
+
+
+def test_dates_are_stored_and_bucketed_in_utc(client, make_user):
+    headers = make_user()
+    _add_expenses(client, headers, [])
+    body = {
+        "name": "late dinner",
+        "category_id": 1,
+        "amount": 20.0,
+        "description": None,
+        # 2024-07-01 01:30 in UTC
+        "date": "2024-06-30T23:30:00-02:00",
+    }
+    assert client.post("/expenses", json=body, headers=headers).status_code == 200
+    body["date"] = None
+    assert client.post("/expenses", json=body, headers=headers).status_code == 200
+
+    db = SessionLocal()
+    dated, defaulted = db.query(Expense.date).order_by(Expense.id).all()
+    periods = {row.period for row in db.query(MonthlySpend.period)}
+    db.close()
+    assert dated.date == datetime(2024, 7, 1, 1, 30)
+    assert defaulted.date.tzinfo is None
+    assert "2024-07" in periods and "2024-06" not in periods
@@ -0,0 +1,111 @@
+import asyncio
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert
+
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.expense import Expense
+
+# Well above one EXPORT_CHUNK_ROWS chunk, below the body of a 50k-row export
+PEAK_BOUND = 4 * 1024 * 1024
+
+
+def _seed(category_id, rows):
+    db = SessionLocal()
+    db.execute(delete(Expense))
+    start = datetime(2024, 1, 1)
+    db.execute(
+        insert(Expense),
+        [
+            {
+                "user_id": 1,
+                "category_id": category_id,
+                "name": f"expense {i}",
+                "description": "a fairly ordinary purchase",
+                "amount": 10.5,
+                "is_recurring": False,
+                "date": start + timedelta(minutes=i),
+            }
+            for i in range(rows)
+        ],
+    )
+    db.commit()
+    db.close()
+
+
+def _export(headers, fmt):
+    """Drain GET /expenses/export through the ASGI app; (bytes, lines, peak).
+
+    TestClient reads the whole body before returning it, so this plays the
+    server's part and drops each chunk once counted.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "root_path": "",
+        "path": "/expenses/export",
+        "raw_path": b"/expenses/export",
+        "query_string": f"format={fmt}".encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    sent = {"status": None, "bytes": 0, "lines": 0}
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client stays connected until the response is over
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent["status"] = message["status"]
+            return
+        body = message.get("body", b"")
+        sent["bytes"] += len(body)
+        sent["lines"] += body.count(b"\n")
+        if not message.get("more_body", False):
+            done.set()
+
+    async def serve():
+        nonlocal done
+        done = asyncio.Event()
+        await app(scope, receive, send)
+
+    done = None
+    tracemalloc.start()
+    try:
+        asyncio.run(serve())
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert sent["status"] == 200
+    return sent["bytes"], sent["lines"], peak
+
+
+def test_export_memory_is_flat(client, make_user):
+    headers = make_user()
+    category = client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=headers
+    ).json()
+    for fmt in ("csv", "ndjson"):
+        # Warm up first: imports, statement caches and the like are one-off
+        _seed(category["id"], 10)
+        _export(headers, fmt)
+        for rows in (2_000, 50_000):
+            _seed(category["id"], rows)
+            size, lines, peak = _export(headers, fmt)
+            assert lines == rows + (fmt == "csv")
+            assert peak < PEAK_BOUND, (fmt, rows, peak)
+        # The large export is bigger than the bound, so it was never buffered
+        assert size > PEAK_BOUND
@@ -0,0 +1,13 @@
+from app.models.role import RoleEnum
+
+
+def test_metrics_are_for_admins(client, make_user):
+    user = make_user()
+    admin = make_user("admin@example.com", RoleEnum.admin)
+    client.get("/categories", headers=user)
+
+    assert client.get("/metrics").status_code in (401, 403)
+    assert client.get("/metrics", headers=user).status_code == 403
+    response = client.get("/metrics", headers=admin)
+    assert response.status_code == 200
+    assert 'route="/categories"' in response.text
@@ -0,0 +1,31 @@
+from app.crud.outbox import deliver_pending, enqueue
+from app.db.session import SessionLocal
+from app.models.outbox import OutboxMessage
+
+
+def test_delivery_sends_outside_a_transaction(client, make_user):
+    make_user()
+    db = SessionLocal()
+    for i in range(3):
+        enqueue(db, 1, "budget.threshold", {"n": i})
+    db.commit()
+
+    sent = []
+
+    def send(message):
+        # Nothing is locked or checked out while a webhook answers
+        assert not db.in_transaction()
+        if message["payload"]["n"] == 1:
+            raise OSError("webhook down")
+        sent.append(message["payload"]["n"])
+
+    assert deliver_pending(db, send, batch_size=2) == {"delivered": 2, "failed": 1}
+    assert sent == [0, 2]
+    rows = {row.payload["n"]: row for row in db.query(OutboxMessage)}
+    assert all(row.claimed_at is None for row in rows.values())
+    assert [rows[n].delivered_at is not None for n in range(3)] == [True, False, True]
+    assert rows[1].attempts == 1
+
+    # The failed message was released, so the next run retries it
+    assert deliver_pending(db, sent.append) == {"delivered": 1, "failed": 0}
+    db.close()
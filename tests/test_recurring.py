@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from app.crud.recurring import materialize_due
+from app.db.session import SessionLocal
+
+
+def materialize(now):
+    db = SessionLocal()
+    try:
+        return materialize_due(db, now=now)["occurrences"]
+    finally:
+        db.close()
+
+
+def test_resumed_schedule_does_not_backfill_stopped_period(client, make_user):
+    headers = make_user()
+    category = client.post(
+        "/categories", json={"name": "bills", "parent_id": None}, headers=headers
+    ).json()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    expense = client.post(
+        "/expenses",
+        json={
+            "name": "gym",
+            "category_id": category["id"],
+            "amount": 25,
+            "description": None,
+            "date": (now - timedelta(days=200)).isoformat(),
+        },
+        headers=headers,
+    ).json()
+    path = f"/expenses/{expense['id']}/schedule"
+    monthly = {"frequency": "monthly", "interval": 1, "until": None}
+
+    assert client.put(path, json=monthly, headers=headers).status_code == 200
+    assert materialize(now - timedelta(days=120)) == 2
+    assert client.delete(path, headers=headers).status_code == 200
+    schedule = client.put(path, json=monthly, headers=headers).json()
+
+    # Nothing for the months it was stopped; the next one is at most a month off
+    assert datetime.fromisoformat(schedule["next_due"]) >= now
+    assert materialize(now) == 0
+    assert materialize(now + timedelta(days=32)) == 1
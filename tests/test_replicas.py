@@ -0,0 +1,120 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.settings import settings
+from app.crud.categories import create_category, get_categories_by_user
+from app.db.init_db import init_db
+from app.db.session import (ReplicaSet, RoutingSession, async_engine, engine,
+                            get_async_read_db, get_read_db)
+from app.main import app
+from app.models.category import Category
+from app.schemas.pydantic import CategoryIn
+
+
+def _routed(replica):
+    replicas = ReplicaSet([replica], retry_after=30)
+    return replicas, sessionmaker(
+        bind=engine,
+        class_=RoutingSession,
+        replicas=replicas,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+@pytest.fixture
+def read_from(client):
+    """Point the read-only routes at a RoutingSession over the SQLite ``path``."""
+
+    def route(path):
+        if settings.DB_ASYNC:
+            replica = create_async_engine(f"sqlite+aiosqlite:///{path}")
+            replicas = ReplicaSet([replica.sync_engine], retry_after=30)
+            session_factory = sessionmaker(
+                bind=async_engine,
+                class_=AsyncSession,
+                sync_session_class=RoutingSession,
+                replicas=replicas,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+
+            async def get_routed_db():
+                async with session_factory() as db:
+                    yield db
+
+            app.dependency_overrides[get_async_read_db] = get_routed_db
+            return replicas
+
+        replicas, session_factory = _routed(create_engine(f"sqlite:///{path}"))
+
+        def get_routed_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_read_db] = get_routed_db
+        return replicas
+
+    yield route
+    app.dependency_overrides.clear()
+
+
+def _names(client, headers):
+    response = client.get("/categories", headers=headers)
+    assert response.status_code == 200
+    return [category["name"] for category in response.json()]
+
+
+def test_reads_go_to_the_replica(client, make_user, read_from, tmp_path):
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    init_db(replica)
+    read_from(tmp_path / "replica.db")
+    headers = make_user()
+
+    # Written to the primary, which the replica never sees
+    client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=headers
+    )
+    assert _names(client, headers) == []
+
+    db = sessionmaker(bind=replica)()
+    db.add(Category(name="on replica", owner_id=1))
+    db.commit()
+    db.close()
+    assert _names(client, headers) == ["on replica"]
+
+
+def test_unreachable_replica_fails_over_to_primary(
+    client, make_user, read_from, tmp_path
+):
+    replicas = read_from(tmp_path / "missing" / "replica.db")
+    headers = make_user()
+    client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=headers
+    )
+
+    assert _names(client, headers) == ["food"]
+    assert replicas.candidates() == []
+
+
+def test_session_reads_its_own_writes(client, make_user, tmp_path):
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    init_db(replica)
+    make_user()
+    _, session_factory = _routed(replica)
+    db = session_factory()
+    try:
+        assert get_categories_by_user(db, 1) == []
+        assert db.get_bind(clause=Category.__table__.select()) is replica
+
+        create_category(db, 1, CategoryIn(name="food", parent_id=None))
+        # The write pinned the session: the replica still lacks the row
+        assert [c.name for c in get_categories_by_user(db, 1)] == ["food"]
+        assert db.get_bind(clause=Category.__table__.select()) is engine
+    finally:
+        db.close()
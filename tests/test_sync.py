@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.crud.outbox import prune_outbox
+from app.crud.sync import prune_tombstones
+from app.db.session import SessionLocal, engine
+
+
+def datetime_params(contexts):
+    """Every datetime bound in the executed statements, before type processing."""
+    for context in contexts:
+        for row in context.compiled_parameters:
+            yield from (v for v in row.values() if isinstance(v, datetime))
+
+
+def test_sync_compares_and_stores_naive_utc(client, make_user):
+    headers = make_user()
+    category = client.post(
+        "/categories", json={"name": "food", "parent_id": None}, headers=headers
+    ).json()
+    token = client.get("/sync", headers=headers).json()["token"]
+
+    contexts = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        contexts.append(context)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.put(
+            f"/categories/{category['id']}",
+            json={"name": "groceries", "parent_id": None},
+            headers=headers,
+        )
+        client.delete(f"/categories/{category['id']}", headers=headers)
+        body = client.get("/sync", params={"since": token}, headers=headers).json()
+        db = SessionLocal()
+        prune_tombstones(db, timedelta(days=1))
+        prune_outbox(db, timedelta(days=1))
+        db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert body["deleted"]["categories"] == [category["id"]]
+    stamps = list(datetime_params(contexts))
+    # Aware values would be shifted by a non-UTC PostgreSQL server's offset
+    assert stamps and all(stamp.tzinfo is None for stamp in stamps)